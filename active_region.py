@@ -0,0 +1,132 @@
+import numpy as np
+
+# ------------------------
+# ActiveRegion Class
+# ------------------------
+
+# Decides which ships are simulated. The world is cut into square chunks of
+# chunk_size; ships in the chunks around a player (at most wake_radius chunks
+# away, counted like a king's moves) are active and get full physics, wall
+# collisions, bullet hits and AI every tick. All other ships sleep: they are
+# frozen where they are (position, velocity, HP and collected thrust are kept)
+# and cost nothing per tick.
+#
+# Sleeping ships are kept per chunk, so waking them only looks at the chunks
+# around the players, and putting ships to sleep only looks at the active ships:
+# the cost of update() depends on the activity, not on how many ships the world
+# holds. An active ship only falls asleep sleep_radius chunks away (one more
+# than wake_radius by default), so ships near the border of the region do not
+# flicker between the two states.
+#
+# When the whole world (world_size) lies within wake_radius chunks of any
+# point, as the default 2000x2000 labyrinth does, no ship can ever fall asleep:
+# everywhere is then True and update() returns at once.
+#
+# Waking and sleeping only depend on positions, never on timing or randomness,
+# so the same match always wakes the same ships at the same tick.
+class ActiveRegion:
+    # Up to this many active ships the sleep test runs in plain Python instead
+    # of NumPy (cheaper for the usual 2-ship game).
+    SMALL_COUNT = 16
+
+    def __init__(self, chunk_size=1000, wake_radius=2, sleep_radius=None, world_size=None):
+        self.chunk_size = chunk_size
+        self.wake_radius = wake_radius
+        self.sleep_radius = wake_radius + 1 if sleep_radius is None else sleep_radius
+        self.everywhere = world_size is not None and max(self._chunk(*world_size)) <= wake_radius
+        self.active = []  # Simulated ships, in ID order (the order of GameEngine.ships)
+        self.sleeping = {}  # (col, row) -> sleeping ships in that chunk
+        self._sleeping_chunk = {}  # ID of a sleeping ship -> its chunk
+        self.woken = 0  # Ships woken up so far (statistics)
+        self.put_to_sleep = 0
+
+    def _chunk(self, x, y):
+        return int(x // self.chunk_size), int(y // self.chunk_size)
+
+    def __len__(self):
+        return len(self.active)
+
+    def is_active(self, ship):
+        return ship.id not in self._sleeping_chunk
+
+    # Add a new ship: active if it is near an anchor (player position) or there
+    # are no anchors, otherwise asleep.
+    def add(self, ship, anchors):
+        col, row = self._chunk(ship.x, ship.y)
+        if not anchors or any(max(abs(col - c), abs(row - r)) <= self.wake_radius
+                              for c, r in (self._chunk(x, y) for x, y in anchors)):
+            self.active.append(ship)
+            if len(self.active) > 1 and self.active[-2].id > ship.id:
+                self.active.sort(key=lambda s: s.id)
+        else:
+            self._sleep(ship, (col, row))
+
+    # Forget a (removed) ship.
+    def remove(self, ship):
+        chunk = self._sleeping_chunk.pop(ship.id, None)
+        if chunk is None:
+            self.active.remove(ship)
+        else:
+            self.sleeping[chunk].remove(ship)
+            if not self.sleeping[chunk]:
+                del self.sleeping[chunk]
+
+    def _sleep(self, ship, chunk):
+        self.sleeping.setdefault(chunk, []).append(ship)
+        self._sleeping_chunk[ship.id] = chunk
+
+    # Update the region for the anchor positions [(x, y), ...] of the players and
+    # return the active ships. Without anchors (no player left) nothing changes.
+    def update(self, anchors, store):
+        if not anchors or self.everywhere:
+            return self.active
+        anchor_chunks = [self._chunk(x, y) for x, y in anchors]
+
+        # Put the active ships that are too far from every anchor to sleep
+        if 0 < len(self.active) <= self.SMALL_COUNT:
+            self._sleep_far_small(anchor_chunks, store)
+        elif self.active:
+            slots = [ship.slot for ship in self.active]
+            cols = (store.x[slots] // self.chunk_size).astype(int)
+            rows = (store.y[slots] // self.chunk_size).astype(int)
+            near = np.zeros(len(slots), dtype=bool)
+            for c, r in anchor_chunks:
+                near |= np.maximum(np.abs(cols - c), np.abs(rows - r)) <= self.sleep_radius
+            if not near.all():
+                for i in np.flatnonzero(~near).tolist():
+                    self._sleep(self.active[i], (int(cols[i]), int(rows[i])))
+                self.put_to_sleep += int((~near).sum())
+                self.active = [ship for ship, keep in zip(self.active, near.tolist()) if keep]
+
+        # Wake the ships in the chunks around the anchors
+        if not self.sleeping:
+            return self.active
+        woken = []
+        radius = self.wake_radius
+        for c, r in anchor_chunks:
+            for col in range(c - radius, c + radius + 1):
+                for row in range(r - radius, r + radius + 1):
+                    ships = self.sleeping.pop((col, row), None)
+                    if ships:
+                        woken.extend(ships)
+        if woken:
+            for ship in woken:
+                del self._sleeping_chunk[ship.id]
+            self.woken += len(woken)
+            self.active.extend(woken)
+            self.active.sort(key=lambda ship: ship.id)
+        return self.active
+
+    # The sleep test of update() for a few active ships, one at a time.
+    def _sleep_far_small(self, anchor_chunks, store):
+        size, radius = self.chunk_size, self.sleep_radius
+        keep = []
+        for ship in self.active:
+            col, row = int(store.x.item(ship.slot) // size), int(store.y.item(ship.slot) // size)
+            if any(max(abs(col - c), abs(row - r)) <= radius for c, r in anchor_chunks):
+                keep.append(ship)
+            else:
+                self._sleep(ship, (col, row))
+                self.put_to_sleep += 1
+        if len(keep) < len(self.active):
+            self.active = keep
@@ -2,12 +2,19 @@
 import requests
 import time
 import json
+import sys
 from dummy_agent import DummyAgent  # Import the DummyAgent class
+from events import EventBus, LogSubscriber
+from labyrinth_compiler import load_labyrinth
+from ring_log import logger
 
 SERVER_URL = "http://localhost:8000"  # Adjust if necessary
 
-# Initialize the DummyAgent
-agent = DummyAgent(ship_index=0)  # Assuming this agent controls ship 0
+# Initialize the DummyAgent; its decisions go to the log (agent, debug level)
+events = EventBus()
+events.subscribe(LogSubscriber())
+agent = DummyAgent(ship_index=0, events=events)  # Assuming this agent controls ship 0
+WALLS = load_labyrinth().rects()  # Same compiled labyrinth as the engine and the server
 
 def get_game_state():
     try:
@@ -15,7 +22,7 @@ def get_game_state():
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Error getting game state: {e}")
+        logger.error("agent", "Error getting game state: %s", e)
         return None
 
 def send_agent_actions(actions):
@@ -23,29 +30,29 @@ def send_agent_actions(actions):
         response = requests.post(f"{SERVER_URL}/decide/", json=actions)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        print(f"Error sending agent actions: {e}")
+        logger.error("agent", "Error sending agent actions: %s", e)
 
 def main():
+    logger.start(sys.stdout)  # Log output is written by a background thread
     while True:
         game_state_data = get_game_state()
         if game_state_data:
             try:
                 # The server's /game_state endpoint returns a dictionary
                 # We need to ensure it matches what the DummyAgent expects.
-                # Assuming the keys are 'ships' and 'walls'.
+                # The walls come from the compiled labyrinth, not from the server.
                 game_state = game_state_data
-                walls = game_state.get("walls", [])  # Extract walls
+                walls = WALLS
 
                 # The DummyAgent's decide method expects the full game state dictionary and the list of walls
                 actions = agent.decide(game_state, walls)
+                events.flush()
                 send_agent_actions(actions)
                 #time.sleep(0.1)  # Optional: Add a small delay
             except Exception as e:
-                print(f"Error processing game state or deciding actions: {e}")
-                print(traceback.format_exc()) # Good practice to include traceback
+                logger.error("agent", "Error processing game state or deciding actions: %s", e, exc_info=True)
         #else:
         #    time.sleep(1) # Wait and retry if game state couldn't be fetched
 
 if __name__ == "__main__":
-    import traceback
     main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+# ------------------------
+# AgentRegistry Class
+# ------------------------
+
+# Keeps one controller (agent) per ship for the whole match, addressed by the
+# ship's stable ID. Agents are created once when they are bound, so they keep
+# their state (and anything they cache) from tick to tick. Any ship can be
+# bound, the player as well as enemies; a bound enemy is driven by its agent
+# instead of the enemy AI.
+#
+# An agent is any object with decide(game_state, walls) -> {"rotate", "thrust",
+# "shoot"}; an optional reset() is called by AgentRegistry.reset() when a match
+# restarts.
+class AgentRegistry:
+    # factory(ship_id) creates the agent for bind(ship_id) without an agent.
+    def __init__(self, factory=None):
+        self.factory = factory
+        self.agents = {}  # Ship ID -> agent
+
+    # Bind an agent (or a new one from the factory) to a ship and return it.
+    def bind(self, ship_id, agent=None):
+        if agent is None:
+            if self.factory is None:
+                raise ValueError("No agent given and no factory to create one")
+            agent = self.factory(ship_id)
+        self.agents[ship_id] = agent
+        return agent
+
+    def unbind(self, ship_id):
+        return self.agents.pop(ship_id, None)
+
+    def get(self, ship_id, default=None):
+        return self.agents.get(ship_id, default)
+
+    def __contains__(self, ship_id):
+        return ship_id in self.agents
+
+    def __len__(self):
+        return len(self.agents)
+
+    # Let every agent whose ship still exists (is_alive(ship_id)) decide on the
+    # same game state; agents of removed ships are unbound.
+    # Returns {ship_id: actions}.
+    def decide(self, game_state, walls, is_alive):
+        actions = {}
+        for ship_id, agent in list(self.agents.items()):
+            if not is_alive(ship_id):
+                del self.agents[ship_id]
+                continue
+            actions[ship_id] = agent.decide(game_state, walls)
+        return actions
+
+    # Restart all agents (for a new match on the same ships).
+    def reset(self):
+        for agent in self.agents.values():
+            reset = getattr(agent, "reset", None)
+            if reset is not None:
+                reset()
@@ -0,0 +1,160 @@
+import math
+import time
+
+# ------------------------
+# AIScheduler Class
+# ------------------------
+
+# Time-slices the enemy AI (level of detail). A decision (line of sight, chasing,
+# shooting, wall avoidance) is the expensive part of an enemy; with a
+# time_budget the scheduler only lets an enemy decide when it is due, depending
+# on its tier:
+#
+#     near: closer than near_distance to the player, or the player was visible at
+#           its last decision -> every tick
+#     mid:  closer than mid_distance -> every mid_interval ticks
+#     far:  everything else -> every far_interval ticks
+#
+# In between, the enemy repeats the steering (turn and thrust) of its last
+# decision; it only shoots when it decides. The ticks of the enemies of one tier
+# are staggered by their ID, so their decisions spread over the interval.
+#
+# With time_budget (seconds per tick), mid and far decisions also stop once the
+# AI has used up the budget in this tick. They are deferred to the next tick
+# (ahead of the enemies that are due then) and counted in deferred. Near
+# decisions always run, and so does the first mid/far decision of a tick.
+# The enemies decide in batches: a batch holds as many decisions as the rest of
+# the budget fits at the average time of a decision, and the budget is checked
+# between batches, so every enemy handed to prepare() also decides.
+# Without a budget (the default, e.g. headless.py) tiering is off: every enemy
+# decides every tick, exactly like before the scheduler, and the tiers are only
+# counted in decisions. main() sets a budget when all enemies think.
+class AIScheduler:
+    NEAR, MID, FAR = 0, 1, 2
+
+    def __init__(self, near_distance=800, mid_distance=2000, mid_interval=3, far_interval=10, time_budget=None):
+        self.near_distance = near_distance
+        self.mid_distance = mid_distance
+        self.intervals = (1, mid_interval, far_interval)
+        self.time_budget = time_budget
+        self.tick = 0
+        self.steering = {}  # Enemy ID -> (turn, thrust_x, thrust_y) of its last decision
+        self.visible = {}  # Enemy ID -> player visible at its last decision
+        self.overdue = {}  # Enemy ID -> tick since which a deferred decision is waiting
+        # Counters (never reset; compare two readings for a rate)
+        self.decisions = [0, 0, 0]  # Decisions per tier
+        self.reused = 0  # Ticks in which an enemy repeated its last steering
+        self.deferred = 0  # Decisions postponed because the time budget was used up
+        self.last_time = 0.0  # Seconds spent in the last run()
+        self.decision_time = 0.0  # Seconds per decision (moving average, sizes the batches)
+
+    def tier(self, enemy, player):
+        if self.visible.get(enemy.id):
+            return self.NEAR
+        distance = math.hypot(enemy.x - player.x, enemy.y - player.y)
+        if distance < self.near_distance:
+            return self.NEAR
+        return self.MID if distance < self.mid_distance else self.FAR
+
+    # Run one tick of AI for the enemies. decide(enemy) makes a full decision and
+    # returns (turn, thrust_x, thrust_y, visible): the steering to repeat until
+    # the next decision and whether the player was in sight. prepare(enemies), if
+    # given, is called with every batch of enemies before they decide (e.g. to
+    # cast their lines of sight together); without a budget there is one batch.
+    def run(self, enemies, player, decide, prepare=None):
+        start = time.perf_counter()
+        self.tick += 1
+        if self.time_budget is None:
+            self._run_all(enemies, player, decide, prepare)
+        else:
+            self._run_budget(start, enemies, player, decide, prepare)
+
+        if self.tick % 600 == 0:  # Forget the enemies that are gone
+            ids = {enemy.id for enemy in enemies}
+            for table in (self.steering, self.visible, self.overdue):
+                for enemy_id in [i for i in table if i not in ids]:
+                    del table[enemy_id]
+        self.last_time = time.perf_counter() - start
+
+    # Without a budget every enemy decides, near before mid before far, in one
+    # batch; nothing is timed or deferred.
+    def _run_all(self, enemies, player, decide, prepare):
+        queue = sorted(((self.tier(enemy, player), enemy) for enemy in enemies), key=lambda item: item[0])
+        if not queue:
+            return
+        if prepare is not None:
+            prepare([enemy for _, enemy in queue])
+        for tier, enemy in queue:
+            self._decide(enemy, tier, decide)
+
+    # With a budget: the due enemies decide in timed batches, the rest repeats
+    # its steering or is deferred. start is when run() began.
+    def _run_budget(self, start, enemies, player, decide, prepare):
+        due = [[], [], []]  # Per tier, the enemies that decide this tick
+        for enemy in enemies:
+            tier = self.tier(enemy, player)
+            if (tier == self.NEAR or enemy.id not in self.steering
+                    or enemy.id in self.overdue or (self.tick + enemy.id) % self.intervals[tier] == 0):
+                due[tier].append(enemy)
+            else:
+                self._repeat(enemy)
+
+        # Near first, then mid before far; within a tier, the longest waiting
+        # first. At least one mid/far enemy decides every tick, so deferred
+        # enemies cannot starve.
+        queue = [(self.NEAR, enemy) for enemy in due[self.NEAR]]
+        for tier in (self.MID, self.FAR):
+            due[tier].sort(key=lambda enemy: self.overdue.get(enemy.id, self.tick))
+            queue.extend((tier, enemy) for enemy in due[tier])
+        near = len(due[self.NEAR])
+        decided = 0
+        while decided < len(queue):
+            elapsed = time.perf_counter() - start
+            if decided > near and elapsed > self.time_budget:
+                break
+            fits = int((self.time_budget - elapsed) / self.decision_time) if self.decision_time else 0
+            waiting_near = max(near - decided, 0)
+            count = waiting_near + max(1, fits - waiting_near)
+            batch = queue[decided:decided + count]
+            batch_start = time.perf_counter()
+            if prepare is not None:
+                prepare([enemy for _, enemy in batch])
+            for tier, enemy in batch:
+                self._decide(enemy, tier, decide)
+            average = (time.perf_counter() - batch_start) / len(batch)
+            self.decision_time = average if not self.decision_time else 0.8 * self.decision_time + 0.2 * average
+            decided += len(batch)
+        for _, enemy in queue[decided:]:
+            self.overdue.setdefault(enemy.id, self.tick)
+            self.deferred += 1
+            self._repeat(enemy)
+
+    def _decide(self, enemy, tier, decide):
+        turn, thrust_x, thrust_y, visible = decide(enemy)
+        self.steering[enemy.id] = (turn, thrust_x, thrust_y)
+        self.visible[enemy.id] = visible
+        self.overdue.pop(enemy.id, None)
+        self.decisions[tier] += 1
+
+    # Repeat the last steering command of the enemy.
+    def _repeat(self, enemy):
+        steering = self.steering.get(enemy.id)
+        if steering is None:
+            return
+        turn, thrust_x, thrust_y = steering
+        if turn:
+            enemy.rotate(turn)
+        enemy.store.ax[enemy.slot] += thrust_x
+        enemy.store.ay[enemy.slot] += thrust_y
+        self.reused += 1
+
+    # Counters as a dictionary (for logging).
+    def stats(self):
+        return {
+            "decisions_near": self.decisions[self.NEAR],
+            "decisions_mid": self.decisions[self.MID],
+            "decisions_far": self.decisions[self.FAR],
+            "reused": self.reused,
+            "deferred": self.deferred,
+            "last_time": self.last_time,
+        }
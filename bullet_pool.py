@@ -0,0 +1,144 @@
+import math
+
+import numpy as np
+
+from ship_store import FRAME_DT
+from spatial_hash import SMALL_COUNT as PAIR_SMALL_COUNT, segment_pairs
+
+# ------------------------
+# BulletPool Class
+# ------------------------
+
+# This class stores all bullets in fixed-size NumPy arrays instead of one
+# Bullet object per shot. spawn() writes a new bullet into a free slot,
+# advance() moves every living bullet in one step and expire() frees all
+# bullets selected by a mask. When the pool is full, the bullet closest to
+# the end of its lifespan is replaced.
+# For a few bullets the _few methods do the same on plain floats, one bullet
+# at a time (see GameEngine._update_few_bullets).
+class BulletPool:
+    HALF_SIZE = 3  # Bullets are 6x6 boxes
+
+    def __init__(self, capacity=4096, world_width=2000, world_height=2000):
+        self.capacity = capacity
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position before the last advance()
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.lifespan = np.zeros(capacity)  # Remaining lifespan in frames (fractions after steps of other lengths)
+        self.owner = np.zeros(capacity, dtype=np.int64)  # Ship ID of the shooter
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    # Slots of all living bullets.
+    def active(self):
+        return np.flatnonzero(self.alive)
+
+    # Add a bullet flying in the direction of angle and return its slot.
+    def spawn(self, x, y, angle, owner, speed=15, lifespan=60):  # Lifespan in frames (1 second at 60 FPS)
+        if self.free:
+            slot = self.free.pop()
+        else:
+            # Pool is full: reuse the bullet that would expire first
+            slot = int(np.argmin(self.lifespan))
+        rad = math.radians(angle)
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.vx[slot] = math.cos(rad) * speed
+        self.vy[slot] = math.sin(rad) * speed
+        self.angle[slot] = angle
+        self.lifespan[slot] = lifespan
+        self.owner[slot] = owner
+        self.alive[slot] = True
+        return slot
+
+    # Move the given bullets (all living bullets if None) by their velocity
+    # for dt seconds and decrease their lifespan accordingly. With dt > FRAME_DT
+    # the bullets cover several frames in one step; the swept collision tests
+    # below cover the whole path, and a ship only counts as hit if the bullet
+    # reaches it before the first wall on that path (see GameEngine._update_bullets).
+    def advance(self, idx=None, dt=FRAME_DT):
+        if idx is None:
+            idx = self.active()
+        frames = dt / FRAME_DT
+        self.prev_x[idx] = self.x[idx]
+        self.prev_y[idx] = self.y[idx]
+        self.x[idx] += self.vx[idx] * frames
+        self.y[idx] += self.vy[idx] * frames
+        self.lifespan[idx] -= frames
+        return idx
+
+    # advance() for a list of slots, one bullet at a time (same float operations).
+    # Returns the path (x0, y0, x1, y1) of each bullet during this step.
+    def advance_few(self, slots, dt=FRAME_DT):
+        frames = dt / FRAME_DT
+        paths = []
+        for slot in slots:
+            x0, y0 = self.x.item(slot), self.y.item(slot)
+            x1, y1 = x0 + self.vx.item(slot) * frames, y0 + self.vy.item(slot) * frames
+            self.prev_x[slot], self.prev_y[slot] = x0, y0
+            self.x[slot], self.y[slot] = x1, y1
+            self.lifespan[slot] -= frames
+            paths.append((x0, y0, x1, y1))
+        return paths
+
+    # True if the bullets of this step are few enough for the _few methods: the
+    # array tests below would look at them one by one anyway (see
+    # WallGrid.segments_hit and spatial_hash.segment_pairs), so both give the same results.
+    def is_few(self, ship_count, wall_grid):
+        count = len(self)
+        return count <= wall_grid.SMALL_COUNT and count * ship_count <= PAIR_SMALL_COUNT
+
+    # Mask of the given bullets that left the world or whose lifespan is over.
+    def expired(self, idx):
+        x, y = self.x[idx], self.y[idx]
+        inside = (x >= 0) & (x <= self.world_width) & (y >= 0) & (y <= self.world_height)
+        return ~inside | (self.lifespan[idx] <= 0)
+
+    # expired() for one bullet.
+    def is_expired(self, slot):
+        x, y = self.x.item(slot), self.y.item(slot)
+        inside = 0 <= x <= self.world_width and 0 <= y <= self.world_height
+        return not inside or self.lifespan.item(slot) <= 0
+
+    # For the given bullets, where (t from 0 = previous to 1 = current position)
+    # their 6x6 box (HALF_SIZE around the center) first touched a wall of the
+    # WallGrid during the last advance(); inf for bullets that touched none.
+    def hits_walls(self, idx, wall_grid):
+        return wall_grid.segments_hit(self.prev_x[idx], self.prev_y[idx], self.x[idx], self.y[idx], self.HALF_SIZE)
+
+    # hits_walls() for one path of advance_few().
+    def hits_wall(self, path, wall_grid):
+        return wall_grid.segment_hit(*path, self.HALF_SIZE)
+
+    # (bullet, ship, t) arrays for the ships at (xs, ys) that came closer than
+    # radius to the path of a bullet during the last advance(); t is where on the
+    # path the bullet first came that close. For a few bullets and ships all
+    # pairs are tested directly; otherwise ship_hash (a SpatialHash) is built
+    # from the ship positions first.
+    def hits_ships(self, idx, xs, ys, radius, ship_hash):
+        x0, y0, x1, y1 = self.prev_x[idx], self.prev_y[idx], self.x[idx], self.y[idx]
+        if len(idx) * len(xs) <= ship_hash.BRUTE_FORCE_LIMIT:
+            return segment_pairs(x0, y0, x1, y1, xs, ys, radius)
+        ship_hash.build(xs, ys)
+        return ship_hash.segment_pairs_within(x0, y0, x1, y1, radius)
+
+    # Free the bullets idx[mask].
+    def expire(self, idx, mask):
+        dead = idx[mask]
+        self.alive[dead] = False
+        self.free.extend(dead.tolist())
+
+    # expire() for a list of slots (in increasing order, like idx[mask]).
+    def expire_few(self, slots):
+        for slot in slots:
+            self.alive[slot] = False
+        self.free.extend(slots)
@@ -0,0 +1,140 @@
+import heapq
+import math
+import random
+from collections import deque
+
+import pygame
+
+from wall_grid import WallGrid, rect_blocked
+
+# ------------------------
+# CoinField Class
+# ------------------------
+
+# All coins of a game, sorted into a uniform grid of cells (like the walls in
+# wall_grid.py, but coins come and go). A pickup only looks at the coins in the
+# cells a ship touches, removing a coin is O(1) (the last coin takes its place
+# in the coins list), and nearest_coins() searches the cells ring by ring
+# around a point instead of sorting all coins.
+#
+# Collected coins come back after respawn_delay ticks at a new random position
+# that is not inside a wall, so long games do not run out of coins.
+class CoinField:
+    COIN_HALF_SIZE = 5  # Coins are 10x10 boxes around their center
+
+    def __init__(self, coins, walls, world_width=2000, world_height=2000, cell_size=100, respawn_delay=300):
+        self.walls = walls
+        self.world_width = world_width
+        self.world_height = world_height
+        self.cell_size = cell_size
+        self.respawn_delay = respawn_delay  # In ticks; None: coins never come back
+        self.coins = []  # Coins that can be collected, in no particular order
+        self.cells = {}  # (col, row) -> coins in that cell
+        self._position = {}  # coin -> position in self.coins
+        self.respawns = deque()  # (tick, coin), in the order the coins are due
+        self.tick = 0
+        for coin in coins:
+            self.add(coin)
+
+    def __len__(self):
+        return len(self.coins)
+
+    def __iter__(self):
+        return iter(self.coins)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    # Put a coin on the field.
+    def add(self, coin):
+        self._position[coin] = len(self.coins)
+        self.coins.append(coin)
+        self.cells.setdefault(self._cell(coin.x, coin.y), []).append(coin)
+
+    # Take a coin off the field (swap-and-pop in the coins list).
+    def remove(self, coin):
+        position = self._position.pop(coin)
+        last = self.coins.pop()
+        if last is not coin:
+            self.coins[position] = last
+            self._position[last] = position
+        cell = self._cell(coin.x, coin.y)
+        self.cells[cell].remove(coin)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    # Collect the coins touched by the ships (20x20 boxes around the given centers).
+    # Returns the number of coins each ship collected; a coin touched by several
+    # ships goes to the first of them.
+    def collect(self, positions, half_size=10):
+        counts = []
+        reach = half_size + self.COIN_HALF_SIZE
+        for x, y in positions:
+            ship_rect = pygame.Rect(x - half_size, y - half_size, 2 * half_size, 2 * half_size)
+            c0, r0 = self._cell(ship_rect.x - reach, ship_rect.y - reach)
+            c1, r1 = self._cell(ship_rect.right + reach, ship_rect.bottom + reach)
+            collected = [coin
+                         for col in range(c0, c1 + 1)
+                         for row in range(r0, r1 + 1)
+                         for coin in self.cells.get((col, row), ())
+                         if coin.collides_with(ship_rect)]
+            for coin in collected:
+                self.remove(coin)
+                if self.respawn_delay is not None:
+                    self.respawns.append((self.tick + self.respawn_delay, coin))
+            counts.append(len(collected))
+        return counts
+
+    # Advance the respawn timer by ticks (one by default, fractions for steps
+    # of other lengths) and bring back the coins that are due.
+    def update(self, ticks=1):
+        self.tick += ticks
+        while self.respawns and self.respawns[0][0] <= self.tick:
+            _, coin = self.respawns.popleft()
+            coin.x, coin.y = self._free_position()
+            self.add(coin)
+
+    # Random coin position that is not inside a wall (like generate_coins).
+    def _free_position(self):
+        if isinstance(self.walls, WallGrid):
+            return self.walls.free_space(self.COIN_HALF_SIZE, self.world_width, self.world_height).sample()
+        size = 2 * self.COIN_HALF_SIZE
+        while True:
+            x = random.randint(20, self.world_width - 20)
+            y = random.randint(20, self.world_height - 20)
+            if not rect_blocked(self.walls, pygame.Rect(x - self.COIN_HALF_SIZE, y - self.COIN_HALF_SIZE, size, size)):
+                return x, y
+
+    # The k coins closest to (x, y), nearest first.
+    def nearest_coins(self, x, y, k=1):
+        if k <= 0 or not self.coins:
+            return []
+        if k >= len(self.coins):
+            return sorted(self.coins, key=lambda coin: math.hypot(coin.x - x, coin.y - y))
+        col, row = self._cell(x, y)
+        # Cells that could hold coins (bounds of the occupied cells)
+        max_ring = max(max(abs(c - col), abs(r - row)) for c, r in self.cells)
+        found = []
+        for ring in range(max_ring + 1):
+            for cell in self._ring(col, row, ring):
+                found.extend(self.cells.get(cell, ()))
+            # Coins in the cells further out are at least ring * cell_size away
+            if len(found) >= k:
+                nearest = heapq.nsmallest(k, found, key=lambda coin: math.hypot(coin.x - x, coin.y - y))
+                if math.hypot(nearest[-1].x - x, nearest[-1].y - y) <= ring * self.cell_size:
+                    return nearest
+        return heapq.nsmallest(k, found, key=lambda coin: math.hypot(coin.x - x, coin.y - y))
+
+    # The cells at Chebyshev distance ring from (col, row).
+    @staticmethod
+    def _ring(col, row, ring):
+        if ring == 0:
+            return [(col, row)]
+        cells = []
+        for c in range(col - ring, col + ring + 1):
+            cells.append((c, row - ring))
+            cells.append((c, row + ring))
+        for r in range(row - ring + 1, row + ring):
+            cells.append((col - ring, r))
+            cells.append((col + ring, r))
+        return cells
@@ -1,11 +1,22 @@
 import random
 import math
 import time
-import pygame
+
+from events import DECISION
+from raycast import cast_rays
 
 class DummyAgent:
-    def __init__(self, ship_index):
+    # The agent controls the ship with the given ID (the "id" in the game state),
+    # or, for game states without IDs, the ship at ship_index.
+    # Decisions are reported as DECISION events on events (an EventBus), if given.
+    def __init__(self, ship_index=0, ship_id=None, events=None):
         self.ship_index = ship_index  # The index of the ship controlled by the agent
+        self.ship_id = ship_id  # The stable ID of the ship controlled by the agent
+        self.events = events
+        self.reset()
+
+    # Forget the state of the previous match (called by AgentRegistry.reset()).
+    def reset(self):
         self.last_direction_change = time.time()  # Track the last time the direction was changed
         self.current_rotation = 0  # Current rotation direction
 
@@ -19,20 +30,18 @@ class DummyAgent:
         }
         """
         # Get the agent's ship and the target ship
-        my_ship = game_state["ships"][self.ship_index]
-        target_ship = game_state["ships"][1 - self.ship_index]  # The other ship is the target
+        my_ship, target_ship = self._find_ships(game_state["ships"])
 
         # Extract positions and angles
         my_x, my_y, my_angle = my_ship["x"], my_ship["y"], my_ship["angle"]
-        target_x, target_y = target_ship["x"], target_ship["y"]
 
-        # Scan for enemies with the laser
-        enemy_detected = self._scan_with_laser(my_x, my_y, my_angle, target_x, target_y, walls)
+        # Scan for enemies with the laser and check for a wall right ahead
+        enemy_detected, wall_ahead = self._scan(my_x, my_y, my_angle, walls)
 
-        if enemy_detected:
+        if enemy_detected and target_ship is not None:
             # Calculate the angle to the enemy
-            dx = target_x - my_x
-            dy = target_y - my_y
+            dx = target_ship["x"] - my_x
+            dy = target_ship["y"] - my_y
             angle_to_enemy = math.degrees(math.atan2(dy, dx))
 
             # Calculate the shortest rotation direction
@@ -45,104 +54,43 @@ class DummyAgent:
             rotation = max(-max_rotation_speed, min(angle_difference, max_rotation_speed))
 
             # Rotate towards the enemy and shoot
-            print(f"Enemy detected! Rotating by {rotation:.2f} degrees and shooting.")
+            if self.events is not None and self.events.enabled:
+                self.events.emit(DECISION, ship_id=my_ship.get("id"), reason="enemy", rotate=rotation)
             return {"rotate": rotation, "thrust": 0.5, "shoot": True}
 
         # Check if there is a wall directly in front of the agent
-        if self._is_wall_ahead(my_x, my_y, my_angle, walls):
+        if wall_ahead:
             # Rotate randomly to avoid the wall
             self.current_rotation = random.choice([-1, 1]) * random.randint(90, 180)  # Random angle between 90 and 180 degrees
-            print(f"Wall ahead! Rotating by {self.current_rotation} degrees.")
+            if self.events is not None and self.events.enabled:
+                self.events.emit(DECISION, ship_id=my_ship.get("id"), reason="wall", rotate=self.current_rotation)
             return {"rotate": self.current_rotation, "thrust": 0, "shoot": False}
 
         # Add slow self-rotation
         slow_rotation = 1  # Very slow rotation (1 degree per frame)
         return {"rotate": slow_rotation, "thrust": 1, "shoot": False}
 
-    def _scan_with_laser(self, x, y, angle, target_x, target_y, walls):
+    # The agent's ship and its target (the first other ship, None if there is
+    # no other ship: the agent then only flies and avoids walls).
+    # Raises ValueError if the agent's own ship is not in the game state.
+    def _find_ships(self, ships):
+        if self.ship_id is None:
+            target_ship = ships[1 - self.ship_index] if len(ships) > 1 else None  # The other ship is the target
+            return ships[self.ship_index], target_ship
+        my_ship = next((ship for ship in ships if ship.get("id") == self.ship_id), None)
+        if my_ship is None:
+            raise ValueError(f"Ship {self.ship_id} is not in the game state")
+        target_ship = next((ship for ship in ships if ship is not my_ship), None)
+        return my_ship, target_ship
+
+    def _scan(self, x, y, angle, walls):
         """
-        Scans for enemies with a laser and returns True if the enemy is detected.
+        Casts both lasers in one call and returns (enemy_detected, wall_ahead):
+        the long laser detects the enemy unless a wall blocks it, the short one
+        checks if there is a wall directly in front of the agent.
         """
-        laser_length = 1000  # Long range for enemy detection
-        rad = math.radians(angle)
-        laser_end_x = x + math.cos(rad) * laser_length
-        laser_end_y = y + math.sin(rad) * laser_length
-
-        # Optimization: Only check walls within a radius
-        close_walls = []
-        check_radius = 2000  # Adjust this radius as needed
-        for wall in walls:
-            if math.hypot(x - (wall.x + wall.width / 2), y - (wall.y + wall.height / 2)) < check_radius:
-                close_walls.append(wall)
-
-        for wall in close_walls:
-            if self._line_intersects_rect(x, y, laser_end_x, laser_end_y, {"x": wall.x, "y": wall.y, "width": wall.width, "height": wall.height}):
-                return False  # Laser is blocked
-
-        return True  # Enemy is visible
-
-    @staticmethod
-    def _line_intersects_rect(x1, y1, x2, y2, rect):
-        # Checks if a line intersects a rectangle
-        rect_lines = [
-            ((rect["x"], rect["y"]), (rect["x"] + rect["width"], rect["y"])),
-            ((rect["x"] + rect["width"], rect["y"]), (rect["x"] + rect["width"], rect["y"] + rect["height"])),
-            ((rect["x"] + rect["width"], rect["y"] + rect["height"]), (rect["x"], rect["y"] + rect["height"])),
-            ((rect["x"], rect["y"] + rect["height"]), (rect["x"], rect["y"]))
-        ]
-        for (rx1, ry1), (rx2, ry2) in rect_lines:
-            if DummyAgent._line_intersects_line(x1, y1, x2, y2, rx1, ry1, rx2, ry2):
-                return True
-        return False
-
-    @staticmethod
-    def _line_intersects_line(x1, y1, x2, y2, x3, y3, x4, y4):
-        # Checks if two lines intersect
-        def ccw(a, b, c):
-            return (c[1] - a[1]) * (b[0] - a[0]) > (b[1] - a[1]) * (c[0] - a[0])
-
-        return ccw((x1, y1), (x3, y3), (x4, y4)) != ccw((x2, y2), (x3, y3), (x4, y4)) and ccw((x1, y1), (x2, y2), (x3, y3)) != ccw((x1, y1), (x2, y2), (x4, y4))
-
-    @staticmethod
-    def _get_intersection_point(x1, y1, x2, y2, rect):
-        # Convert pygame.Rect to dictionary if necessary
-        if isinstance(rect, pygame.Rect):
-            rect = {"x": rect.x, "y": rect.y, "width": rect.width, "height": rect.height}
-
-        # Calculates the intersection point of a line with a rectangle
-        rect_lines = [
-            ((rect["x"], rect["y"]), (rect["x"] + rect["width"], rect["y"])),
-            ((rect["x"] + rect["width"], rect["y"]), (rect["x"] + rect["width"], rect["y"] + rect["height"])),
-            ((rect["x"] + rect["width"], rect["y"] + rect["height"]), (rect["x"], rect["y"] + rect["height"])),
-            ((rect["x"], rect["y"] + rect["height"]), (rect["x"], rect["y"]))
-        ]
-        for (rx1, ry1), (rx2, ry2) in rect_lines:
-            denom = (x1 - x2) * (ry1 - ry2) - (y1 - y2) * (rx1 - rx2)
-            if denom == 0:
-                continue
-            t = ((x1 - rx1) * (ry1 - ry2) - (y1 - ry1) * (rx1 - rx2)) / denom
-            u = -((x1 - x2) * (y1 - ry1) - (y1 - y2) * (x1 - rx1)) / denom
-            if 0 <= t <= 1 and 0 <= u <= 1:
-                return x1 + t * (x2 - x1), y1 + t * (y2 - y1)
-        return x2, y2  # Default to the end of the line if no intersection is found
-
-    def _is_wall_ahead(self, x, y, angle, walls):
-        """
-        Checks if there is a wall directly in front of the agent.
-        """
-        laser_length = 10  # Short range to check for walls ahead
-        rad = math.radians(angle)
-        laser_end_x = x + math.cos(rad) * laser_length
-        laser_end_y = y + math.sin(rad) * laser_length
-
-        # Optimization: Only check walls within a radius
-        close_walls = []
-        check_radius = 50  # Check only walls very close ahead
-        for wall in walls:
-            if math.hypot(x - (wall.x + wall.width / 2), y - (wall.y + wall.height / 2)) < check_radius:
-                close_walls.append(wall)
-
-        for wall in close_walls:
-            if self._line_intersects_rect(x, y, laser_end_x, laser_end_y, {"x": wall.x, "y": wall.y, "width": wall.width, "height": wall.height}):
-                return True
-        return False
+        lengths = (1000, 10)  # Long range for enemy detection, short range for walls ahead
+        check_radius = (2000, 50)  # Only walls within these radii are checked
+        hits = cast_rays(walls, x, y, (angle, angle), lengths, max_dist=check_radius)
+        blocked, ahead = (hits.wall >= 0).tolist()
+        return not blocked, ahead
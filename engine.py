@@ -4,8 +4,23 @@ import math
 import random
 import requests  # Import the requests library
 import json
+import sys
+import numpy as np
 
 from dummy_agent import DummyAgent  # Import the DummyAgent class
+from ship_store import ShipStore, SingleShipStore, FRAME_DT
+from bullet_pool import BulletPool
+from wall_grid import WallGrid, walls_near, rect_blocked
+from spatial_hash import SpatialHash, segment_circle_entry
+from entity_registry import EntityRegistry
+from coin_field import CoinField
+from active_region import ActiveRegion
+from ai_scheduler import AIScheduler
+from agent_registry import AgentRegistry
+from raycast import SMALL_COUNT, cast_ray, cast_segments, line_of_sight
+from ring_log import logger
+from events import EventBus, LogSubscriber, HIT, KILL, COIN_COLLECTED, SPAWN, SHOT
+from labyrinth_compiler import DEFAULT_LAYOUT, load_labyrinth
 
 # ------------------------
 # SpaceObject Class (Physics)
@@ -14,39 +29,83 @@ from dummy_agent import DummyAgent  # Import the DummyAgent class
 # This class represents the ships and their physics in the game.
 # It handles the position, velocity, rotation, and collision with walls.
 # The ships can move, rotate, and apply thrust. The class also manages the health points (HP) of the ships.
+# The physics state itself lives in a ShipStore (ship_store.py); a SpaceObject is a thin
+# view on one slot of it. Ships created without a store get a private SingleShipStore.
+# The world bounds belong to the store (and the GameEngine), not to every ship.
+
+# Property that reads/writes one column of the ship's store.
+def _store_column(name):
+    def getter(self):
+        return getattr(self.store, name).item(self.slot)  # Plain Python int/float
+
+    def setter(self, value):
+        getattr(self.store, name)[self.slot] = value
+    return property(getter, setter)
+
+# An integral float as an int, anything else unchanged.
+def _plain_number(value):
+    return int(value) if float(value).is_integer() else value
+
 class SpaceObject:
-    
-    def __init__(self, x, y, angle=0, velocity_x=0, velocity_y=0, hp=100, WORLD_WIDTH=2000, WORLD_HEIGHT=2000):
-        self.WORLD_WIDTH = WORLD_WIDTH
-        self.WORLD_HEIGHT = WORLD_HEIGHT
-        self.x = x
-        self.y = y
-        self.angle = angle
-        self.vx = velocity_x  # Initial velocity
-        self.vy = velocity_y
-        self.hp = hp  # Health points
-    
+    x = _store_column("x")
+    y = _store_column("y")
+    vx = _store_column("vx")
+    vy = _store_column("vy")
+    angle = _store_column("angle")
+    hp = _store_column("hp")  # Health points
+    max_speed = _store_column("max_speed")
+    __slots__ = ("store", "slot", "id")  # No per-instance __dict__
+
+    def __init__(self, x, y, angle=0, velocity_x=0, velocity_y=0, hp=100, WORLD_WIDTH=2000, WORLD_HEIGHT=2000, store=None):
+        if store is None:
+            store = SingleShipStore(world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT)
+        self.store = store
+        self.slot = store.add(x, y, angle, velocity_x, velocity_y, hp)  # Initial velocity
+        self.id = None  # Stable ID, set by the GameEngine's entity registry
+
+    # World size (read-only, from the store)
+    @property
+    def WORLD_WIDTH(self):
+        return self.store.world_width
+
+    @property
+    def WORLD_HEIGHT(self):
+        return self.store.world_height
+
+    # Move the ship out of its (shared) store into a private one, so the slot can be
+    # reused while this object stays readable (e.g. a removed ship's final HP).
+    def detach(self):
+        store = SingleShipStore(world_width=self.store.world_width, world_height=self.store.world_height)
+        slot = store.add(self.x, self.y, self.angle, self.vx, self.vy, self.hp, self.max_speed)
+        store.ax[slot], store.ay[slot] = self.store.ax.item(self.slot), self.store.ay.item(self.slot)
+        self.store.remove(self.slot)
+        self.store, self.slot = store, slot
+
+    # Give the slot back to the store without keeping the state (cheaper than
+    # detach() for ships that go back into a pool); reuse the object with reset().
+    def release(self):
+        self.store.remove(self.slot)
+        self.slot = None
+
+    # Turn a released ship into a new ship in store (see GameEngine.ship_pool).
+    def reset(self, x, y, angle=0, velocity_x=0, velocity_y=0, hp=100, store=None):
+        if store is None:
+            store = SingleShipStore(world_width=self.WORLD_WIDTH, world_height=self.WORLD_HEIGHT)
+        self.store = store
+        self.slot = store.add(x, y, angle, velocity_x, velocity_y, hp)
+
     # Update the position of the ship based on its velocity and angle.
-    # The ship's velocity is affected by friction, and it is clamped to a maximum speed.    
-    def update_position(self, is_enemy=False):
-        max_speed = 8 if not is_enemy else 3  # Player: 8, Enemy: 5
-        friction = 0.99  # Friction effect
-        self.vx *= friction
-        self.vy *= friction
-        self.vx = max(-max_speed, min(self.vx, max_speed))
-        self.vy = max(-max_speed, min(self.vy, max_speed))
-        self.x += self.vx
-        self.y += self.vy
-        self.x = max(0, min(self.x, self.WORLD_WIDTH))
-        self.y = max(0, min(self.y, self.WORLD_HEIGHT))
-        #print(f"Ship position updated to ({self.x}, {self.y}) with velocity ({self.vx}, {self.vy})")
+    # The ship's velocity is affected by friction, and it is clamped to a maximum speed.
+    # GameEngine.update moves all ships at once with ShipStore.integrate instead.
+    # dt is the length of the step in seconds (one frame by default).
+    def update_position(self, is_enemy=False, dt=FRAME_DT):
+        self.max_speed = 8 if not is_enemy else 3  # Player: 8, Enemy: 3
+        self.store.integrate([self.slot], dt=dt)
 
     # Apply thrust in the direction of the ship's angle.
-    # The thrust amount is added to the ship's velocity in the x and y directions.
+    # The thrust is added to the ship's velocity on the next position update.
     def thrust(self, amount):
-        rad = math.radians(self.angle)
-        self.vx += math.cos(rad) * amount
-        self.vy += math.sin(rad) * amount
+        self.store.thrust(self.slot, amount)
 
     ## Rotate the ship by a specified number of degrees.
     # The angle is clamped to the range [0, 360) degrees.
@@ -56,35 +115,40 @@ class SpaceObject:
     # Get the current state of the ship, including position, velocity, and angle.
     # This is useful for saving or sending the state of the ship.
     # The state is returned as a dictionary.
+    # Whole numbers come back as ints (a spawned ship, a ship pushed out of a wall),
+    # like the attributes did before the state moved into the float store.
     def get_state(self):
+        store, slot = self.store, self.slot
         return {
-            "x": self.x,
-            "y": self.y,
-            "vx": self.vx,
-            "vy": self.vy,
-            "angle": self.angle,
+            "x": _plain_number(store.x.item(slot)),
+            "y": _plain_number(store.y.item(slot)),
+            "vx": _plain_number(store.vx.item(slot)),
+            "vy": _plain_number(store.vy.item(slot)),
+            "angle": _plain_number(store.angle.item(slot)),
         }
         
     # Check for collision with walls.
     # If a collision is detected, the ship's position and velocity are adjusted accordingly.
     # The ship is moved back to the edge of the wall, and its velocity is set to zero.
 
+    # The position is read from the store once and only written back on a hit.
     def check_wall_collision(self, walls):
-        ship_rect = pygame.Rect(self.x - 10, self.y - 10, 20, 20)  # Size of the ship
-        for wall in walls:
+        x, y = self.store.x.item(self.slot), self.store.y.item(self.slot)
+        ship_rect = pygame.Rect(x - 10, y - 10, 20, 20)  # Size of the ship
+        for wall in walls_near(walls, ship_rect):
             if ship_rect.colliderect(wall):
                 # Bounce back based on direction
-                if self.x < wall.x:  # Left of the wall
-                    self.x = wall.x - 10
+                if x < wall.x:  # Left of the wall
+                    x = self.x = wall.x - 10
                     self.vx = 0
-                elif self.x > wall.x + wall.width:  # Right of the wall
-                    self.x = wall.x + wall.width + 10
+                elif x > wall.x + wall.width:  # Right of the wall
+                    x = self.x = wall.x + wall.width + 10
                     self.vx = 0
-                if self.y < wall.y:  # Above the wall
-                    self.y = wall.y - 10
+                if y < wall.y:  # Above the wall
+                    y = self.y = wall.y - 10
                     self.vy = 0
-                elif self.y > wall.y + wall.height:  # Below the wall
-                    self.y = wall.y + wall.height + 10
+                elif y > wall.y + wall.height:  # Below the wall
+                    y = self.y = wall.y + wall.height + 10
                     self.vy = 0
 
 
@@ -93,27 +157,48 @@ class SpaceObject:
 # ------------------------   
 
 # This class represents the bullets fired by the ships.
-# Each bullet has a position, angle, owner (ship index), and speed.     
+# Each bullet has a position, angle, owner (ID of the shooting ship), and speed.
+# Like SpaceObject, a Bullet is only a view on one slot of a BulletPool
+# (bullet_pool.py); the engine itself works on the pool arrays directly.
+
+# Property that reads/writes one column of the bullet's pool.
+def _pool_column(name):
+    def getter(self):
+        return getattr(self.pool, name).item(self.slot)  # Plain Python int/float
+
+    def setter(self, value):
+        getattr(self.pool, name)[self.slot] = value
+    return property(getter, setter)
+
 class Bullet:
-    def __init__(self, x, y, angle, owner, speed=15, lifespan=60):  # Lifespan in frames (1 second at 60 FPS)
-        self.x = x
-        self.y = y
-        self.angle = angle
-        self.owner = owner
-        self.lifespan = lifespan  # Lifespan in frames
-        rad = math.radians(angle)
-        self.vx = math.cos(rad) * speed
-        self.vy = math.sin(rad) * speed
-        
+    x = _pool_column("x")
+    y = _pool_column("y")
+    vx = _pool_column("vx")
+    vy = _pool_column("vy")
+    angle = _pool_column("angle")
+    owner = _pool_column("owner")
+    lifespan = _pool_column("lifespan")  # Lifespan in frames
+    __slots__ = ("pool", "slot")
+
+    def __init__(self, x, y, angle, owner, speed=15, lifespan=60, pool=None):  # Lifespan in frames (1 second at 60 FPS)
+        if pool is None:
+            pool = BulletPool(capacity=1)
+        self.pool = pool
+        self.slot = pool.spawn(x, y, angle, owner, speed, lifespan)
+
+    # View on a bullet that already exists in a pool.
+    @classmethod
+    def at(cls, pool, slot):
+        bullet = cls.__new__(cls)
+        bullet.pool = pool
+        bullet.slot = slot
+        return bullet
+
     # Update the position of the bullet based on its velocity.
     # The bullet moves in the direction of its angle.
     # The position is updated by adding the velocity to the current position.
-    def update(self):
-        # Update position
-        self.x += self.vx
-        self.y += self.vy
-        # Decrease lifespan
-        self.lifespan -= 1
+    def update(self, dt=FRAME_DT):
+        self.pool.advance([self.slot], dt=dt)
 
     # Check if the bullet is offscreen.
     # The bullet is considered offscreen if it is outside the world boundaries.
@@ -130,60 +215,266 @@ SERVER_URL = "http://localhost:8000"  # Adjust if your server runs elsewhere
 # This class manages the game state, including the ships, bullets, score, and time.
 # It handles the game logic, including updating the positions of the ships and bullets,
 class GameEngine:
-    def __init__(self, walls):
+    HIT_RADIUS = 15  # Distance at which a bullet hits a ship
+    MAX_ENEMIES = 16  # Default enemy population budget
+    UPGRADE_HP = 100  # Extra HP per spawn that is turned into a stronger enemy
+    SPAWN_DISTANCE = 200  # New enemies appear at least this far from the player
+    ACTIVE_CHUNK_SIZE = 1000  # Ships within WAKE_RADIUS chunks of the player are simulated
+    WAKE_RADIUS = 2
+
+    # Every killed enemy is replaced by two new ones. At most max_enemies enemies are
+    # alive at the same time; spawns beyond that budget are handled by overflow:
+    # "queue" keeps them waiting until an enemy dies, "upgrade" gives their HP to
+    # the current enemy (ships[1]) instead.
+    # Collected coins respawn after coin_respawn_delay ticks (None: never); with
+    # enemies_collect_coins the enemies pick up coins too (for score[1]).
+    # enemy_ai selects the enemies driven by the enemy AI: "first" (ships[1]) or
+    # "all" active enemies; ai_time_budget limits the AI time per tick (see AIScheduler).
+    # The world size defaults to the one of the labyrinth (WallGrid.world_size),
+    # or WORLD_WIDTH x WORLD_HEIGHT for a plain wall list.
+    def __init__(self, walls, max_enemies=MAX_ENEMIES, overflow="queue", world_width=None, world_height=None,
+                 coin_respawn_delay=300, enemies_collect_coins=False, enemy_ai="first", ai_time_budget=None):
+        if overflow not in ("queue", "upgrade"):
+            raise ValueError(f"Unknown overflow mode: {overflow}")
+        if enemy_ai not in ("first", "all"):
+            raise ValueError(f"Unknown enemy AI mode: {enemy_ai}")
+        # Walls never move: index them once (walls may already be a WallGrid)
+        if not isinstance(walls, WallGrid):
+            walls = WallGrid(walls)
+        self.wall_grid = walls
+        default_width, default_height = walls.world_size or (WORLD_WIDTH, WORLD_HEIGHT)
+        world_width = world_width or default_width
+        world_height = world_height or default_height
+        self.world_width = world_width  # World bounds of all ships and bullets
+        self.world_height = world_height
+        self.store = ShipStore(world_width=world_width, world_height=world_height)  # Physics state of all ships
+        # Ships are addressed by their stable ID (entities); the ships list keeps
+        # their order: the player first, the active enemy second
+        self.entities = EntityRegistry()
         self.ships = [
-            SpaceObject(*generate_valid_position(walls, WORLD_WIDTH, WORLD_HEIGHT)),
-            SpaceObject(*generate_valid_position(walls, WORLD_WIDTH, WORLD_HEIGHT))
+            self._register(SpaceObject(*generate_valid_position(walls, world_width, world_height), store=self.store)),
+            self._register(SpaceObject(*generate_valid_position(walls, world_width, world_height), store=self.store))
         ]
-        self.bullets = [] 
+        self.player_id = self.ships[0].id
+        # Only the ships near the player are simulated; the default region covers
+        # the whole 2000x2000 labyrinth, large worlds freeze the far away ships
+        self.region = ActiveRegion(self.ACTIVE_CHUNK_SIZE, self.WAKE_RADIUS, world_size=(world_width, world_height))
+        for ship in self.ships:
+            self.region.add(ship, self._anchors())
+        self.bullets = BulletPool(world_width=world_width, world_height=world_height)
+        self.ship_hash = SpatialHash(cell_size=2 * self.HIT_RADIUS)  # Rebuilt every tick for bullet hits
         self.score = [0, 0]
         self.time = 0
-        self.coins = generate_coins(20, walls)  # Store coins in GameEngine
-
+        self.coin_field = CoinField(generate_coins(20, walls, world_width, world_height), walls,
+                                    world_width, world_height, respawn_delay=coin_respawn_delay)  # Store coins in GameEngine
+        self.enemies_collect_coins = enemies_collect_coins
+        self.kills = 0  # Enemies destroyed (used by the headless statistics)
+        self.coins_collected = 0
+        self.max_enemies = max_enemies
+        self.overflow = overflow
+        self.pending_spawns = 0  # Enemies waiting for room in the budget
+        self.ship_pool = []  # Removed enemies, recycled by _spawn_enemy()
+        self.enemy_ai = enemy_ai
+        self.events = EventBus()  # Hits, kills, spawns, shots and coins, delivered once per tick
+        # Controllers of the ships driven by agents, kept for the whole match
+        self.agents = AgentRegistry(lambda ship_id: DummyAgent(ship_id=ship_id, events=self.events))
+        self.ai = AIScheduler(time_budget=ai_time_budget)  # Decides which enemies think each tick
+
+
+    # The coins that can be collected (a list, see CoinField).
+    @property
+    def coins(self):
+        return self.coin_field.coins
+
+    # Let the player (and, if enabled, the enemies) pick up the coins they touch.
+    # Each coin is worth one point.
+    def collect_coins(self):
+        player = self.entities.get(self.player_id)
+        ships = self.region.active if self.enemies_collect_coins else [player] if player else []
+        counts = self.coin_field.collect([(ship.x, ship.y) for ship in ships])
+        for ship, count in zip(ships, counts):
+            if count and self.events.enabled:
+                self.events.emit(COIN_COLLECTED, ship_id=ship.id, count=count)
+            if ship is player:
+                self.score[0] += count
+                self.coins_collected += count
+            else:
+                self.score[1] += count
+
+    # The k coins closest to (x, y), nearest first (for agents).
+    def nearest_coins(self, x, y, k=1):
+        return self.coin_field.nearest_coins(x, y, k)
+
+    # Positions of the players, around which ships are simulated.
+    def _anchors(self):
+        player = self.entities.get(self.player_id)
+        return [(player.x, player.y)] if player else []
+
+    # True if the ship is simulated (near the player, always in small worlds).
+    def is_active(self, ship):
+        return self.region.is_active(ship)
+
+    # The enemies driven by the enemy AI this tick (only active ones that are
+    # not bound to an agent).
+    def thinking_enemies(self):
+        if len(self.ships) < 2:
+            return []
+        if self.enemy_ai == "first":
+            enemy = self.ships[1]
+            return [enemy] if self.is_active(enemy) and enemy.id not in self.agents else []
+        return [ship for ship in self.region.active if ship is not self.ships[0] and ship.id not in self.agents]
 
     # Update the game state.
     # This includes updating the positions of the ships and bullets, checking for collisions,
-    def update(self, walls):
-        new_ships = []
-        for i, ship in enumerate(self.ships[:]):
-            is_enemy = (i == 1)  # The enemy is the second ship
-            ship.update_position(is_enemy=is_enemy)
-            ship.check_wall_collision(walls)  # Wall collision check
+    # Collisions use the engine's wall grid, which was built from the same (static) walls.
+    # Only the active ships (see ActiveRegion) move, collide and can be hit.
+    # dt is the simulated time in seconds (one frame, FRAME_DT, by default).
+    # Ships move at most one frame between two wall checks: a larger step is
+    # split into sub-steps of at most FRAME_DT (see ShipStore.integrate), so a
+    # ship cannot pass through a thin wall. Bullets use swept tests instead.
+    def update(self, walls, dt=FRAME_DT):
+        walls = self.wall_grid
+        self.coin_field.update(dt / FRAME_DT)  # Respawn collected coins
+        region = self.region
+        active = list(region.active if region.everywhere else region.update(self._anchors(), self.store))
+        first = self.ships[0] if self.ships else None
+        second = self.ships[1] if len(self.ships) > 1 else None
+        # Move the active ships in one pass (vectorized for many ships)
+        slots = [ship.slot for ship in active]
+        max_speed = self.store.max_speed
+        for ship in active:
+            max_speed[ship.slot] = 3 if ship is second else 8  # Player: 8, Enemy (second ship): 3
+        steps = max(1, math.ceil(dt / FRAME_DT - 1e-9))
+        for step in range(steps):
+            self.store.integrate(slots, dt=dt / steps, first_substep=step == 0, last_substep=step == steps - 1)
+            for ship in active:
+                ship.check_wall_collision(walls)  # Wall collision check
+
+        for ship in active:
+            is_enemy = ship is second  # The enemy is the second ship
             if ship.hp <= 0:  # Remove the ship if HP is 0
                 self.ships.remove(ship)
+                self.entities.remove(ship.id)
+                self.region.remove(ship)
+                if ship is first:
+                    ship.detach()  # The player stays readable after the match
+                else:
+                    ship.release()
+                    self.ship_pool.append(ship)
                 if is_enemy:  # If an enemy dies, double the number of enemies
-                    for _ in range(2):  # Add two new enemies
-                        x, y = generate_valid_position(walls, WORLD_WIDTH, WORLD_HEIGHT)
-                        new_ships.append(SpaceObject(x, y, angle=random.randint(0, 360), hp=100))
-        self.ships.extend(new_ships)
-
-        for bullet in self.bullets:
-            bullet.update()
-        new_bullets = []
-        for bullet in self.bullets:
-            hit = False
-            # Check for collisions with walls
-            bullet_rect = pygame.Rect(bullet.x - 3, bullet.y - 3, 6, 6)  # Bullet size
-            for wall in walls:
-                if bullet_rect.colliderect(wall):
-                    hit = True
-                    break
-
-            # Check for collisions with ships
-            for i, ship in enumerate(self.ships):
-                if i != bullet.owner and self._collides(bullet, ship):  # Avoid friendly fire
-                    ship.hp -= 10  # Damage dealt
+                    self.kills += 1
+                    self.pending_spawns += 2  # Add two new enemies
+        self._spawn_pending(walls)
+        if len(self.bullets):
+            self._update_bullets(dt)
+        self.events.flush()  # Hand the events of this tick to the subscribers
+
+    # Move all bullets, then check them against the walls and the ships.
+    def _update_bullets(self, dt):
+        bullets = self.bullets
+        if bullets.is_few(len(self.region.active), self.wall_grid):
+            self._update_few_bullets(dt)
+            return
+        idx = bullets.advance(dt=dt)
+        # Swept tests: the whole path of the bullet during this tick counts.
+        # wall_t is where on its path a bullet enters a wall (inf: nowhere)
+        wall_t = bullets.hits_walls(idx, self.wall_grid)
+        hit = wall_t <= 1
+
+        # Check for collisions with ships: with many bullets and ships, the active
+        # ships are hashed into a grid once per tick and every bullet only looks at
+        # the ships in the cells around its path
+        active = self.region.active
+        if active:
+            slots = [ship.slot for ship in active]
+            hit_bullets, hit_ships, ship_t = bullets.hits_ships(idx, self.store.x[slots], self.store.y[slots],
+                                                                self.HIT_RADIUS, self.ship_hash)
+            ids = np.array([ship.id for ship in active])
+            owners = bullets.owner[idx[hit_bullets]]
+            # No friendly fire, and a ship behind a wall is safe: the bullet must
+            # reach the ship before it enters the wall
+            valid = (owners != ids[hit_ships]) & (ship_t < wall_t[hit_bullets])
+            enemy = self.ships[1] if len(self.ships) > 1 else None
+            for b, i, owner in zip(hit_bullets[valid].tolist(), hit_ships[valid].tolist(), owners[valid].tolist()):
+                self._hit_ship(active[i], owner, enemy)
+                hit[b] = True
+
+        # Remove bullets that hit something, left the world or whose lifespan is over
+        bullets.expire(idx, hit | bullets.expired(idx))
+
+    # _update_bullets for a few bullets and ships (BulletPool.is_few): the same
+    # tests in the same order, one bullet at a time on plain floats. For the usual
+    # 2-ship game this skips a few dozen NumPy calls on one-element arrays.
+    def _update_few_bullets(self, dt):
+        bullets = self.bullets
+        active = self.region.active
+        positions = [(ship.x, ship.y) for ship in active]
+        enemy = self.ships[1] if len(self.ships) > 1 else None
+        slots = bullets.active().tolist()
+        dead = []
+        for slot, path in zip(slots, bullets.advance_few(slots, dt)):
+            wall_t = bullets.hits_wall(path, self.wall_grid)
+            hit = wall_t <= 1
+            owner = bullets.owner.item(slot)
+            x0, y0, x1, y1 = path
+            for ship, (x, y) in zip(active, positions):
+                ship_t = segment_circle_entry(x0, y0, x1 - x0, y1 - y0, x, y, self.HIT_RADIUS)
+                if ship_t is not None and owner != ship.id and ship_t < wall_t:
+                    self._hit_ship(ship, owner, enemy)
                     hit = True
-                    if ship.hp <= 0 and i == 1:  # Points for killing an enemy
-                        self.score[0] += 10  # Player earns 10 points
-                    print(f"Ship {i} hit! HP: {ship.hp}")
-
-            # Add bullet to the new list if it hasn't hit anything and its lifespan is not over
-            if not hit and bullet.lifespan > 0:
-                new_bullets.append(bullet)
-
-        self.bullets = [b for b in new_bullets if not b.is_offscreen(self.ships[0].WORLD_WIDTH, self.ships[0].WORLD_HEIGHT)]
+            if hit or bullets.is_expired(slot):
+                dead.append(slot)
+        bullets.expire_few(dead)
+
+    # A bullet of owner hit the ship. enemy is the ship whose kill scores.
+    def _hit_ship(self, ship, owner, enemy):
+        ship.hp -= 10  # Damage dealt
+        if ship.hp <= 0 and ship is enemy:  # Points for killing the enemy (whoever shot it)
+            self.score[0] += 10  # Player earns 10 points
+        if self.events.enabled:
+            self.events.emit(HIT, ship_id=ship.id, hp=ship.hp, owner=owner)
+            if ship.hp <= 0:
+                self.events.emit(KILL, ship_id=ship.id, killer=owner)
     
+    # Spawn the waiting enemies as far as the population budget allows; the rest
+    # waits ("queue") or makes the current enemy stronger ("upgrade").
+    def _spawn_pending(self, walls):
+        while self.pending_spawns and len(self.ships) - 1 < self.max_enemies:
+            ship = self._spawn_enemy(walls)
+            self.ships.append(ship)
+            self.region.add(ship, self._anchors())
+            self.pending_spawns -= 1
+        if self.pending_spawns and self.overflow == "upgrade" and len(self.ships) > 1:
+            self.ships[1].hp += self.UPGRADE_HP * self.pending_spawns
+            self.pending_spawns = 0
+
+    # A new enemy at a free position (at least SPAWN_DISTANCE away from the player),
+    # recycled from the ship pool when possible.
+    # A recycled ship is a new entity and gets a new ID.
+    def _spawn_enemy(self, walls):
+        player = self.entities.get(self.player_id)
+        avoid = (player.x, player.y) if player else None
+        x, y = generate_valid_position(walls, self.world_width, self.world_height, avoid, self.SPAWN_DISTANCE)
+        angle = random.randint(0, 360)
+        if self.ship_pool:
+            ship = self.ship_pool.pop()
+            ship.reset(x, y, angle=angle, hp=100, store=self.store)
+        else:
+            ship = SpaceObject(x, y, angle=angle, hp=100, store=self.store)
+        self._register(ship)
+        if self.events.enabled:
+            self.events.emit(SPAWN, ship_id=ship.id, x=x, y=y)
+        return ship
+
+    # Give the ship a new ID in the entity registry.
+    def _register(self, ship):
+        ship.id = self.entities.add(ship)
+        return ship
+
+    # The ship with this ID, or None if it has been removed.
+    def get_ship(self, ship_id):
+        return self.entities.get(ship_id)
+
     def get_agent_actions(self, game_state, walls):
             start_time = time.time()
 
@@ -198,53 +489,66 @@ class GameEngine:
                 response.raise_for_status()  # Raise an exception for bad status codes
                 return response.json()
             except requests.exceptions.RequestException as e:
-                print(f"Error communicating with agent server: {e}")
+                logger.error("engine", "Error communicating with agent server: %s", e)
                 return {"rotate": 0, "thrust": 0, "shoot": False}  # Default actions in case of error
    
-    # Shoot a bullet from the specified ship.
+    # Shoot a bullet from the ship with the given ID.
     # The bullet is spawned slightly in front of the ship, and its speed is set.
-    # The bullet is added to the list of bullets in the game.       
-    def shoot(self, ship_index):
-        ship = self.ships[ship_index]
+    # The bullet is added to the bullet pool of the game.
+    def shoot(self, ship_id):
+        ship = self.entities.get(ship_id)
+        if ship is None:  # The ship has been removed
+            return
         # Spawn bullet slightly in front of the ship
         rad = math.radians(ship.angle)
         bullet_x = ship.x + math.cos(rad) * 15  # Offset by 15 units in the direction of the ship
         bullet_y = ship.y + math.sin(rad) * 15
-        bullet = Bullet(bullet_x, bullet_y, ship.angle, owner=ship_index, speed=15)  # Fast bullets
-        self.bullets.append(bullet)
+        self.bullets.spawn(bullet_x, bullet_y, ship.angle, owner=ship_id, speed=15)  # Fast bullets
+        if self.events.enabled:
+            self.events.emit(SHOT, ship_id=ship_id)
 
     # Draw the bullets on the screen.
-    def draw_bullets(self, screen, camera_x, camera_y):
-        for bullet in self.bullets:
-            screen_x, screen_y = world_to_screen(bullet.x, bullet.y, camera_x, camera_y)
+    # alpha interpolates between the previous and the current simulation step.
+    def draw_bullets(self, screen, camera_x, camera_y, alpha=1.0):
+        bullets = self.bullets
+        idx = bullets.active()
+        xs = bullets.prev_x[idx] + (bullets.x[idx] - bullets.prev_x[idx]) * alpha
+        ys = bullets.prev_y[idx] + (bullets.y[idx] - bullets.prev_y[idx]) * alpha
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            screen_x, screen_y = world_to_screen(x, y, camera_x, camera_y)
             pygame.draw.circle(screen, (0, 0, 0), (screen_x, screen_y), 3)
 
     def draw_coins(self, screen, camera_x, camera_y):
         for coin in self.coins:
             coin.draw(screen, camera_x, camera_y)
     
-    # Rotate the ship by a specified number of degrees.
-    def rotate_ship(self, index, degrees):
-        self.ships[index].rotate(degrees)
+    # Rotate the ship (by ID) by a specified number of degrees.
+    def rotate_ship(self, ship_id, degrees):
+        ship = self.entities.get(ship_id)
+        if ship is not None:
+            ship.rotate(degrees)
     
-    # Apply thrust to the ship in the direction of its angle.
-    def thrust_ship(self, index, amount):
-        self.ships[index].thrust(amount)
+    # Apply thrust to the ship (by ID) in the direction of its angle.
+    def thrust_ship(self, ship_id, amount):
+        ship = self.entities.get(ship_id)
+        if ship is not None:
+            ship.thrust(amount)
 
     # Get the current state of the game.
     # This includes the state of the ships, score, and time.
     # The state is returned as a dictionary. (This is useful for saving or sending the state of the game)
+    # Every ship state also carries the ship's stable "id".
 
     def get_game_state(self):
         return {
-            "ships": [ship.get_state() for ship in self.ships],
+            "ships": [dict(ship.get_state(), id=ship.id) for ship in self.ships],
             "score": self.score,
             "time": self.time
         }
         
     def _collides(self, bullet, ship):
         dist = math.hypot(bullet.x - ship.x, bullet.y - ship.y)
-        return dist < 15  # Simple collision radius
+        return dist < self.HIT_RADIUS  # Simple collision radius
 
 
 # ------------------------
@@ -255,28 +559,55 @@ class GameEngine:
 WORLD_WIDTH, WORLD_HEIGHT = 2000, 2000
 SCREEN_WIDTH, SCREEN_HEIGHT = 800, 600
 
+# The simulation runs at a fixed rate, independent of how fast frames are drawn.
+# Friction, speeds and lifespans are tuned for SIM_RATE steps per second.
+SIM_RATE = 60
+SIM_DT = 1 / SIM_RATE  # Equal to FRAME_DT: one simulation step is one physics frame
+MAX_STEPS_PER_FRAME = 5  # If drawing falls further behind, the game slows down instead of stalling
+RENDER_FPS = 120  # Frame rate cap for drawing (0: no cap)
+ENEMY_AI = "first"  # Enemies driven by the enemy AI in main(): "first" or "all" (see GameEngine)
+AI_TIME_BUDGET = 0.004  # Seconds of enemy AI per simulation step when all enemies think (see AIScheduler)
+
 WHITE = (255, 255, 255)
 BLUE = (50, 100, 255)
 RED = (255, 50, 50)
 
-background_image = pygame.image.load("galaxie.jpg")  # Load background image
-background_image = pygame.transform.scale(background_image, (WORLD_WIDTH, WORLD_HEIGHT))
-
-# Create a semi-transparent surface
-transparent_surface = pygame.Surface((WORLD_WIDTH, WORLD_HEIGHT), pygame.SRCALPHA)
-transparent_surface.blit(background_image, (0, 0))  # Draw the background onto the surface
-transparent_surface.set_alpha(128)  # Set transparency to 50% (128 out of 255)
-
-# Create a semi-transparent surface for the info box
-info_box = pygame.Surface((150, 60), pygame.SRCALPHA)
-info_box.fill((128, 128, 128, 128))  # Semi-transparent gray
+# Rendering assets are loaded by main() through load_assets(), so the engine
+# can be imported (e.g. by headless.py) without a display or the background image.
+transparent_surface = None
+info_box = None
+
+def load_assets():
+    global transparent_surface, info_box
+    background_image = pygame.image.load("galaxie.jpg")  # Load background image
+    background_image = pygame.transform.scale(background_image, (WORLD_WIDTH, WORLD_HEIGHT))
+
+    # Create a semi-transparent surface
+    transparent_surface = pygame.Surface((WORLD_WIDTH, WORLD_HEIGHT), pygame.SRCALPHA)
+    transparent_surface.blit(background_image, (0, 0))  # Draw the background onto the surface
+    transparent_surface.set_alpha(128)  # Set transparency to 50% (128 out of 255)
+
+    # Create a semi-transparent surface for the info box
+    info_box = pygame.Surface((150, 60), pygame.SRCALPHA)
+    info_box.fill((128, 128, 128, 128))  # Semi-transparent gray
+
+# The background image covers WORLD_WIDTH x WORLD_HEIGHT; larger worlds repeat it.
+# Only the copies that overlap the view are drawn.
+def draw_background(screen, view, world_width, world_height):
+    tile_width, tile_height = transparent_surface.get_size()
+    for tile_y in range(max(0, view.top // tile_height), min(world_height, view.bottom) // tile_height + 1):
+        for tile_x in range(max(0, view.left // tile_width), min(world_width, view.right) // tile_width + 1):
+            if tile_x * tile_width < world_width and tile_y * tile_height < world_height:
+                screen.blit(transparent_surface, (tile_x * tile_width - view.x, tile_y * tile_height - view.y))
 
 def world_to_screen(x, y, camera_x, camera_y):
     return int(x - camera_x + SCREEN_WIDTH // 2), int(y - camera_y + SCREEN_HEIGHT // 2)
 
 
-def draw_ship(screen, ship, color, camera_x, camera_y):
-    screen_x, screen_y = world_to_screen(ship.x, ship.y, camera_x, camera_y)
+# alpha interpolates the position between the previous and the current simulation step.
+def draw_ship(screen, ship, color, camera_x, camera_y, alpha=1.0):
+    x, y = ship.store.interpolate(ship.slot, alpha)
+    screen_x, screen_y = world_to_screen(x, y, camera_x, camera_y)
     angle = ship.angle
     length = 20
     rad = math.radians(angle)
@@ -286,82 +617,68 @@ def draw_ship(screen, ship, color, camera_x, camera_y):
     pygame.draw.line(screen, color, (screen_x, screen_y), (int(end_x), int(end_y)), 2)
 
 
-def create_labyrinth():
-    # A larger labyrinth with multiple paths and dead ends
-    walls = [
-        # Outer walls
-        pygame.Rect(50, 50, 1900, 20),  # Top wall
-        pygame.Rect(50, 50, 20, 1900),  # Left wall
-        pygame.Rect(50, 1930, 1900, 20),  # Bottom wall
-        pygame.Rect(1930, 50, 20, 1900),  # Right wall
-
-        # Inner structures
-        pygame.Rect(200, 200, 20, 400),  # Vertical wall top left
-        pygame.Rect(200, 600, 400, 20),  # Horizontal wall top left
-        pygame.Rect(600, 200, 20, 400),  # Vertical wall top center
-        pygame.Rect(600, 600, 400, 20),  # Horizontal wall top center
-        pygame.Rect(1000, 200, 20, 800),  # Vertical wall top right
-        pygame.Rect(200, 1000, 800, 20),  # Horizontal wall center
-        pygame.Rect(1200, 200, 20, 800),  # Vertical wall center right
-        pygame.Rect(1200, 1000, 400, 20),  # Horizontal wall center right
-        pygame.Rect(1600, 200, 20, 800),  # Vertical wall top far right
-        pygame.Rect(200, 1400, 400, 20),  # Horizontal wall bottom left
-        pygame.Rect(600, 1400, 20, 400),  # Vertical wall bottom center
-        pygame.Rect(600, 1800, 400, 20),  # Horizontal wall bottom center
-        pygame.Rect(1000, 1400, 20, 400),  # Vertical wall bottom right
-        pygame.Rect(1200, 1400, 400, 20),  # Horizontal wall bottom right
-        pygame.Rect(1600, 1400, 20, 400),  # Vertical wall bottom far right
-
-        # Dead ends
-        pygame.Rect(300, 300, 100, 20),  # Horizontal dead end top left
-        pygame.Rect(1500, 1500, 100, 20),  # Horizontal dead end bottom right
-        pygame.Rect(800, 800, 20, 100),  # Vertical dead end center
-   ]
-    return walls
-
-def generate_valid_position(walls, world_width, world_height):
-    """Generates a random position that is not inside any wall."""
+# The labyrinth is described in labyrinth.json and compiled once into a cached
+# binary file (labyrinth_compiler.py); later starts only memory-map that file.
+def create_labyrinth(layout=DEFAULT_LAYOUT):
+    return load_labyrinth(layout).rects()
+
+# The walls of the labyrinth as a WallGrid, with the precomputed grid and occupancy map.
+def load_walls(layout=DEFAULT_LAYOUT):
+    return load_labyrinth(layout).wall_grid()
+
+def generate_valid_position(walls, world_width, world_height, avoid=None, min_distance=0):
+    """Generates a random position that is not inside any wall.
+
+    With a WallGrid the position comes from its free-space sampler (no retries);
+    avoid=(x, y) and min_distance keep the position away from that point.
+    """
+    if isinstance(walls, WallGrid):
+        return walls.free_space(10, world_width, world_height).sample(avoid=avoid, min_distance=min_distance)
     while True:
         x = random.randint(20, world_width - 20)
         y = random.randint(20, world_height - 20)
         rect = pygame.Rect(x - 10, y - 10, 20, 20)  # Approximate ship size
-        is_valid = True
-        for wall in walls:
-            if rect.colliderect(wall):
-                is_valid = False
-                break
-        if is_valid:
+        if not rect_blocked(walls, rect):
             return x, y
 
+# A coin only stores its center; the 10x10 rect is built when it is asked for.
 class Coin:
+    SIZE = 10  # Coin size
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.rect = pygame.Rect(self.x - 5, self.y - 5, 10, 10)  # Coin size
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x - 5, self.y - 5, self.SIZE, self.SIZE)
 
     def draw(self, screen, camera_x, camera_y):
-        coin_screen_x = self.rect.x - camera_x + SCREEN_WIDTH // 2
-        coin_screen_y = self.rect.y - camera_y + SCREEN_HEIGHT // 2
-        pygame.draw.rect(screen, (255, 215, 0), (coin_screen_x, coin_screen_y, self.rect.width, self.rect.height))
+        coin_screen_x = int(self.x - 5) - camera_x + SCREEN_WIDTH // 2
+        coin_screen_y = int(self.y - 5) - camera_y + SCREEN_HEIGHT // 2
+        pygame.draw.rect(screen, (255, 215, 0), (coin_screen_x, coin_screen_y, self.SIZE, self.SIZE))
 
+    # Same test as self.rect.colliderect(ship_rect), without creating the rect.
     def collides_with(self, ship_rect):
-        return self.rect.colliderect(ship_rect)
+        left = int(self.x - 5)
+        top = int(self.y - 5)
+        return (left < ship_rect.right and ship_rect.x < left + self.SIZE
+                and top < ship_rect.bottom and ship_rect.y < top + self.SIZE)
 
 # ... (vorheriger Code)
 
-def generate_coins(num_coins, walls):
+def generate_coins(num_coins, walls, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
+    if isinstance(walls, WallGrid):
+        sampler = walls.free_space(Coin.SIZE // 2, world_width, world_height)
+        return [Coin(*sampler.sample()) for _ in range(num_coins)]
     coins = []
     for _ in range(num_coins):
         while True:
-            x = random.randint(20, WORLD_WIDTH - 20)
-            y = random.randint(20, WORLD_HEIGHT - 20)
+            x = random.randint(20, world_width - 20)
+            y = random.randint(20, world_height - 20)
             coin = Coin(x, y)
-            is_valid = True
-            for wall in walls:
-                if coin.rect.colliderect(wall):
-                    is_valid = False
-                    break
-            if is_valid:
+            if not rect_blocked(walls, coin.rect):
                 coins.append(coin)
                 break
     return coins
@@ -404,8 +721,9 @@ def move_enemy_randomly(enemy):
 
 def avoid_walls(ship, walls):
     ship_rect = pygame.Rect(ship.x - 10, ship.y - 10, 20, 20)
-    for wall in walls:
-        if ship_rect.inflate(30, 30).colliderect(wall): # Check a bit ahead
+    ahead_rect = ship_rect.inflate(30, 30)
+    for wall in walls_near(walls, ahead_rect):
+        if ahead_rect.colliderect(wall): # Check a bit ahead
             # Simple avoidance: rotate away from the center of the wall
             wall_center_x = wall.x + wall.width // 2
             wall_center_y = wall.y + wall.height // 2
@@ -421,19 +739,17 @@ def can_see_player(enemy, player, walls):
     """
     Checks if the enemy has a clear line of sight to the player.
     """
-    dx = player.x - enemy.x
-    dy = player.y - enemy.y
-    distance = math.hypot(dx, dy)
-    steps = int(distance / 10)  # Divide the line into steps
-
-    for step in range(steps):
-        check_x = enemy.x + dx * (step / steps)
-        check_y = enemy.y + dy * (step / steps)
-        check_rect = pygame.Rect(check_x - 5, check_y - 5, 10, 10)  # Small area to check
-        for wall in walls:
-            if check_rect.colliderect(wall):
-                return False  # Wall blocks the view
-    return True
+    # A 10x10 box swept from the enemy to the player must not touch a wall
+    return line_of_sight(walls, enemy.x, enemy.y, player.x, player.y, radius=5)
+
+# can_see_player for many enemies in one batched raycast: enemy ID -> visible.
+# Empty for a few enemies, which can_see_player handles faster one by one.
+def enemies_see_player(enemies, player, walls):
+    if len(enemies) <= SMALL_COUNT:
+        return {}
+    hits = cast_segments(walls, [enemy.x for enemy in enemies], [enemy.y for enemy in enemies],
+                         player.x, player.y, radius=5)
+    return dict(zip([enemy.id for enemy in enemies], (hits.wall < 0).tolist()))
 
 def chase_player(enemy, player):
     """
@@ -450,14 +766,18 @@ def chase_player(enemy, player):
     enemy.thrust(0.3)
 
 
-def chase_and_shoot(enemy, player, walls, engine):
-    if can_see_player(enemy, player, walls):
+# Returns True if the enemy could see the player. visible can be given when the
+# line of sight is already known (see enemies_see_player).
+def chase_and_shoot(enemy, player, walls, engine, visible=None):
+    if visible is None:
+        visible = can_see_player(enemy, player, walls)
+    if visible:
         # Chase the player
         chase_player(enemy, player)
 
         # Shoot at the player
         if random.random() < 0.02:  # 5% chance per frame
-            engine.shoot(1)  # Enemy shoots (Index 1)
+            engine.shoot(enemy.id)  # Enemy shoots
 
     dx = player.x - enemy.x
     dy = player.y - enemy.y
@@ -476,141 +796,226 @@ def chase_and_shoot(enemy, player, walls, engine):
 
     # Basic shooting logic: if roughly facing the target and within range
     if abs(angle_difference) < 10 and distance_to_target < 300 and random.random() < 0.02:
-        engine.shoot(engine.ships.index(enemy)) # Shoot from the enemy ship
+        engine.shoot(enemy.id) # Shoot from the enemy ship
+    return visible
+
+# ------------------------
+# Per-frame Game Logic
+# ------------------------
 
-def main():
+# These helpers contain everything one frame does apart from drawing.
+# main() and the headless runner (headless.py) both use them, so a match
+# plays out the same way with or without a display.
+
+# Check if the player collects a coin
+def collect_coins(engine):
+    engine.collect_coins()
+
+# Translate the pressed keys into the same action dictionary the agents return.
+# keys can be the result of pygame.key.get_pressed() or a recorded dictionary
+# like {"left": False, "right": True, "up": True, "space": False}.
+def keys_to_actions(keys):
+    if isinstance(keys, dict):
+        left, right = keys.get("left", False), keys.get("right", False)
+        up, space = keys.get("up", False), keys.get("space", False)
+    else:
+        left, right = keys[pygame.K_LEFT], keys[pygame.K_RIGHT]
+        up, space = keys[pygame.K_UP], keys[pygame.K_SPACE]
+    rotate = 0
+    if left:
+        rotate -= 3
+    if right:
+        rotate += 3
+    return {"rotate": rotate, "thrust": 1 if up else 0, "shoot": bool(space)}
+
+# Apply an action dictionary ({"rotate", "thrust", "shoot"}) to the ship with the given ID.
+def apply_actions(engine, ship_id, actions):
+    if actions["rotate"]:
+        engine.rotate_ship(ship_id, actions["rotate"])
+    if actions["thrust"]:
+        engine.thrust_ship(ship_id, actions["thrust"])
+    if actions["shoot"]:
+        engine.shoot(ship_id)
+
+# Let the agents bound to ships (engine.agents) decide on the current game state
+# and apply their actions.
+def run_agents(engine, walls):
+    if not len(engine.agents):
+        return
+    decisions = engine.agents.decide(engine.get_game_state(), walls, lambda ship_id: ship_id in engine.entities)
+    for ship_id, actions in decisions.items():
+        apply_actions(engine, ship_id, actions)
+
+# One full decision of an enemy: chase and shoot, random moves, wall avoidance.
+# Returns the steering to repeat until the next decision (the turn and thrust of
+# chasing and wall avoidance, not the random moves) and whether the player was
+# visible, for the AIScheduler.
+def enemy_decision(enemy, player, walls, engine, visible=None):
+    store, slot = enemy.store, enemy.slot
+    angle, ax, ay = enemy.angle, store.ax.item(slot), store.ay.item(slot)
+    visible = chase_and_shoot(enemy, player, walls, engine, visible)
+    turn = enemy.angle - angle
+    thrust_x, thrust_y = store.ax.item(slot) - ax, store.ay.item(slot) - ay
+    move_enemy_randomly(enemy)
+    angle = enemy.angle
+    avoid_walls(enemy, walls)
+    turn += enemy.angle - angle
+    return (turn + 180) % 360 - 180, thrust_x, thrust_y, visible
+
+# Enemy movement and behavior. Far away enemies are frozen (see ActiveRegion);
+# the engine's AIScheduler decides which of the others think in this tick.
+# The lines of sight of the enemies due this tick are cast together (enemies
+# only rotate and collect thrust while they decide, so they stay valid).
+def run_enemy_logic(engine, walls):
+    player = engine.ships[0]
+    sight = {}
+    engine.ai.run(engine.thinking_enemies(), player,
+                  lambda enemy: enemy_decision(enemy, player, walls, engine, sight.get(enemy.id)),
+                  lambda enemies: sight.update(enemies_see_player(enemies, player, walls)))
+
+# Draw one frame. Positions are interpolated by alpha between the previous and
+# the current simulation step.
+def draw_frame(screen, engine, walls, mode, alpha):
+    screen.fill(WHITE)
+    player = engine.ships[0]
+
+    # Set the camera to follow the player's ship (blue ship)
+    camera_x, camera_y = player.store.interpolate(player.slot, alpha)
+
+    # Only what lies in the view is drawn (walls from the grid chunks around it)
+    view = pygame.Rect(camera_x - SCREEN_WIDTH // 2, camera_y - SCREEN_HEIGHT // 2, SCREEN_WIDTH, SCREEN_HEIGHT)
+    draw_background(screen, view, engine.world_width, engine.world_height)
+
+    # Draw walls (relative to camera)
+    for wall in walls_near(walls, view):
+        wall_screen = pygame.Rect(
+            wall.x - camera_x + SCREEN_WIDTH // 2,
+            wall.y - camera_y + SCREEN_HEIGHT // 2,
+            wall.width,
+            wall.height
+        )
+        pygame.draw.rect(screen, (80, 80, 80), wall_screen)
+
+    engine.draw_coins(screen, camera_x, camera_y)  # Draw coins
+
+    # Draw ships relative to camera
+    for i, ship in enumerate(engine.ships):
+        color = BLUE if i == 0 else RED
+        draw_ship(screen, ship, color, camera_x, camera_y, alpha)
+
+        # If the ship is an enemy (not the player), draw its HP beside it
+        if i != 0:
+            enemy_screen_x, enemy_screen_y = world_to_screen(*ship.store.interpolate(ship.slot, alpha), camera_x, camera_y)
+            font = pygame.font.SysFont(None, 24)
+            hp_text = font.render(f"{ship.hp}", True, (255, 0, 0))
+            screen.blit(hp_text, (enemy_screen_x + 15, enemy_screen_y - 15))
+
+    # Draw the laser for the dummy agent (when in agent mode for player 1)
+    if mode == "agent":
+        my_x, my_y = camera_x, camera_y
+        rad = math.radians(player.angle)
+        laser_end_x = my_x + math.cos(rad) * 1000
+        laser_end_y = my_y + math.sin(rad) * 1000
+
+        # Shorten the laser to the first wall it hits (a single ray per frame, so
+        # the scalar cast; the agent's own lasers are cast in DummyAgent._scan)
+        hit = cast_ray(walls, my_x, my_y, player.angle, 1000)
+        if hit is not None:
+            laser_end_x, laser_end_y = hit.x, hit.y
+
+        # Draw the laser
+        pygame.draw.line(screen, (255, 0, 0), world_to_screen(my_x, my_y, camera_x, camera_y),
+                         world_to_screen(laser_end_x, laser_end_y, camera_x, camera_y), 2)
+
+    # Display HP and Score
+    font = pygame.font.SysFont(None, 24)
+    p1_hp = player.hp
+    hp_text = font.render(f"Player HP: {p1_hp}", True, (0, 0, 0))
+    score_text = font.render(f"Score: {engine.score[0]}", True, (0, 0, 0))
+
+    # Draw the semi-transparent rectangle behind the text
+    screen.blit(info_box, (10, 10))
+
+    # Draw the text on top of the rectangle
+    screen.blit(hp_text, (20, 20))
+    screen.blit(score_text, (20, 40))
+
+    engine.draw_bullets(screen, camera_x, camera_y, alpha)
+
+    pygame.display.flip()
+
+# record_path: in player mode, write the pressed keys of every frame to this
+# file (one JSON object per line) so the match can be replayed by headless.py.
+def main(record_path=None, layout=DEFAULT_LAYOUT):
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("BotFighters Arena")
+    load_assets()
 
-    walls = create_labyrinth()
+    walls = load_walls(layout)
     #coins = generate_coins(20, walls)
 
     clock = pygame.time.Clock()
     mode = show_start_menu(screen) # Get game mode from the menu
-    engine = GameEngine(walls)
-
+    # Only with many thinking enemies is there AI to time-slice; a single enemy
+    # decides every tick, exactly like in headless.py
+    engine = GameEngine(walls, enemy_ai=ENEMY_AI, ai_time_budget=AI_TIME_BUDGET if ENEMY_AI == "all" else None)
+    engine.events.subscribe(LogSubscriber())  # Hits and agent decisions go to the log, not to print()
+    if mode == "agent":
+        engine.agents.bind(engine.player_id)  # One DummyAgent for the whole match
+    logger.start(sys.stdout)  # Log output is written by a background thread, not in the frame
+
+    record_file = open(record_path, "w") if record_path else None
+
+    # Fixed-timestep loop: the time since the last frame is collected in the
+    # accumulator and consumed in steps of SIM_DT. Drawing interpolates between
+    # the last two simulation steps, so motion stays smooth at any frame rate.
+    accumulator = 0.0
+    previous_time = time.perf_counter()
     running = True
     while running:
-        screen.fill(WHITE)
-        player = engine.ships[0]
-        enemy = engine.ships[1] if len(engine.ships) > 1 else None
-
-        # Set the camera to follow the player's ship (blue ship)
-        camera_x = player.x
-        camera_y = player.y
+        now = time.perf_counter()
+        accumulator += min(now - previous_time, MAX_STEPS_PER_FRAME * SIM_DT)
+        previous_time = now
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
-        # Draw the semi-transparent background relative to the camera
-        screen.blit(transparent_surface, (-camera_x + SCREEN_WIDTH // 2, -camera_y + SCREEN_HEIGHT // 2))
-
-        # Draw walls (relative to camera)
-        for wall in walls:
-            wall_screen = pygame.Rect(
-                wall.x - camera_x + SCREEN_WIDTH // 2,
-                wall.y - camera_y + SCREEN_HEIGHT // 2,
-                wall.width,
-                wall.height
-            )
-            pygame.draw.rect(screen, (80, 80, 80), wall_screen)
-
-        engine.draw_coins(screen, camera_x, camera_y)  # Draw coins
-
-        # Check if the player collects a coin
-        player_rect = pygame.Rect(player.x - 10, player.y - 10, 20, 20)
-        for coin in engine.coins[:]:
-            if coin.collides_with(player_rect):
-                engine.coins.remove(coin)
-                engine.score[0] += 1
-
-        # Player controls or agent actions
-        if mode == "player":
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT]:
-                engine.rotate_ship(0, -3)
-            if keys[pygame.K_RIGHT]:
-                engine.rotate_ship(0, 3)
-            if keys[pygame.K_UP]:
-                engine.thrust_ship(0, 1)
-            if keys[pygame.K_SPACE]:
-                engine.shoot(0)
-        elif mode == "agent" and player:
-            dummy_agent = DummyAgent(ship_index=0)  # Create an instance of DummyAgent
-            actions = dummy_agent.decide(engine.get_game_state(), walls)  # Directly use the game state -> makes it much faster!!!
-            engine.rotate_ship(0, actions["rotate"])
-            engine.thrust_ship(0, actions["thrust"])
-            if actions["shoot"]:
-                engine.shoot(0)
-
-        # Enemy movement and behavior
-        if enemy:
-            chase_and_shoot(enemy, player, walls, engine)
-            move_enemy_randomly(enemy)
-            avoid_walls(enemy, walls)
-
-        # Update game state
-        engine.update(walls)
-
-        # Draw ships relative to camera
-        for i, ship in enumerate(engine.ships):
-            color = BLUE if i == 0 else RED
-            draw_ship(screen, ship, color, camera_x, camera_y)
-
-            # If the ship is an enemy (not the player), draw its HP beside it
-            if i != 0:
-                enemy_screen_x, enemy_screen_y = world_to_screen(ship.x, ship.y, camera_x, camera_y)
-                font = pygame.font.SysFont(None, 24)
-                hp_text = font.render(f"{ship.hp}", True, (255, 0, 0))
-                screen.blit(hp_text, (enemy_screen_x + 15, enemy_screen_y - 15))
-
-        # Draw the laser for the dummy agent (when in agent mode for player 1)
-        if mode == "agent":
-            my_ship = engine.ships[0]
-            rad = math.radians(my_ship.angle)
-            laser_end_x = my_ship.x + math.cos(rad) * 1000
-            laser_end_y = my_ship.y + math.sin(rad) * 1000
-
-            # Check for wall collisions
-            for wall in walls:
-                wall_rect = {
-                    "x": wall.x,
-                    "y": wall.y,
-                    "width": wall.width,
-                    "height": wall.height
-                }
-                if DummyAgent._line_intersects_rect(my_ship.x, my_ship.y, laser_end_x, laser_end_y, wall_rect):
-                    # Shorten the laser to the intersection point
-                    laser_end_x, laser_end_y = DummyAgent._get_intersection_point(
-                        my_ship.x, my_ship.y, laser_end_x, laser_end_y, wall
-                    )
-                    break
-
-            # Draw the laser
-            pygame.draw.line(screen, (255, 0, 0), world_to_screen(my_ship.x, my_ship.y, camera_x, camera_y),
-                             world_to_screen(laser_end_x, laser_end_y, camera_x, camera_y), 2)
-
-        # Display HP and Score
-        font = pygame.font.SysFont(None, 24)
-        p1_hp = engine.ships[0].hp
-        hp_text = font.render(f"Player HP: {p1_hp}", True, (0, 0, 0))
-        score_text = font.render(f"Score: {engine.score[0]}", True, (0, 0, 0))
-
-        # Draw the semi-transparent rectangle behind the text
-        screen.blit(info_box, (10, 10))
-
-        # Draw the text on top of the rectangle
-        screen.blit(hp_text, (20, 20))
-        screen.blit(score_text, (20, 40))
-
-        engine.draw_bullets(screen, camera_x, camera_y)
-
-        pygame.display.flip()
-        clock.tick(60)
-
+        keys = pygame.key.get_pressed() if mode == "player" else None
+        while accumulator >= SIM_DT:
+            accumulator -= SIM_DT
+            player = engine.ships[0]
+            collect_coins(engine)
+
+            # Player controls or agent actions
+            if mode == "player":
+                actions = keys_to_actions(keys)
+                if record_file:
+                    record_file.write(json.dumps({"left": bool(keys[pygame.K_LEFT]), "right": bool(keys[pygame.K_RIGHT]),
+                                                  "up": bool(keys[pygame.K_UP]), "space": bool(keys[pygame.K_SPACE])}) + "\n")
+                apply_actions(engine, engine.player_id, actions)
+            elif mode == "agent":
+                run_agents(engine, walls)  # Directly use the game state -> makes it much faster!!!
+
+            run_enemy_logic(engine, walls)
+
+            # Update game state
+            engine.update(walls)
+
+        alpha = accumulator / SIM_DT  # How far we are between the last step and the next one
+        draw_frame(screen, engine, walls, mode, alpha)
+        clock.tick(RENDER_FPS)
+
+    if record_file:
+        record_file.close()
     pygame.quit()
+    logger.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="BotFighters Arena")
+    parser.add_argument("--record", metavar="FILE", help="record the keyboard input (player mode) for headless.py --replay")
+    parser.add_argument("--layout", default=DEFAULT_LAYOUT, help="labyrinth layout file, e.g. a maze from maze_generator.py")
+    args = parser.parse_args()
+    main(record_path=args.record, layout=args.layout)
\ No newline at end of file
@@ -0,0 +1,47 @@
+# ------------------------
+# EntityRegistry Class
+# ------------------------
+
+# Gives every entity (ship) a stable integer ID that never changes and is never
+# reused, unlike its position in a list. The entities are kept in a dense list
+# plus a dict from ID to position: lookup is a dict access, and removal moves the
+# last entity into the freed position (swap-and-pop), so nothing else shifts.
+class EntityRegistry:
+    def __init__(self):
+        self.entities = []  # Dense, in no particular order
+        self.ids = []  # ids[i] is the ID of entities[i]
+        self.index = {}  # ID -> position in entities
+        self.next_id = 0
+
+    # Register an entity and return its new ID.
+    def add(self, entity):
+        entity_id = self.next_id
+        self.next_id += 1
+        self.index[entity_id] = len(self.entities)
+        self.entities.append(entity)
+        self.ids.append(entity_id)
+        return entity_id
+
+    # The entity with this ID, or default if it does not exist (anymore).
+    def get(self, entity_id, default=None):
+        position = self.index.get(entity_id)
+        return default if position is None else self.entities[position]
+
+    # Remove the entity with this ID (swap-and-pop).
+    def remove(self, entity_id):
+        position = self.index.pop(entity_id)
+        last_entity = self.entities.pop()
+        last_id = self.ids.pop()
+        if position < len(self.entities):  # Move the last entity into the hole
+            self.entities[position] = last_entity
+            self.ids[position] = last_id
+            self.index[last_id] = position
+
+    def __contains__(self, entity_id):
+        return entity_id in self.index
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __iter__(self):
+        return iter(self.entities)
@@ -0,0 +1,122 @@
+from collections import namedtuple
+
+from ring_log import logger
+
+# ------------------------
+# EventBus Class
+# ------------------------
+
+# Game events (a ship was hit, killed, spawned, shot, collected coins, an agent
+# decided something) go through an EventBus instead of print(). The engine
+# emits them while it simulates a tick; at the end of the tick flush() hands
+# the whole batch to every subscriber in one call.
+#
+# Emitting is free when nobody listens: the engine checks enabled before it
+# builds an event, so without subscribers no event object is ever created.
+#
+# A subscriber is a callable taking a list of events. With kinds it only gets
+# the events of those kinds.
+
+HIT = "hit"  # ship_id, hp, owner (ID of the shooter)
+KILL = "kill"  # ship_id, killer
+COIN_COLLECTED = "coin_collected"  # ship_id, count
+SPAWN = "spawn"  # ship_id, x, y
+SHOT = "shot"  # ship_id
+DECISION = "decision"  # ship_id, reason, rotate (agent decisions)
+
+Event = namedtuple("Event", "kind tick data")
+
+
+class EventBus:
+    def __init__(self):
+        self.subscribers = []  # (callback, kinds or None)
+        self.enabled = False  # True while anybody subscribes
+        self.pending = []  # Events of the current tick
+        self.tick = 0
+
+    def subscribe(self, callback, kinds=None):
+        self.subscribers.append((callback, None if kinds is None else frozenset(kinds)))
+        self.enabled = True
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers = [(c, kinds) for c, kinds in self.subscribers if c != callback]  # == also matches bound methods
+        self.enabled = bool(self.subscribers)
+
+    # Queue an event for the end of the tick (check enabled first to skip the call).
+    def emit(self, kind, **data):
+        if self.enabled:
+            self.pending.append(Event(kind, self.tick, data))
+
+    # Deliver the events of this tick to the subscribers and start the next tick.
+    def flush(self):
+        self.tick += 1
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        for callback, kinds in self.subscribers:
+            batch = events if kinds is None else [event for event in events if event.kind in kinds]
+            if batch:
+                callback(batch)
+
+
+# The text the game used to print for an event, as (message, args) for
+# message % args, or None for the kinds that were never printed.
+def describe(event):
+    data = event.data
+    if event.kind == HIT:
+        return "Ship %s hit! HP: %s", (data["ship_id"], data["hp"])
+    if event.kind == DECISION:
+        if data["reason"] == "enemy":
+            return "Enemy detected! Rotating by %.2f degrees and shooting.", (data["rotate"],)
+        if data["reason"] == "wall":
+            return "Wall ahead! Rotating by %s degrees.", (data["rotate"],)
+        if data.get("message") is not None:
+            return "%s", (data["message"],)
+    return None
+
+
+# ------------------------
+# PrintSubscriber Class
+# ------------------------
+
+# Prints the events like the game used to print them directly ("Ship 3 hit!
+# HP: 90", the agent's decisions). Used by headless.py --verbose.
+class PrintSubscriber:
+    def __init__(self, file=None):
+        self.file = file  # None: sys.stdout
+
+    def __call__(self, events):
+        lines = [line for line in map(self.format, events) if line is not None]
+        if lines:
+            print("\n".join(lines), file=self.file)
+
+    @staticmethod
+    def format(event):
+        text = describe(event)
+        return None if text is None else text[0] % text[1]
+
+
+# ------------------------
+# LogSubscriber Class
+# ------------------------
+
+# Writes the events to the ring buffer log (ring_log.py) instead of printing
+# them: hits at info level under "engine", agent decisions at debug level under
+# "agent". Nothing is formatted or written in the frame; the log's background
+# thread (logger.start()) does that. Used by main() and agend_process.py.
+class LogSubscriber:
+    LEVELS = {DECISION: ("agent", "debug")}  # Kind -> (subsystem, level)
+    DEFAULT = ("engine", "info")
+
+    def __init__(self, log=None):
+        self.log = log or logger
+
+    def __call__(self, events):
+        for event in events:
+            subsystem, level = self.LEVELS.get(event.kind, self.DEFAULT)
+            if not self.log.enabled(subsystem, level):
+                continue
+            text = describe(event)
+            if text is not None:
+                self.log.log(subsystem, level, text[0], *text[1])
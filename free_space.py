@@ -0,0 +1,69 @@
+import math
+import random
+
+import numpy as np
+
+# ------------------------
+# FreeSpaceSampler Class
+# ------------------------
+
+# Random spawn positions without trial and error. Built once per labyrinth from
+# its OccupancyMap: the world is cut into cells of the occupancy resolution and
+# a cell is kept if a box of half-size half_size fits around every point of the
+# cell without touching a wall. A position is then a random kept cell plus a
+# random offset inside it, which is always valid: one lookup, no retries, no
+# matter how dense the labyrinth is.
+#
+# Positions are integers at least margin away from the world border, like the
+# ones of generate_valid_position.
+class FreeSpaceSampler:
+    def __init__(self, occupancy, world_width, world_height, half_size=10, margin=20):
+        self.resolution = res = occupancy.resolution
+        self.half_size = half_size
+        # Cells completely inside [margin, world - margin]
+        c0, c1 = math.ceil(margin / res), (world_width - margin + 1) // res
+        r0, r1 = math.ceil(margin / res), (world_height - margin + 1) // res
+        cols, rows = np.meshgrid(np.arange(c0, max(c0, c1)), np.arange(r0, max(r0, r1)))
+        cols, rows = cols.ravel(), rows.ravel()
+        # Box covered by all positions of a cell: [cell - half_size, cell + res + half_size)
+        size = res + 2 * half_size - 1
+        blocked = occupancy.overlaps(cols * res - half_size, rows * res - half_size, size, size)
+        self.cols = cols[~blocked]
+        self.rows = rows[~blocked]
+
+    def __len__(self):
+        return len(self.cols)
+
+    # A random valid position (x, y); with avoid=(x, y) and min_distance the
+    # position is at least min_distance away from that point if possible.
+    def sample(self, rng=random, avoid=None, min_distance=0):
+        if not len(self.cols):
+            raise ValueError("No free space in the labyrinth")
+        for _ in range(8):
+            x, y = self._position(rng.randrange(len(self.cols)), rng)
+            if avoid is None or math.hypot(x - avoid[0], y - avoid[1]) >= min_distance:
+                return x, y
+        # Crowded: pick among the cells whose every position is far enough away
+        # (measured from the position of the cell closest to avoid)
+        res = self.resolution
+        left, top = self.cols * res, self.rows * res
+        dx = np.clip(avoid[0], left, left + res - 1) - avoid[0]
+        dy = np.clip(avoid[1], top, top + res - 1) - avoid[1]
+        far = np.flatnonzero(np.hypot(dx, dy) >= min_distance)
+        if not far.size:
+            return x, y
+        return self._position(int(far[rng.randrange(far.size)]), rng)
+
+    def _position(self, cell, rng):
+        res = self.resolution
+        return (int(self.cols[cell]) * res + rng.randrange(res),
+                int(self.rows[cell]) * res + rng.randrange(res))
+
+    # count random valid positions at once (arrays of x and y) from a NumPy generator.
+    def sample_many(self, count, rng):
+        if not len(self.cols):
+            raise ValueError("No free space in the labyrinth")
+        cell = rng.integers(0, len(self.cols), count)
+        res = self.resolution
+        return (self.cols[cell] * res + rng.integers(0, res, count),
+                self.rows[cell] * res + rng.integers(0, res, count))
@@ -0,0 +1,127 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import random
+import time
+
+from dummy_agent import DummyAgent
+from events import PrintSubscriber
+from engine import (GameEngine, load_walls, collect_coins, keys_to_actions,
+                    run_agents, run_enemy_logic)
+from labyrinth_compiler import DEFAULT_LAYOUT
+from ship_store import FRAME_DT
+
+# ------------------------
+# Headless Match Runner
+# ------------------------
+
+# Runs matches without a window and without the 60 FPS frame cap.
+# Every tick does exactly what one frame of engine.main() does (coin pickup,
+# player input, enemy logic, engine.update), only the drawing is skipped.
+# This is what we use to evaluate agents over many matches.
+
+FPS = 60  # Simulated frames per second, used to convert ticks into game time
+
+
+# Replays a keyboard recording made with "python engine.py --record FILE".
+# Each line holds the pressed keys of one frame. After the recording ends the
+# ship just drifts (no keys pressed).
+class KeyboardReplay:
+    def __init__(self, path):
+        with open(path) as f:
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        self.tick = 0
+
+    # Start the recording again.
+    def reset(self):
+        self.tick = 0
+
+    def decide(self, game_state, walls):
+        keys = self.frames[self.tick] if self.tick < len(self.frames) else {}
+        self.tick += 1
+        return keys_to_actions(keys)
+
+
+# Play one match and return its statistics as a dictionary.
+# The match ends when the player dies or after max_ticks frames.
+# layout is the labyrinth layout file (e.g. a maze from maze_generator.py).
+# dt is the simulated time per step: the default is one frame, larger steps
+# (e.g. 4 * FRAME_DT) run faster; agents and enemies then decide once per
+# step, while ships still move one frame at a time between wall checks.
+# ticks in the statistics are always frames.
+def run_match(seed, max_ticks=FPS * 60, replay=None, quiet=True, layout=DEFAULT_LAYOUT, dt=FRAME_DT):
+    random.seed(seed)
+    walls = load_walls(layout)
+    engine = GameEngine(walls)
+    player = engine.ships[0]
+    controller = KeyboardReplay(replay) if replay else DummyAgent(ship_id=engine.player_id, events=engine.events)
+    engine.agents.bind(engine.player_id, controller)
+
+    # Hits and agent decisions are only printed when asked for; without a
+    # subscriber the engine does not even create the events.
+    if not quiet:
+        engine.events.subscribe(PrintSubscriber())
+    start = time.perf_counter()
+    frames_per_step = dt / FRAME_DT
+    steps = 0
+    while steps * frames_per_step < max_ticks:
+        collect_coins(engine)
+        run_agents(engine, walls)
+        run_enemy_logic(engine, walls)
+        engine.update(walls, dt)
+        steps += 1
+        if player.hp <= 0:
+            break
+    elapsed = time.perf_counter() - start
+    ticks = round(steps * frames_per_step)
+
+    return {
+        "seed": seed,
+        "ticks": ticks,
+        "survived": player.hp > 0,
+        "score": engine.score[0],
+        "kills": engine.kills,
+        "coins": engine.coins_collected,
+        "player_hp": player.hp,
+        "enemies": len(engine.ships) - (1 if player.hp > 0 else 0),
+        "wall_time": elapsed,
+        "speedup": (ticks / FPS) / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def format_stats(stats):
+    return ("seed={seed} ticks={ticks} survived={survived} score={score} kills={kills} "
+            "coins={coins} hp={player_hp} enemies={enemies} "
+            "time={wall_time:.2f}s speedup={speedup:.0f}x").format(**stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run BotFighters matches without a display")
+    parser.add_argument("--matches", type=int, default=10, help="number of matches to run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match (match i uses seed + i)")
+    parser.add_argument("--max-ticks", type=int, default=FPS * 60, help="frames per match (default: one minute)")
+    parser.add_argument("--replay", metavar="FILE", help="replay a keyboard recording instead of the DummyAgent")
+    parser.add_argument("--layout", default=DEFAULT_LAYOUT, help="labyrinth layout file (default: labyrinth.json)")
+    parser.add_argument("--dt", type=float, default=FRAME_DT, help="simulated seconds per step (default: one frame, 1/60)")
+    parser.add_argument("--verbose", action="store_true", help="print hits and agent decisions")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per match")
+    args = parser.parse_args()
+
+    results = []
+    for i in range(args.matches):
+        stats = run_match(args.seed + i, args.max_ticks, replay=args.replay, quiet=not args.verbose, layout=args.layout, dt=args.dt)
+        results.append(stats)
+        print(json.dumps(stats) if args.json else format_stats(stats))
+
+    if not args.json and results:
+        total_ticks = sum(r["ticks"] for r in results)
+        total_time = sum(r["wall_time"] for r in results)
+        print(f"{len(results)} matches, {total_ticks} ticks in {total_time:.2f}s "
+              f"({total_ticks / FPS / total_time:.0f}x real time), "
+              f"mean score {sum(r['score'] for r in results) / len(results):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import hashlib
+import json
+import math
+
+import numpy as np
+import pygame
+
+from occupancy import OccupancyMap
+from wall_grid import WallGrid
+
+# ------------------------
+# Labyrinth Compiler
+# ------------------------
+
+# A labyrinth is described by a layout file (JSON, see labyrinth.json):
+#
+#     {"world": {"width": 2000, "height": 2000},
+#      "walls": [{"x": 50, "y": 50, "width": 1900, "height": 20}, ...]}
+#
+# An optional "chunk_size" sets the cell size of the wall grid (default
+# GRID_CELL_SIZE), e.g. for the large generated mazes of maze_generator.py.
+#
+# Compiling a layout merges its walls and precomputes everything the game
+# derives from them: the wall grid (wall_grid.py) and the occupancy bitmap with
+# its summed-area table (occupancy.py). The result is written to one versioned
+# binary file named after the hash of the layout. load_labyrinth() compiles a layout
+# only once and afterwards memory-maps that file, so the engine, the server and
+# the agents start without recomputing anything.
+#
+# File format: MAGIC, a uint32 format version and a uint32 header length, a JSON
+# header (layout hash, scalar settings and dtype/shape/offset of every array)
+# and the raw array data, each array aligned to ALIGNMENT bytes.
+
+MAGIC = b"BFLABYR\0"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+DEFAULT_LAYOUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "labyrinth.json")
+
+GRID_CELL_SIZE = 100  # Same defaults as WallGrid
+OCCUPANCY_RESOLUTION = 10
+
+
+def load_layout(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Hash of the layout contents (not of the file formatting) and the format version.
+def layout_hash(layout):
+    data = json.dumps(layout, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{FORMAT_VERSION}:{data}".encode()).hexdigest()
+
+
+# ------------------------
+# Compile Steps
+# ------------------------
+
+# Merge the walls (x, y, width, height): walls inside another wall are dropped
+# and two overlapping walls whose union is again a rectangle (same column or
+# same row) become one. Walls that only touch, or overlap at a corner, are kept
+# as they are, because the collision response depends on the single walls.
+# The order of the first occurrence is kept.
+def merge_walls(walls):
+    walls = {i: tuple(wall) for i, wall in enumerate(walls)}  # First occurrence -> wall
+    changed = True
+    while changed:
+        changed = _drop_contained(walls)
+        changed |= _merge_runs(walls, 0)  # Same column: x and width equal, merge along y
+        changed |= _merge_runs(walls, 1)  # Same row: y and height equal, merge along x
+    return [walls[i] for i in sorted(walls)]
+
+
+# Remove walls that lie inside another wall; True if any was removed.
+def _drop_contained(walls, cell_size=GRID_CELL_SIZE):
+    cells = {}  # Cell of the top left corner -> walls
+    for i, (x, y, _, _) in walls.items():
+        cells.setdefault((x // cell_size, y // cell_size), []).append(i)
+    removed = False
+    for i in sorted(walls):
+        if i not in walls:
+            continue
+        ax, ay, aw, ah = walls[i]
+        for col in range(ax // cell_size, (ax + aw) // cell_size + 1):
+            for row in range(ay // cell_size, (ay + ah) // cell_size + 1):
+                for j in cells.get((col, row), ()):
+                    # Identical walls: keep the first one
+                    if j != i and j in walls and (walls[j] != walls[i] or j > i):
+                        bx, by, bw, bh = walls[j]
+                        if bx >= ax and by >= ay and bx + bw <= ax + aw and by + bh <= ay + ah:
+                            del walls[j]
+                            removed = True
+    return removed
+
+
+# Merge overlapping walls of the same column (axis 0) or row (axis 1); True if any were merged.
+def _merge_runs(walls, axis):
+    runs = {}  # (position, thickness) across the axis -> walls
+    for i, wall in walls.items():
+        runs.setdefault((wall[axis], wall[axis + 2]), []).append(i)
+    along = 1 - axis
+    merged = False
+    for run in runs.values():
+        run.sort(key=lambda i: walls[i][along])
+        current = run[0]
+        for i in run[1:]:
+            start, length = walls[current][along], walls[current][along + 2]
+            other_start, other_length = walls[i][along], walls[i][along + 2]
+            if other_start < start + length:  # Overlap (touching is not enough)
+                wall = list(walls[current])
+                wall[along + 2] = max(start + length, other_start + other_length) - start
+                keep, drop = min(current, i), max(current, i)
+                walls[keep] = tuple(wall)
+                del walls[drop]
+                current = keep
+                merged = True
+            else:
+                current = i
+    return merged
+
+
+# Grid cells of the WallGrid as flat arrays (CSR): the walls of cell i are
+# indices[offsets[i]:offsets[i + 1]].
+def _grid_arrays(grid):
+    counts = np.array([len(cell) for cell in grid.cells], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+    indices = np.array([i for cell in grid.cells for i in cell], dtype=np.int32)
+    return offsets, indices
+
+
+# Compile a layout into (meta, arrays): the scalar settings and all derived arrays.
+def compile_layout(layout):
+    world = layout.get("world", {})
+    world_width = int(world.get("width", 2000))
+    world_height = int(world.get("height", 2000))
+    walls = merge_walls((w["x"], w["y"], w["width"], w["height"]) for w in layout["walls"])
+    rects = [pygame.Rect(wall) for wall in walls]
+    chunk_size = int(layout.get("chunk_size", GRID_CELL_SIZE))
+
+    grid = WallGrid(rects, chunk_size, OCCUPANCY_RESOLUTION)
+    occupancy = grid.occupancy
+    grid_offsets, grid_indices = _grid_arrays(grid)
+
+    meta = {
+        "name": layout.get("name", ""),
+        "world_width": world_width,
+        "world_height": world_height,
+        "grid_cell_size": chunk_size,
+        "grid_origin": [grid.origin_x, grid.origin_y],
+        "grid_cols": grid.cols,
+        "grid_rows": grid.rows,
+        "resolution": OCCUPANCY_RESOLUTION,
+    }
+    arrays = {
+        "walls": np.array(walls, dtype=np.int32).reshape(-1, 4),
+        "grid_offsets": grid_offsets,
+        "grid_indices": grid_indices,
+        "bitmap": occupancy.bitmap.astype(np.uint8),
+        "sat": occupancy.sat,
+    }
+    return meta, arrays
+
+
+# ------------------------
+# Artifact File
+# ------------------------
+
+def write_artifact(path, layout_digest, meta, arrays):
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({"layout_hash": layout_digest, "meta": meta, "arrays": entries}).encode()
+    start = len(MAGIC) + 8 + len(header)
+    data_start = -(-start // ALIGNMENT) * ALIGNMENT
+
+    # Write to a temporary file first, so readers never see half a file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([FORMAT_VERSION, len(header)], dtype="<u4").tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temporary, path)
+
+
+# Open a compiled labyrinth; the arrays are read-only memory maps of the file.
+# Raises ValueError if the file is not a labyrinth of the current format version.
+def open_artifact(path):
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        version, header_length = np.frombuffer(f.read(8), dtype="<u4").tolist()
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a labyrinth file of version {FORMAT_VERSION}")
+        header = json.loads(f.read(header_length))
+    data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        shape = tuple(entry["shape"])
+        if math.prod(shape) == 0:  # Empty arrays cannot be memory-mapped
+            arrays[name] = np.zeros(shape, dtype=entry["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=entry["dtype"], mode="r", offset=data_start + entry["offset"], shape=shape)
+    return CompiledLabyrinth(header["layout_hash"], header["meta"], arrays)
+
+
+# The compiled labyrinth of a layout file: taken from the cache directory if it
+# was compiled before, otherwise compiled and stored there first.
+def load_labyrinth(layout_path=DEFAULT_LAYOUT, cache_dir=None):
+    layout = load_layout(layout_path)
+    digest = layout_hash(layout)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(layout_path)), ".labyrinth_cache")
+    path = os.path.join(cache_dir, f"{digest[:32]}.lab")
+    if os.path.exists(path):
+        try:
+            labyrinth = open_artifact(path)
+            if labyrinth.layout_hash == digest:
+                return labyrinth
+        except ValueError:
+            pass  # Old format version: compile again
+    os.makedirs(cache_dir, exist_ok=True)
+    meta, arrays = compile_layout(layout)
+    write_artifact(path, digest, meta, arrays)
+    return open_artifact(path)
+
+
+# ------------------------
+# CompiledLabyrinth Class
+# ------------------------
+
+# Read-only view on a compiled labyrinth file.
+# The walls never change, so wall_grid() builds one WallGrid per layout and
+# process and hands out that same grid afterwards (layout hash -> WallGrid).
+# Its free-space samplers and tables are then built in the first match only,
+# not in every match of a headless run or match_farm worker.
+_wall_grids = {}
+
+
+class CompiledLabyrinth:
+    def __init__(self, layout_hash, meta, arrays):
+        self.layout_hash = layout_hash
+        self.meta = meta
+        self.arrays = arrays
+        self.world_width = meta["world_width"]
+        self.world_height = meta["world_height"]
+        self.walls = arrays["walls"]
+
+    # The walls as pygame.Rect objects (the format of create_labyrinth()).
+    def rects(self):
+        return [pygame.Rect(wall) for wall in self.walls.tolist()]
+
+    # The walls as dictionaries (the format of the server's /walls endpoint).
+    def wall_dicts(self):
+        return [{"x": x, "y": y, "width": width, "height": height} for x, y, width, height in self.walls.tolist()]
+
+    # OccupancyMap on the stored bitmap and summed-area table.
+    def occupancy(self):
+        return OccupancyMap.from_arrays(self.arrays["bitmap"].view(bool), self.arrays["sat"], self.meta["resolution"])
+
+    # WallGrid with the stored grid cells, occupancy map and world size
+    # (shared by all loads of the same layout in this process).
+    def wall_grid(self):
+        grid = _wall_grids.get(self.layout_hash)
+        if grid is None:
+            offsets = self.arrays["grid_offsets"].tolist()
+            indices = self.arrays["grid_indices"].tolist()
+            cells = [tuple(indices[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+            grid = WallGrid(self.rects(), self.meta["grid_cell_size"], self.meta["resolution"],
+                            cells=cells, occupancy=self.occupancy(),
+                            world_size=(self.world_width, self.world_height))
+            _wall_grids[self.layout_hash] = grid
+        return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a labyrinth layout into a binary file")
+    parser.add_argument("layout", nargs="?", default=DEFAULT_LAYOUT, help="layout JSON file")
+    parser.add_argument("-o", "--output", help="output file (default: the cache next to the layout)")
+    args = parser.parse_args()
+
+    if args.output:
+        layout = load_layout(args.layout)
+        meta, arrays = compile_layout(layout)
+        write_artifact(args.output, layout_hash(layout), meta, arrays)
+        labyrinth = open_artifact(args.output)
+    else:
+        labyrinth = load_labyrinth(args.layout)
+    print(f"{len(labyrinth.walls)} walls, layout hash {labyrinth.layout_hash[:12]}")
+
+
+if __name__ == "__main__":
+    main()
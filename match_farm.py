@@ -0,0 +1,100 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import multiprocessing
+import time
+
+from headless import FPS, run_match, format_stats
+from labyrinth_compiler import DEFAULT_LAYOUT
+from ship_store import FRAME_DT
+
+# ------------------------
+# Match Farm (Multiprocess Match Runner)
+# ------------------------
+
+# headless.py plays its matches one after another on a single core. The match
+# farm hands the matches to a pool of worker processes instead (one per core by
+# default), streams every result back as soon as it is finished and merges them
+# into one report.
+#
+# A match only depends on its seed (run_match seeds the random module itself),
+# not on the worker or the order in which it runs, so the merged report is the
+# same for the same seed list, however many workers are used.
+
+
+# Worker side: play one match (arguments packed for imap_unordered).
+def _play(args):
+    seed, max_ticks, replay, layout, dt = args
+    return run_match(seed, max_ticks, replay=replay, layout=layout, dt=dt)
+
+
+# Play a match for every seed on a pool of workers and yield the statistics of
+# every match as it completes (in completion order, not in seed order).
+def stream_matches(seeds, max_ticks=FPS * 60, replay=None, workers=None, layout=DEFAULT_LAYOUT, dt=FRAME_DT):
+    jobs = [(seed, max_ticks, replay, layout, dt) for seed in seeds]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+    if workers == 1:
+        # No pool for a single worker: same results, no process start-up cost
+        for job in jobs:
+            yield _play(job)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        # chunksize 1: matches have very different lengths (the player may die
+        # early), so workers take one match at a time to balance the load
+        for stats in pool.imap_unordered(_play, jobs, chunksize=1):
+            yield stats
+
+
+# Merge the statistics of all matches into one report. Only the game results
+# go into the totals, so the report is deterministic for a seed list
+# (the wall_time/speedup of each match stay in "matches").
+def merge_results(results):
+    results = sorted(results, key=lambda stats: stats["seed"])
+    count = len(results)
+    report = {
+        "matches": results,
+        "count": count,
+        "total_ticks": sum(r["ticks"] for r in results),
+        "survived": sum(1 for r in results if r["survived"]),
+    }
+    for key in ("score", "ticks", "kills", "coins"):
+        report["mean_" + key] = sum(r[key] for r in results) / count if count else 0.0
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run BotFighters matches on all CPU cores")
+    parser.add_argument("--matches", type=int, default=100, help="number of matches to run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first match (match i uses seed + i)")
+    parser.add_argument("--max-ticks", type=int, default=FPS * 60, help="frames per match (default: one minute)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--replay", metavar="FILE", help="replay a keyboard recording instead of the DummyAgent")
+    parser.add_argument("--layout", default=DEFAULT_LAYOUT, help="labyrinth layout file (default: labyrinth.json)")
+    parser.add_argument("--dt", type=float, default=FRAME_DT, help="simulated seconds per step (default: one frame, 1/60)")
+    parser.add_argument("--json", action="store_true", help="print the merged report as JSON")
+    args = parser.parse_args()
+
+    seeds = range(args.seed, args.seed + args.matches)
+    start = time.perf_counter()
+    results = []
+    for stats in stream_matches(seeds, args.max_ticks, args.replay, args.workers, args.layout, args.dt):
+        results.append(stats)
+        if not args.json:
+            print(format_stats(stats), flush=True)
+    elapsed = time.perf_counter() - start
+
+    report = merge_results(results)
+    report["wall_time"] = elapsed
+    if args.json:
+        print(json.dumps(report))
+    elif results:
+        print(f"{report['count']} matches, {report['total_ticks']} ticks in {elapsed:.2f}s "
+              f"({report['total_ticks'] / FPS / elapsed:.0f}x real time), "
+              f"survived {report['survived']}, mean score {report['mean_score']:.1f}, "
+              f"mean kills {report['mean_kills']:.2f}, mean coins {report['mean_coins']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import random
+
+import pygame
+
+# ------------------------
+# Maze Generator
+# ------------------------
+
+# Builds large labyrinths procedurally instead of by hand. The world is cut into
+# square maze cells of cell_size; a randomized depth-first search (recursive
+# backtracker, with an explicit stack) carves a perfect maze through them, so
+# every cell is reachable from every other. With openness > 0 a share of the
+# remaining inner walls is removed as well, which adds loops and gives ships
+# room to dodge.
+#
+# The same seed always gives the same maze. The walls are 20 px thick like the
+# hand-made labyrinth, and the wall pieces along one grid line are joined into
+# one long wall, so a 20000x20000 world with cell_size=100 has about 20000 walls.
+#
+# generate_maze() returns pygame.Rect walls (the format of create_labyrinth()).
+# maze_layout() returns a layout for labyrinth_compiler.py; its "chunk_size"
+# sets the cell size of the wall grid, the spatial chunks in which the compiled
+# walls are stored, so collision, spawning and drawing only look at the chunks
+# around a query, however large the world is.
+
+BORDER = 50  # Distance of the outer walls from the world border, as in labyrinth.json
+WALL_THICKNESS = 20
+
+
+# Walls of a maze as (x, y, width, height) tuples: the outer walls first, then the
+# vertical and the horizontal inner walls.
+def _maze_walls(seed, world_width, world_height, cell_size, openness):
+    rng = random.Random(seed)
+    cols = max(1, (world_width - 2 * BORDER - WALL_THICKNESS) // cell_size)
+    rows = max(1, (world_height - 2 * BORDER - WALL_THICKNESS) // cell_size)
+
+    # east[row][col]: wall between (col, row) and (col + 1, row); south: between (col, row) and (col, row + 1)
+    east = [[col < cols - 1 for col in range(cols)] for _ in range(rows)]
+    south = [[row < rows - 1] * cols for row in range(rows)]
+
+    visited = [[False] * cols for _ in range(rows)]
+    start = (rng.randrange(cols), rng.randrange(rows))
+    visited[start[1]][start[0]] = True
+    stack = [start]
+    while stack:
+        col, row = stack[-1]
+        neighbors = [(c, r) for c, r in ((col - 1, row), (col + 1, row), (col, row - 1), (col, row + 1))
+                     if 0 <= c < cols and 0 <= r < rows and not visited[r][c]]
+        if not neighbors:
+            stack.pop()
+            continue
+        c, r = rng.choice(neighbors)
+        if c != col:
+            east[row][min(c, col)] = False
+        else:
+            south[min(r, row)][col] = False
+        visited[r][c] = True
+        stack.append((c, r))
+
+    if openness > 0:
+        for row in range(rows):
+            for col in range(cols):
+                if east[row][col] and rng.random() < openness:
+                    east[row][col] = False
+                if south[row][col] and rng.random() < openness:
+                    south[row][col] = False
+
+    size_x, size_y = cols * cell_size, rows * cell_size
+    walls = [
+        (BORDER, BORDER, size_x + WALL_THICKNESS, WALL_THICKNESS),  # Top
+        (BORDER, BORDER, WALL_THICKNESS, size_y + WALL_THICKNESS),  # Left
+        (BORDER, BORDER + size_y, size_x + WALL_THICKNESS, WALL_THICKNESS),  # Bottom
+        (BORDER + size_x, BORDER, WALL_THICKNESS, size_y + WALL_THICKNESS),  # Right
+    ]
+    # Join the wall pieces along every grid line into runs
+    for col in range(cols - 1):
+        x = BORDER + (col + 1) * cell_size
+        for start, length in _runs([east[row][col] for row in range(rows)]):
+            walls.append((x, BORDER + start * cell_size, WALL_THICKNESS, length * cell_size + WALL_THICKNESS))
+    for row in range(rows - 1):
+        y = BORDER + (row + 1) * cell_size
+        for start, length in _runs(south[row]):
+            walls.append((BORDER + start * cell_size, y, length * cell_size + WALL_THICKNESS, WALL_THICKNESS))
+    return walls
+
+
+# (start, length) of every run of True values.
+def _runs(pieces):
+    runs = []
+    start = None
+    for i, piece in enumerate(pieces + [False]):
+        if piece and start is None:
+            start = i
+        elif not piece and start is not None:
+            runs.append((start, i - start))
+            start = None
+    return runs
+
+
+# Walls of a seeded maze as a list of pygame.Rect, like create_labyrinth().
+def generate_maze(seed, world_width=20000, world_height=20000, cell_size=200, openness=0.1):
+    return [pygame.Rect(wall) for wall in _maze_walls(seed, world_width, world_height, cell_size, openness)]
+
+
+# Layout (see labyrinth_compiler.py) of a seeded maze.
+def maze_layout(seed, world_width=20000, world_height=20000, cell_size=200, openness=0.1, chunk_size=200):
+    walls = _maze_walls(seed, world_width, world_height, cell_size, openness)
+    return {
+        "name": f"maze-{seed}",
+        "world": {"width": world_width, "height": world_height},
+        "chunk_size": chunk_size,
+        "walls": [{"x": x, "y": y, "width": width, "height": height} for x, y, width, height in walls],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a maze layout for labyrinth_compiler.py")
+    parser.add_argument("--seed", type=int, default=0, help="maze seed (same seed, same maze)")
+    parser.add_argument("--width", type=int, default=20000, help="world width")
+    parser.add_argument("--height", type=int, default=20000, help="world height")
+    parser.add_argument("--cell-size", type=int, default=200, help="size of the maze cells (corridor width + wall)")
+    parser.add_argument("--openness", type=float, default=0.1, help="share of inner walls removed to add loops")
+    parser.add_argument("--chunk-size", type=int, default=200, help="size of the wall grid chunks")
+    parser.add_argument("-o", "--output", default="maze.json", help="output layout file")
+    args = parser.parse_args()
+
+    layout = maze_layout(args.seed, args.width, args.height, args.cell_size, args.openness, args.chunk_size)
+    with open(args.output, "w") as f:
+        json.dump(layout, f)
+    print(f"{len(layout['walls'])} walls written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
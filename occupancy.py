@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+
+# ------------------------
+# OccupancyMap Class
+# ------------------------
+
+# The labyrinth rasterised once into a bitmap: every cell of resolution x
+# resolution pixels is True if a wall covers (part of) it. A summed-area table
+# (the running sum of the bitmap over rows and columns) answers "is there any
+# wall in this box?" with four array lookups, independent of the number of walls.
+#
+# Boxes follow pygame.Rect rules: a box (left, top, width, height) covers the
+# pixels left <= x < left + width. For walls on the resolution grid (all walls
+# of create_labyrinth() are multiples of 10) the answers are exact; other walls
+# are rounded outwards to whole cells.
+class OccupancyMap:
+    def __init__(self, walls, width, height, resolution=10):
+        self.resolution = resolution
+        self.cols = max(1, math.ceil(width / resolution))
+        self.rows = max(1, math.ceil(height / resolution))
+        self.bitmap = np.zeros((self.rows, self.cols), dtype=bool)
+        for wall in walls:
+            c0, c1 = self._span(wall.x, wall.width, self.cols)
+            r0, r1 = self._span(wall.y, wall.height, self.rows)
+            self.bitmap[r0:r1, c0:c1] = True
+        # sat[r, c] = number of wall cells in bitmap[:r, :c]
+        self.sat = np.zeros((self.rows + 1, self.cols + 1), dtype=np.int32)
+        self.sat[1:, 1:] = self.bitmap.cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)
+
+    # OccupancyMap on an existing bitmap and summed-area table (e.g. memory-mapped
+    # from a compiled labyrinth, see labyrinth_compiler.py).
+    @classmethod
+    def from_arrays(cls, bitmap, sat, resolution):
+        occupancy = cls.__new__(cls)
+        occupancy.resolution = resolution
+        occupancy.rows, occupancy.cols = bitmap.shape
+        occupancy.bitmap = bitmap
+        occupancy.sat = sat
+        return occupancy
+
+    # First and one-past-last cell covered by the pixel range [start, start + size).
+    def _span(self, start, size, count):
+        first = min(max(int(start // self.resolution), 0), count)
+        last = min(max(int(-(-(start + size) // self.resolution)), 0), count)
+        return first, last
+
+    # True if the point lies in a wall cell (points outside the map are free).
+    def point_blocked(self, x, y):
+        col = int(x // self.resolution)
+        row = int(y // self.resolution)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return bool(self.bitmap[row, col])
+        return False
+
+    # True if the box (left, top, width, height) overlaps a wall.
+    def box_blocked(self, left, top, width, height):
+        res = self.resolution
+        c0 = int(left // res)
+        c1 = int(-(-(left + width) // res))
+        r0 = int(top // res)
+        r1 = int(-(-(top + height) // res))
+        if c0 < 0:
+            c0 = 0
+        if r0 < 0:
+            r0 = 0
+        if c1 > self.cols:
+            c1 = self.cols
+        if r1 > self.rows:
+            r1 = self.rows
+        if c0 >= c1 or r0 >= r1:
+            return False
+        sat = self.sat
+        return sat.item(r1, c1) - sat.item(r0, c1) - sat.item(r1, c0) + sat.item(r0, c0) > 0
+
+    # Vectorized point_blocked for arrays of x and y.
+    def points_blocked(self, xs, ys):
+        col = np.floor_divide(np.asarray(xs, dtype=float), self.resolution).astype(np.intp)
+        row = np.floor_divide(np.asarray(ys, dtype=float), self.resolution).astype(np.intp)
+        inside = (col >= 0) & (col < self.cols) & (row >= 0) & (row < self.rows)
+        result = np.zeros(col.shape, dtype=bool)
+        result[inside] = self.bitmap[row[inside], col[inside]]
+        return result
+
+    # Vectorized box_blocked for arrays of left/top coordinates and one box size.
+    # Same interface as WallGrid.overlaps, so both can be used for bullet tests.
+    def overlaps(self, left, top, width, height):
+        left = np.asarray(left, dtype=float)
+        top = np.asarray(top, dtype=float)
+        res = self.resolution
+        c0 = np.minimum(np.maximum(left // res, 0), self.cols).astype(np.intp)
+        c1 = np.minimum(np.maximum(-(-(left + width) // res), 0), self.cols).astype(np.intp)
+        r0 = np.minimum(np.maximum(top // res, 0), self.rows).astype(np.intp)
+        r1 = np.minimum(np.maximum(-(-(top + height) // res), 0), self.rows).astype(np.intp)
+        sat = self.sat
+        count = sat[r1, c1] - sat[r0, c1] - sat[r1, c0] + sat[r0, c0]
+        return (count > 0) & (c0 < c1) & (r0 < r1)
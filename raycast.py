@@ -0,0 +1,305 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from wall_grid import WallGrid, segment_entry
+
+# ------------------------
+# Raycasting
+# ------------------------
+
+# One raycast for lasers, line-of-sight and "wall ahead?" checks. With a
+# WallGrid a ray walks the grid cells it crosses in order (DDA, digital
+# differential analyzer) and only tests the walls of those cells; it stops at
+# the first cell that contains a hit, so a short or blocked ray touches only a
+# few walls whatever the size of the labyrinth. A plain list of walls is
+# tested wall by wall.
+#
+# Walls can be grown by radius on every side, which turns the ray into a box of
+# half-size radius swept along the line (e.g. the 10x10 probe of the enemy line
+# of sight). Touching an edge does not count as a hit, like
+# pygame.Rect.colliderect; a ray starting inside a wall hits it at distance 0.
+#
+# With max_dist only walls whose center lies closer than max_dist to the start
+# of the ray count (the sensing range of the DummyAgent, whose lasers only look
+# at the walls within 2000 px and its wall check at those within 50 px).
+#
+# cast_segment / cast_ray return the first hit as a RayHit (or None);
+# cast_segments / cast_rays do the same for many rays at once with NumPy (up to
+# SMALL_COUNT rays one by one, which is cheaper for a few of them).
+
+SMALL_COUNT = 8
+
+RayHit = namedtuple("RayHit", "distance x y wall")  # wall: the wall (Rect) that was hit
+RayHits = namedtuple("RayHits", "distance x y wall")  # Arrays; wall: index into walls, -1 = no hit
+
+
+# First hit on the way from (x0, y0) to (x1, y1), or None.
+def cast_segment(walls, x0, y0, x1, y1, radius=0, max_dist=None):
+    dx, dy = x1 - x0, y1 - y0
+    t, index = _cast_one(walls, x0, y0, dx, dy, radius, max_dist)
+    if index is None:
+        return None
+    return RayHit(t * math.hypot(dx, dy), x0 + t * dx, y0 + t * dy, walls[index])
+
+
+# First hit of a ray of the given length from (x, y) in direction angle (degrees).
+def cast_ray(walls, x, y, angle, length, radius=0, max_dist=None):
+    rad = math.radians(angle)
+    return cast_segment(walls, x, y, x + math.cos(rad) * length, y + math.sin(rad) * length, radius, max_dist)
+
+
+# True if nothing blocks the way from (x0, y0) to (x1, y1).
+def line_of_sight(walls, x0, y0, x1, y1, radius=0):
+    return cast_segment(walls, x0, y0, x1, y1, radius) is None
+
+
+# Smallest t and the index of the wall hit first, or (inf, None).
+def _cast_one(walls, x0, y0, dx, dy, radius, max_dist):
+    if isinstance(walls, WallGrid):
+        return _cast_grid(walls, x0, y0, dx, dy, radius, max_dist)
+    t, index = math.inf, None
+    for i, wall in enumerate(walls):
+        if max_dist is not None and not _in_range(wall, x0, y0, max_dist):
+            continue
+        entry = segment_entry(wall, x0, y0, dx, dy, radius)
+        if entry is not None and entry < t:
+            t, index = entry, i
+    return t, index
+
+
+# True if the center of the wall is closer than max_dist to (x, y).
+def _in_range(wall, x, y, max_dist):
+    return math.hypot(x - (wall.x + wall.width / 2), y - (wall.y + wall.height / 2)) < max_dist
+
+
+# Walk the grid cells along the segment until a cell holds a hit: returns the
+# smallest t and the index of the wall (lowest index on ties), or (inf, None).
+def _cast_grid(grid, x0, y0, dx, dy, radius, max_dist=None):
+    cells = grid.cells_within(int(math.ceil(radius)))
+    walls = grid.walls
+    size = grid.cell_size
+    gx = (x0 - grid.origin_x) / size
+    gy = (y0 - grid.origin_y) / size
+    col, row = math.floor(gx), math.floor(gy)
+    # t at the next column/row border and t per crossed cell
+    if dx > 0:
+        step_col, delta_col, next_col = 1, size / dx, (col + 1 - gx) * size / dx
+    elif dx < 0:
+        step_col, delta_col, next_col = -1, -size / dx, (gx - col) * size / -dx
+    else:
+        step_col, delta_col, next_col = 0, math.inf, math.inf
+    if dy > 0:
+        step_row, delta_row, next_row = 1, size / dy, (row + 1 - gy) * size / dy
+    elif dy < 0:
+        step_row, delta_row, next_row = -1, -size / dy, (gy - row) * size / -dy
+    else:
+        step_row, delta_row, next_row = 0, math.inf, math.inf
+
+    cols, last_col, last_row = grid.cols, grid.cols - 1, grid.rows - 1
+    best_t, best = math.inf, None
+    tested = set()
+    # Most steps cross empty cells, so they avoid function calls (min/max)
+    while True:
+        if 0 <= row <= last_row and 0 <= col <= last_col:
+            cell = cells[row * cols + col]
+        else:  # Outside of the grid the border cells hold all walls that can be hit
+            cell = cells[min(max(row, 0), last_row) * cols + min(max(col, 0), last_col)]
+        for i in cell:
+            if i in tested:
+                continue
+            tested.add(i)
+            if max_dist is not None and not _in_range(walls[i], x0, y0, max_dist):
+                continue
+            t = segment_entry(walls[i], x0, y0, dx, dy, radius)
+            if t is not None and (t < best_t or (t == best_t and i < best)):
+                best_t, best = t, i
+        # Leave the cell through the nearer border, unless the hit or the end comes first
+        if next_col < next_row:
+            if best_t <= next_col or next_col >= 1:
+                return best_t, best
+            col += step_col
+            next_col += delta_col
+        else:
+            if best_t <= next_row or next_row >= 1:
+                return best_t, best
+            row += step_row
+            next_row += delta_row
+
+
+# cast_segment for arrays of start and end points (max_dist: one for all rays
+# or an array with one per ray). Returns RayHits of arrays: distance to the
+# hit, hit point and wall index; rays that hit nothing get their full length,
+# their end point and wall -1.
+def cast_segments(walls, x0, y0, x1, y1, radius=0, max_dist=None):
+    few = _few_rays(x0, y0, x1, y1, max_dist)
+    if few is not None:
+        (x0, y0, x1, y1, max_dist), shape = few
+        dx = [end - start for start, end in zip(x0, x1)]
+        dy = [end - start for start, end in zip(y0, y1)]
+        return _cast_few(walls, x0, y0, dx, dy, radius, max_dist, shape)
+    x0, y0 = np.asarray(x0, dtype=float), np.asarray(y0, dtype=float)
+    dx, dy = np.asarray(x1, dtype=float) - x0, np.asarray(y1, dtype=float) - y0
+    if max_dist is not None:
+        max_dist = np.asarray(max_dist, dtype=float)
+    if x0.shape != dx.shape:  # E.g. many starts and one end point
+        x0, y0 = np.broadcast_to(x0, dx.shape), np.broadcast_to(y0, dx.shape)
+    best_t = np.full(dx.shape, np.inf)
+    best = np.full(dx.shape, -1, dtype=np.intp)
+    if dx.size and len(walls):
+        if max_dist is not None:
+            max_dist = np.broadcast_to(max_dist, dx.shape)
+        if isinstance(walls, WallGrid):
+            _cast_grid_many(walls, x0, y0, dx, dy, radius, max_dist, best_t, best)
+        else:
+            boxes = np.array([(wall.x, wall.y, wall.width, wall.height) for wall in walls], dtype=float)
+            candidates = np.broadcast_to(np.arange(len(boxes)), (dx.size, len(boxes)))
+            t = _entries(boxes, candidates, x0, y0, dx, dy, radius, max_dist)
+            best[:] = t.argmin(axis=1)
+            best_t[:] = t[np.arange(dx.size), best]
+            best[np.isinf(best_t)] = -1
+    t = np.where(best >= 0, best_t, 1.0)
+    return RayHits(t * np.hypot(dx, dy), x0 + t * dx, y0 + t * dy, best)
+
+
+# The columns (numbers, flat sequences of numbers or None) as one list of
+# Python floats per column, plus the shape of the rays, if they make at most
+# SMALL_COUNT rays; else None and NumPy handles them (np.shape alone costs
+# more than casting a few short rays). Sequences of one are repeated.
+def _few_rays(*columns):
+    lists, count = [], None
+    for column in columns:
+        if column is None or isinstance(column, (int, float)):
+            lists.append(column)
+            continue
+        if isinstance(column, (list, tuple)):
+            try:
+                values = [float(value) for value in column]
+            except TypeError:  # Nested sequences
+                return None
+        elif isinstance(column, np.ndarray) and column.ndim == 1:
+            values = column.tolist()
+        else:
+            return None
+        if len(values) != 1:
+            if count is not None and count != len(values):
+                return None  # Left to NumPy (and its broadcasting error)
+            count = len(values)
+        lists.append(values)
+    if count is None:  # Scalars and sequences of one
+        shape, count = ((1,) if any(isinstance(values, list) for values in lists) else ()), 1
+    elif count > SMALL_COUNT:
+        return None
+    else:
+        shape = (count,)
+    for i, values in enumerate(lists):
+        if not isinstance(values, list):
+            lists[i] = [values] * count
+        elif len(values) != count:
+            lists[i] = values * count
+    return lists, shape
+
+
+# cast_segments for up to SMALL_COUNT rays (lists of floats): one by one in
+# plain Python, only the results become arrays of the given shape.
+def _cast_few(walls, x0, y0, dx, dy, radius, max_dist, shape):
+    found = bool(len(walls))
+    distance, hit_x, hit_y, index = [], [], [], []
+    for ray_x, ray_y, ray_dx, ray_dy, limit in zip(x0, y0, dx, dy, max_dist):
+        t, wall = _cast_one(walls, ray_x, ray_y, ray_dx, ray_dy, radius, limit) if found else (1.0, None)
+        if wall is None:
+            t, wall = 1.0, -1
+        distance.append(t * math.hypot(ray_dx, ray_dy))
+        hit_x.append(ray_x + t * ray_dx)
+        hit_y.append(ray_y + t * ray_dy)
+        index.append(wall)
+    hits = RayHits(np.array(distance, dtype=float), np.array(hit_x, dtype=float), np.array(hit_y, dtype=float),
+                   np.array(index, dtype=np.intp))
+    if not shape:  # One ray given as scalars
+        hits = RayHits(*(column.reshape(()) for column in hits))
+    return hits
+
+
+# cast_ray for arrays of start points, angles (degrees) and lengths.
+def cast_rays(walls, x, y, angles, lengths, radius=0, max_dist=None):
+    few = _few_rays(x, y, angles, lengths, max_dist)
+    if few is not None:
+        # Same end points as cast_ray
+        (x, y, angles, lengths, max_dist), shape = few
+        rad = [math.radians(angle) for angle in angles]
+        dx = [(start + math.cos(r) * length) - start for start, r, length in zip(x, rad, lengths)]
+        dy = [(start + math.sin(r) * length) - start for start, r, length in zip(y, rad, lengths)]
+        return _cast_few(walls, x, y, dx, dy, radius, max_dist, shape)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    rad = np.radians(angles)
+    return cast_segments(walls, x, y, x + np.cos(rad) * lengths, y + np.sin(rad) * lengths, radius, max_dist)
+
+
+# segment_entry for many segments against the candidate walls of each segment
+# (padded with -1): t of the hit per candidate, inf where it is missed or the
+# wall is out of range (max_dist per segment, or None).
+def _entries(boxes, candidates, x0, y0, dx, dy, radius, max_dist=None):
+    boxes = boxes[candidates]
+    left = boxes[..., 0] - radius
+    top = boxes[..., 1] - radius
+    right = boxes[..., 0] + boxes[..., 2] + radius
+    bottom = boxes[..., 1] + boxes[..., 3] + radius
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # With 1/0 = inf a resting coordinate gives (-inf, inf) inside the
+        # slab and an empty interval outside of it
+        inv_dx = (1 / dx)[:, None]
+        inv_dy = (1 / dy)[:, None]
+        tx0 = (left - x0[:, None]) * inv_dx
+        tx1 = (right - x0[:, None]) * inv_dx
+        ty0 = (top - y0[:, None]) * inv_dy
+        ty1 = (bottom - y0[:, None]) * inv_dy
+    t_enter = np.maximum(np.minimum(tx0, tx1), np.minimum(ty0, ty1))
+    t_exit = np.minimum(np.maximum(tx0, tx1), np.maximum(ty0, ty1))
+    hit = (t_enter < t_exit) & (t_exit > 0) & (t_enter <= 1) & (candidates >= 0)
+    if max_dist is not None:
+        center_x = boxes[..., 0] + boxes[..., 2] / 2
+        center_y = boxes[..., 1] + boxes[..., 3] / 2
+        hit &= np.hypot(x0[:, None] - center_x, y0[:, None] - center_y) < max_dist[:, None]
+    return np.where(hit, np.maximum(t_enter, 0), np.inf)
+
+
+# _cast_grid for all segments in lockstep: every round tests the current cell
+# of the rays still running and moves them on by one cell.
+def _cast_grid_many(grid, x0, y0, dx, dy, radius, max_dist, best_t, best):
+    size = grid.cell_size
+    gx = (x0 - grid.origin_x) / size
+    gy = (y0 - grid.origin_y) / size
+    col, row = np.floor(gx), np.floor(gy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_col = size / np.abs(dx)
+        delta_row = size / np.abs(dy)
+        next_col = np.where(dx > 0, col + 1 - gx, gx - col) * delta_col
+        next_row = np.where(dy > 0, row + 1 - gy, gy - row) * delta_row
+    next_col[dx == 0] = np.inf
+    next_row[dy == 0] = np.inf
+    step_col, step_row = np.sign(dx), np.sign(dy)
+
+    running = np.arange(x0.size)
+    while running.size:
+        # Candidates of the current cell (looked up at its center, clamped to the grid)
+        candidates = grid.candidates(grid.origin_x + (col[running] + 0.5) * size,
+                                     grid.origin_y + (row[running] + 0.5) * size, radius)
+        t = _entries(grid.boxes, candidates, x0[running], y0[running], dx[running], dy[running], radius,
+                     None if max_dist is None else max_dist[running])
+        first = t.argmin(axis=1)
+        t_min = t[np.arange(running.size), first]
+        wall = candidates[np.arange(running.size), first]
+        better = (t_min < best_t[running]) | ((t_min == best_t[running]) & (wall < best[running]))
+        best_t[running[better]] = t_min[better]
+        best[running[better]] = wall[better]
+
+        leave = np.minimum(next_col[running], next_row[running])
+        running = running[(best_t[running] > leave) & (leave < 1)]
+        along_col = next_col[running] < next_row[running]
+        moved = running[along_col]
+        col[moved] += step_col[moved]
+        next_col[moved] += delta_col[moved]
+        moved = running[~along_col]
+        row[moved] += step_row[moved]
+        next_row[moved] += delta_row[moved]
@@ -0,0 +1,127 @@
+import sys
+import threading
+import time
+import traceback
+from collections import deque, namedtuple
+
+# ------------------------
+# RingLogger Class
+# ------------------------
+
+# In-memory log for the engine, the agents and the servers. log() only checks
+# the level of the subsystem ("engine", "agent", "server", ...) and appends the
+# message and its arguments to a ring buffer; the text is only formatted
+# (message % args) when somebody reads the buffer. Writing to a stream (the
+# console, a file) happens in flush(), called on demand or by a background
+# thread (start()), so no log I/O lands in the frame loop or in a request.
+#
+# When the buffer is full the oldest records are dropped (dropped counts them).
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+Record = namedtuple("Record", "seq time subsystem level message args")
+
+
+class RingLogger:
+    def __init__(self, capacity=10000, level="info"):
+        self.records = deque(maxlen=capacity)
+        self.default_level = LEVELS[level]
+        self.levels = {}  # Subsystem -> minimum level (number)
+        self.lock = threading.Lock()
+        self.next_seq = 0
+        self.flushed_seq = 0  # Records before this one were written by flush()
+        self.dropped = 0
+        self.sink = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # Minimum level of a subsystem ("debug", "info", "warning", "error").
+    def set_level(self, subsystem, level):
+        self.levels[subsystem] = LEVELS[level]
+
+    def enabled(self, subsystem, level):
+        return LEVELS[level] >= self.levels.get(subsystem, self.default_level)
+
+    # Record message % args if the level is enabled for the subsystem. With
+    # exc_info the current exception's traceback is added (formatted now, as
+    # the exception is gone later).
+    def log(self, subsystem, level, message, *args, exc_info=False):
+        if LEVELS[level] < self.levels.get(subsystem, self.default_level):
+            return
+        if exc_info:
+            message, args = "%s\n%s", (message % args, traceback.format_exc().rstrip())
+        with self.lock:
+            if len(self.records) == self.records.maxlen:
+                self.dropped += 1
+            self.records.append(Record(self.next_seq, time.time(), subsystem, level, message, args))
+            self.next_seq += 1
+
+    def debug(self, subsystem, message, *args):
+        self.log(subsystem, "debug", message, *args)
+
+    def info(self, subsystem, message, *args):
+        self.log(subsystem, "info", message, *args)
+
+    def warning(self, subsystem, message, *args):
+        self.log(subsystem, "warning", message, *args)
+
+    def error(self, subsystem, message, *args, exc_info=False):
+        self.log(subsystem, "error", message, *args, exc_info=exc_info)
+
+    # The last limit records (optionally of one subsystem and from a minimum
+    # level on) as dictionaries with the formatted text, oldest first.
+    def tail(self, limit=100, subsystem=None, level="debug"):
+        with self.lock:
+            records = list(self.records)
+        minimum = LEVELS[level]
+        records = [r for r in records
+                   if LEVELS[r.level] >= minimum and (subsystem is None or r.subsystem == subsystem)]
+        records = records[-limit:] if limit > 0 else []
+        return [{"seq": r.seq, "time": r.time, "subsystem": r.subsystem, "level": r.level, "text": format_record(r)}
+                for r in records]
+
+    # Write the records that were not written yet to sink (default: the sink
+    # given to start(), else sys.stderr).
+    def flush(self, sink=None):
+        sink = sink or self.sink or sys.stderr
+        with self.lock:
+            records = [r for r in self.records if r.seq >= self.flushed_seq]
+            self.flushed_seq = self.next_seq
+        if records:
+            sink.write("".join(
+                f"{time.strftime('%H:%M:%S', time.localtime(r.time))} {r.level.upper()} [{r.subsystem}] {format_record(r)}\n"
+                for r in records))
+            sink.flush()
+
+    # Flush every interval seconds in a background (daemon) thread.
+    def start(self, sink=None, interval=1.0):
+        self.sink = sink
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.flush()
+            self.flush()
+
+        self._thread = threading.Thread(target=run, name="ring-log-flush", daemon=True)
+        self._thread.start()
+
+    # Stop the background thread (after a last flush).
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+def format_record(record):
+    try:
+        return record.message % record.args if record.args else record.message
+    except (TypeError, ValueError):
+        return f"{record.message} {record.args!r}"
+
+
+# The log of this process, shared by all modules
+logger = RingLogger()
@@ -1,18 +1,30 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dummy_agent import DummyAgent
+from ring_log import logger, LEVELS
 
 import traceback
 
+# Write the log to stderr in a background thread while the server runs (not in
+# the requests, and not when this module is only imported)
+@asynccontextmanager
+async def lifespan(app):
+    logger.start()
+    yield
+    logger.stop()
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Game state model
 class Ship(BaseModel):
     x: float
     y: float
     angle: float
+    id: Optional[int] = None  # Stable ship ID from GameEngine.get_game_state()
 
 class Wall(BaseModel):
     x: float
@@ -31,8 +43,24 @@ agent = DummyAgent(ship_index=0)
 async def decide(game_state: GameState):
     # Get actions from DummyAgent
     actions = agent.decide(game_state.dict(), game_state.walls)
+    logger.debug("server", "decide: %d ships -> %s", len(game_state.ships), actions)  # Formatted only when read
     return actions
 
+# Debug endpoints: read the in-memory log and change the level of a subsystem
+# (e.g. POST /debug/log_level?subsystem=server&level=debug).
+@app.get("/debug/log")
+async def debug_log(limit: int = 100, subsystem: Optional[str] = None, level: str = "debug"):
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level}")
+    return {"records": logger.tail(limit, subsystem, level), "dropped": logger.dropped}
+
+@app.post("/debug/log_level")
+async def debug_log_level(subsystem: str, level: str):
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level}")
+    logger.set_level(subsystem, level)
+    return {"subsystem": subsystem, "level": level}
+
 @app.get("/game_state")
 async def get_game_state():
     # Return an example game state with ships and walls
@@ -0,0 +1,179 @@
+import math
+
+import numpy as np
+
+# Speeds, thrust, friction and lifespans are tuned per frame of FRAME_DT seconds
+# (60 FPS). Steps of another length dt count as dt / FRAME_DT frames.
+FRAME_DT = 1 / 60
+
+COLUMNS = ("x", "y", "prev_x", "prev_y", "vx", "vy", "ax", "ay", "angle", "max_speed", "hp", "alive")
+
+# ------------------------
+# ShipStore Class (Structure of Arrays)
+# ------------------------
+
+# This class keeps the physics state of all ships in NumPy columns
+# (x, y, vx, vy, angle, hp, max_speed) instead of one Python object per ship.
+# A ship is a slot (row) in these columns. Thrust is collected in the ax/ay
+# columns and applied, together with friction, speed clamping and world
+# clamping, to all ships at once in integrate().
+# SpaceObject (engine.py) is a thin view on one slot of a store.
+class ShipStore:
+    # Up to this many ships integrate() loops over them in plain Python: for the
+    # usual 2-ship game that is much cheaper than a dozen NumPy calls on tiny arrays.
+    SMALL_COUNT = 8
+
+    def __init__(self, capacity=16, world_width=2000, world_height=2000):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.capacity = 0
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.prev_x = np.zeros(0)  # Position before the last integrate(), for rendering
+        self.prev_y = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        self.ax = np.zeros(0)  # Thrust collected since the last integrate()
+        self.ay = np.zeros(0)
+        self.angle = np.zeros(0)
+        self.max_speed = np.zeros(0)
+        self.hp = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.free = []  # Free slots, the lowest slot is reused first
+        self._grow(max(1, capacity))
+
+    # Double the capacity (or grow to the requested capacity) and keep the data.
+    def _grow(self, capacity=None):
+        new_capacity = capacity or self.capacity * 2
+        for name in COLUMNS:
+            old = getattr(self, name)
+            column = np.zeros(new_capacity, dtype=old.dtype)
+            column[:self.capacity] = old
+            setattr(self, name, column)
+        self.free = list(range(new_capacity - 1, self.capacity - 1, -1)) + self.free
+        self.capacity = new_capacity
+
+    # Add a ship and return its slot.
+    def add(self, x, y, angle=0, vx=0, vy=0, hp=100, max_speed=8):
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.vx[slot] = vx
+        self.vy[slot] = vy
+        self.ax[slot] = 0
+        self.ay[slot] = 0
+        self.angle[slot] = angle
+        self.hp[slot] = hp
+        self.max_speed[slot] = max_speed
+        self.alive[slot] = True
+        return slot
+
+    # Free a slot so it can be reused by the next add().
+    def remove(self, slot):
+        self.alive[slot] = False
+        self.free.append(slot)
+        self.free.sort(reverse=True)
+
+    # Add thrust in the direction the ship is facing.
+    # The velocity changes on the next integrate().
+    def thrust(self, slot, amount):
+        rad = math.radians(self.angle[slot])
+        self.ax[slot] += math.cos(rad) * amount
+        self.ay[slot] += math.sin(rad) * amount
+
+    # Position of a ship between its last two simulation steps (alpha 0: previous,
+    # 1: current), used to draw smooth motion when rendering and simulation rates differ.
+    def interpolate(self, slot, alpha):
+        x, prev_x = self.x.item(slot), self.prev_x.item(slot)
+        y, prev_y = self.y.item(slot), self.prev_y.item(slot)
+        return prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha
+
+    # Advance the given slots (all living ships if None) by dt seconds:
+    # apply the collected thrust, friction, the max_speed clamp and keep the
+    # ships inside the world.
+    # The thrust is held for the whole step and friction decays exponentially
+    # (friction per frame), so one step of dt = 4 * FRAME_DT is close to four
+    # frames; at dt = FRAME_DT the result is exactly that of one frame.
+    # Both paths do the same float operations, so they give identical results.
+    # A long step can be split into sub-steps (see GameEngine.update): the
+    # thrust is then held until the last sub-step and the previous position
+    # (for rendering) is the one before the first sub-step.
+    def integrate(self, slots=None, friction=0.99, dt=FRAME_DT, first_substep=True, last_substep=True):
+        frames = dt / FRAME_DT
+        decay = friction ** frames
+        if slots is not None and len(slots) <= self.SMALL_COUNT:
+            self._integrate_small(slots, frames, decay, first_substep, last_substep)
+            return
+        idx = np.flatnonzero(self.alive) if slots is None else np.asarray(slots, dtype=np.intp)
+        max_speed = self.max_speed[idx]
+        vx = np.clip((self.vx[idx] + self.ax[idx] * frames) * decay, -max_speed, max_speed)
+        vy = np.clip((self.vy[idx] + self.ay[idx] * frames) * decay, -max_speed, max_speed)
+        self.vx[idx] = vx
+        self.vy[idx] = vy
+        if last_substep:
+            self.ax[idx] = 0
+            self.ay[idx] = 0
+        if first_substep:
+            self.prev_x[idx] = self.x[idx]
+            self.prev_y[idx] = self.y[idx]
+        self.x[idx] = np.clip(self.x[idx] + vx * frames, 0, self.world_width)
+        self.y[idx] = np.clip(self.y[idx] + vy * frames, 0, self.world_height)
+
+    # integrate() for a few slots, one ship at a time (np.clip is min(max())).
+    def _integrate_small(self, slots, frames, decay, first_substep=True, last_substep=True):
+        xs, ys, vxs, vys, axs, ays = self.x, self.y, self.vx, self.vy, self.ax, self.ay
+        for slot in slots:
+            max_speed = self.max_speed.item(slot)
+            vx = min(max((vxs.item(slot) + axs.item(slot) * frames) * decay, -max_speed), max_speed)
+            vy = min(max((vys.item(slot) + ays.item(slot) * frames) * decay, -max_speed), max_speed)
+            vxs[slot] = vx
+            vys[slot] = vy
+            if last_substep:
+                axs[slot] = 0
+                ays[slot] = 0
+            x, y = xs.item(slot), ys.item(slot)
+            if first_substep:
+                self.prev_x[slot] = x
+                self.prev_y[slot] = y
+            xs[slot] = min(max(x + vx * frames, 0), self.world_width)
+            ys[slot] = min(max(y + vy * frames, 0), self.world_height)
+
+
+# A list with .item(i), like a NumPy column.
+class _Column(list):
+    item = list.__getitem__
+
+
+# ------------------------
+# SingleShipStore Class
+# ------------------------
+
+# Store of a standalone ship (a SpaceObject created without a store, or a
+# removed player that keeps its final state). Same interface as ShipStore, but
+# the columns are one-element Python lists instead of a dozen NumPy arrays, so
+# such a ship is cheap to create. integrate() always takes the plain Python path.
+class SingleShipStore(ShipStore):
+    def __init__(self, world_width=2000, world_height=2000):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.capacity = 1
+        for name in COLUMNS:
+            setattr(self, name, _Column([False if name == "alive" else 0]))
+        self.free = [0]
+
+    # More ships still fit (the lists grow), e.g. for tests.
+    def _grow(self, capacity=None):
+        new_capacity = capacity or self.capacity * 2
+        for name in COLUMNS:
+            getattr(self, name).extend([False if name == "alive" else 0] * (new_capacity - self.capacity))
+        self.free = list(range(new_capacity - 1, self.capacity - 1, -1)) + self.free
+        self.capacity = new_capacity
+
+    def integrate(self, slots=None, friction=0.99, dt=FRAME_DT, first_substep=True, last_substep=True):
+        if slots is None:
+            slots = [slot for slot in range(self.capacity) if self.alive[slot]]
+        frames = dt / FRAME_DT
+        self._integrate_small(slots, frames, friction ** frames, first_substep, last_substep)
+
@@ -0,0 +1,177 @@
+import math
+
+import numpy as np
+
+# ------------------------
+# SpatialHash Class (Dynamic Broadphase)
+# ------------------------
+
+# Ships move every frame, so unlike the walls (wall_grid.py) they are hashed
+# again on every tick: build() sorts the ships by the grid cell they are in.
+# pairs_within() then finds, for many query points at once (e.g. all bullets),
+# the ships closer than a radius by only looking at the cells around each point;
+# segment_pairs_within() does the same for moving points (segments).
+# Everything is done with NumPy, there is no loop over points or ships.
+# For a few segments and items segment_pairs() tests all pairs directly, so
+# the hash does not even have to be built (up to SMALL_COUNT pairs one by one
+# in plain Python).
+
+SMALL_COUNT = 16
+
+
+class SpatialHash:
+    # Below this many point-item combinations a plain distance matrix is cheaper
+    # than the cell lookups (e.g. the usual 2-ship game with a few bullets).
+    BRUTE_FORCE_LIMIT = 2048
+
+    def __init__(self, cell_size=30):
+        self.cell_size = cell_size
+        self.xs = np.zeros(0)
+        self.ys = np.zeros(0)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.intp)
+
+    # Key of the cell (col, row); works for negative cells as well.
+    @staticmethod
+    def _key(col, row):
+        return (col + (1 << 20)) * (1 << 21) + (row + (1 << 20))
+
+    def _cells(self, xs, ys):
+        return (np.floor_divide(xs, self.cell_size).astype(np.int64),
+                np.floor_divide(ys, self.cell_size).astype(np.int64))
+
+    # Hash the item positions (arrays) for this tick.
+    def build(self, xs, ys):
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        keys = self._key(*self._cells(self.xs, self.ys))
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    # Candidate (point, item) pairs: every item in the cells within reach of each point.
+    def _candidates(self, px, py, reach):
+        if px.size * self.xs.size <= self.BRUTE_FORCE_LIMIT:
+            points, items = np.indices((px.size, self.xs.size)).reshape(2, -1)
+            return points, items
+        n = max(1, int(np.ceil(reach / self.cell_size)))
+        col, row = self._cells(px, py)
+        points, items = [], []
+        for dc in range(-n, n + 1):
+            for dr in range(-n, n + 1):
+                keys = self._key(col + dc, row + dr)
+                lo = np.searchsorted(self.sorted_keys, keys, side="left")
+                counts = np.searchsorted(self.sorted_keys, keys, side="right") - lo
+                total = counts.sum()
+                if total == 0:
+                    continue
+                # Expand every point into one entry per item in the cell
+                point = np.repeat(np.arange(px.size), counts)
+                offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                points.append(point)
+                items.append(self.order[np.repeat(lo, counts) + offset])
+        if not points:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(points), np.concatenate(items)
+
+    # Sort pairs by point and then by item.
+    @staticmethod
+    def _sorted(points, items):
+        order = np.lexsort((items, points))
+        return points[order], items[order]
+
+    # All (point, item) index pairs with distance(point, item) < radius, sorted by
+    # point and then item.
+    def pairs_within(self, px, py, radius):
+        px = np.asarray(px, dtype=float)
+        py = np.asarray(py, dtype=float)
+        if px.size == 0 or self.sorted_keys.size == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty
+        points, items = self._candidates(px, py, radius)
+        close = np.hypot(px[points] - self.xs[items], py[points] - self.ys[items]) < radius
+        return self._sorted(points[close], items[close])
+
+    # Swept version of pairs_within: all (segment, item) pairs where the item comes
+    # closer than radius to the segment from (x0, y0) to (x1, y1), sorted by
+    # segment and item, and the t (0 = start, 1 = end) at which each segment
+    # first comes that close (see segment_circle_entries).
+    def segment_pairs_within(self, x0, y0, x1, y1, radius):
+        x0, y0 = np.asarray(x0, dtype=float), np.asarray(y0, dtype=float)
+        x1, y1 = np.asarray(x1, dtype=float), np.asarray(y1, dtype=float)
+        if x0.size == 0 or self.sorted_keys.size == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, np.zeros(0)
+        dx, dy = x1 - x0, y1 - y0
+        # Look around the midpoints, far enough to cover the whole segment
+        reach = radius + np.hypot(dx, dy).max() / 2
+        points, items = self._candidates((x0 + x1) / 2, (y0 + y1) / 2, reach)
+        close, t = segment_circle_entries(x0[points], y0[points], dx[points], dy[points],
+                                          self.xs[items], self.ys[items], radius)
+        order = np.lexsort((items[close], points[close]))
+        return points[close][order], items[close][order], t[close][order]
+
+
+# segment_pairs_within without a SpatialHash: a matrix of every segment against
+# every item at (xs, ys). Cheaper than building the hash for a few of them.
+def segment_pairs(x0, y0, x1, y1, xs, ys, radius):
+    x0, y0 = np.asarray(x0, dtype=float), np.asarray(y0, dtype=float)
+    x1, y1 = np.asarray(x1, dtype=float), np.asarray(y1, dtype=float)
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    if x0.size * xs.size <= SMALL_COUNT:
+        return _segment_pairs_few(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist(), xs.tolist(), ys.tolist(), radius)
+    x0, y0 = x0[:, None], y0[:, None]
+    dx, dy = x1[:, None] - x0, y1[:, None] - y0
+    close, t = segment_circle_entries(x0, y0, dx, dy, xs, ys, radius)
+    # nonzero() lists the pairs row by row, so they are already sorted
+    points, items = np.nonzero(close)
+    return points, items, t[points, items]
+
+
+# segment_pairs for up to SMALL_COUNT pairs (lists of floats), pair by pair.
+def _segment_pairs_few(x0, y0, x1, y1, xs, ys, radius):
+    points, items, entries = [], [], []
+    for point, (start_x, start_y, end_x, end_y) in enumerate(zip(x0, y0, x1, y1)):
+        dx, dy = end_x - start_x, end_y - start_y
+        for item, (cx, cy) in enumerate(zip(xs, ys)):
+            entry = segment_circle_entry(start_x, start_y, dx, dy, cx, cy, radius)
+            if entry is not None:
+                points.append(point)
+                items.append(item)
+                entries.append(entry)
+    return np.array(points, dtype=np.intp), np.array(items, dtype=np.intp), np.array(entries, dtype=float)
+
+
+# segment_circle_entries for one segment and one circle: the entry t, or None
+# if the segment does not come closer than radius (same float operations).
+def segment_circle_entry(x0, y0, dx, dy, cx, cy, radius):
+    length2 = dx * dx + dy * dy
+    t_line = ((cx - x0) * dx + (cy - y0) * dy) / length2 if length2 > 0 else 0
+    t = min(max(t_line, 0), 1)
+    if not math.hypot(x0 + t * dx - cx, y0 + t * dy - cy) < radius:
+        return None
+    if length2 == 0:
+        return 0.0
+    perp2 = (x0 + t_line * dx - cx) ** 2 + (y0 + t_line * dy - cy) ** 2
+    half_chord = math.sqrt(max(radius * radius - perp2, 0) / length2)
+    return max(t_line - half_chord, 0.0)
+
+
+# For segments from (x0, y0) along (dx, dy) and circles of radius around
+# (cx, cy) (arrays of one shape, or broadcastable): a mask of the segments that
+# come closer than radius to the center, and the t (0 = start, 1 = end) at
+# which they first do.
+def segment_circle_entries(x0, y0, dx, dy, cx, cy, radius):
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_line = ((cx - x0) * dx + (cy - y0) * dy) / length2
+    t_line = np.where(length2 > 0, t_line, 0)
+    # Closest point of the segment to the center
+    t = np.clip(t_line, 0, 1)
+    close = np.hypot(x0 + t * dx - cx, y0 + t * dy - cy) < radius
+    # The line enters the circle half a chord before its closest point
+    perp2 = (x0 + t_line * dx - cx) ** 2 + (y0 + t_line * dy - cy) ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        half_chord = np.sqrt(np.maximum(radius * radius - perp2, 0) / length2)
+    entry = np.where(length2 > 0, np.maximum(t_line - half_chord, 0), 0)
+    return close, entry
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from active_region import ActiveRegion
+from engine import SpaceObject
+from ship_store import ShipStore
+
+# ------------------------
+# ActiveRegion
+# ------------------------
+
+# Chunks of 1000 px: ships wake up two chunks and fall asleep four chunks
+# (sleep_radius 3) away from the player.
+
+
+def make_ships(store, positions):
+    ships = []
+    for ship_id, (x, y) in enumerate(positions):
+        ship = SpaceObject(x, y, store=store)
+        ship.id = ship_id
+        ships.append(ship)
+    return ships
+
+
+def test_ship_wakes_and_sleeps_at_chunk_boundaries():
+    store = ShipStore(world_width=10000, world_height=10000)
+    player, ship = make_ships(store, [(500, 500), (3500, 500)])
+    region = ActiveRegion(chunk_size=1000, wake_radius=2)
+    region.add(player, [(player.x, player.y)])
+    region.add(ship, [(player.x, player.y)])
+    assert region.active == [player]
+    assert not region.is_active(ship)
+
+    player.x = 1000  # Chunk (1, 0): two chunks from the ship
+    assert region.update([(player.x, player.y)], store) == [player, ship]
+    assert region.woken == 1
+
+    # Back in chunk (0, 0): three chunks away, within sleep_radius, so the ship stays awake
+    player.x = 999
+    assert region.update([(player.x, player.y)], store) == [player, ship]
+
+    # The ship crosses into chunk (4, 0): four chunks away, it falls asleep there
+    ship.x = 3999
+    assert region.update([(player.x, player.y)], store) == [player, ship]
+    ship.x = 4000
+    assert region.update([(player.x, player.y)], store) == [player]
+    assert region.sleeping == {(4, 0): [ship]}
+    assert region.put_to_sleep == 1
+
+    # A sleeping ship is frozen: moving the player next to it wakes it where it was
+    player.x, player.y = 2000, 1500
+    assert region.update([(player.x, player.y)], store) == [player, ship]
+    assert (ship.x, ship.y) == (4000, 500)
+
+
+def test_without_anchors_nothing_changes():
+    store = ShipStore()
+    player, ship = make_ships(store, [(500, 500), (5500, 500)])
+    region = ActiveRegion(chunk_size=1000, wake_radius=2)
+    region.add(player, [])
+    region.add(ship, [])
+    assert region.update([], store) == [player, ship]
+
+
+@pytest.mark.parametrize("count", [10, 40])  # Plain Python and NumPy sleep tests
+def test_active_ships_stay_in_id_order(count):
+    rng = random.Random(count)
+    store = ShipStore(world_width=20000, world_height=20000)
+    ships = make_ships(store, [(rng.uniform(0, 20000), rng.uniform(0, 20000)) for _ in range(count)])
+    region = ActiveRegion(chunk_size=1000, wake_radius=2)
+    for ship in ships:
+        region.add(ship, [(10000, 10000)])
+    for _ in range(20):
+        anchor = (rng.uniform(0, 20000), rng.uniform(0, 20000))
+        active = region.update([anchor], store)
+        assert [ship.id for ship in active] == sorted(ship.id for ship in active)
+        col, row = anchor[0] // 1000, anchor[1] // 1000
+        distance = {ship.id: max(abs(ship.x // 1000 - col), abs(ship.y // 1000 - row)) for ship in ships}
+        assert all(distance[ship.id] <= 3 for ship in active)
+        assert all(ship in active for ship in ships if distance[ship.id] <= 2)
+        assert len(active) + sum(len(chunk) for chunk in region.sleeping.values()) == count
+
+
+def test_region_over_the_whole_world_never_sleeps():
+    assert ActiveRegion(chunk_size=1000, wake_radius=2, world_size=(2000, 2000)).everywhere
+    assert not ActiveRegion(chunk_size=1000, wake_radius=2, world_size=(3000, 2000)).everywhere
+    assert not ActiveRegion(chunk_size=1000, wake_radius=2).everywhere
+    store = ShipStore()
+    player, ship = make_ships(store, [(0, 0), (2000, 2000)])
+    region = ActiveRegion(chunk_size=1000, wake_radius=2, sleep_radius=1, world_size=(2000, 2000))
+    for s in (player, ship):
+        region.add(s, [(player.x, player.y)])
+    assert region.update([(player.x, player.y)], store) == [player, ship]
+    assert region.put_to_sleep == 0
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from agent_registry import AgentRegistry
+from engine import GameEngine, run_agents
+
+# ------------------------
+# AgentRegistry
+# ------------------------
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = 0
+        self.resets = 0
+
+    def decide(self, game_state, walls):
+        self.calls += 1
+        return {"rotate": 0, "thrust": 0, "shoot": False}
+
+    def reset(self):
+        self.resets += 1
+
+
+def test_agent_of_a_removed_ship_is_dropped():
+    random.seed(0)
+    engine = GameEngine([])
+    player, enemy = engine.ships[0], engine.ships[1]
+    player_agent, enemy_agent = Recorder(), Recorder()
+    engine.agents.bind(player.id, player_agent)
+    engine.agents.bind(enemy.id, enemy_agent)
+    run_agents(engine, engine.wall_grid)
+    assert (player_agent.calls, enemy_agent.calls) == (1, 1)
+    assert enemy.id not in [ship.id for ship in engine.thinking_enemies()]  # Bound: no enemy AI
+
+    enemy.hp = 0
+    engine.update(engine.wall_grid)  # Removes the enemy, spawns two new ones
+    run_agents(engine, engine.wall_grid)
+    assert enemy.id not in engine.agents
+    assert (player_agent.calls, enemy_agent.calls) == (2, 1)
+    assert len(engine.agents) == 1
+
+
+def test_agents_are_kept_and_reset():
+    created = []
+
+    def factory(ship_id):
+        created.append(Recorder())
+        return created[-1]
+
+    registry = AgentRegistry(factory)
+    agent = registry.bind(4)
+    assert registry.get(4) is agent and 4 in registry
+    for _ in range(3):
+        registry.decide({"ships": []}, [], lambda ship_id: True)
+    assert agent.calls == 3 and len(created) == 1  # Same agent every tick
+    registry.bind(5, object())  # Agents without reset()
+    registry.reset()
+    assert agent.resets == 1
+    assert registry.unbind(4) is agent and 4 not in registry
+
+
+def test_bind_without_agent_needs_a_factory():
+    with pytest.raises(ValueError):
+        AgentRegistry().bind(1)
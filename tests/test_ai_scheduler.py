@@ -0,0 +1,74 @@
+import time
+from types import SimpleNamespace
+
+from ai_scheduler import AIScheduler
+from ship_store import ShipStore
+
+
+def make_enemies(store, positions):
+    enemies = []
+    for i, (x, y) in enumerate(positions):
+        enemy = SimpleNamespace(id=i + 1, x=x, y=y, store=store, slot=store.add(x, y))
+        enemy.rotate = lambda degrees: None
+        enemies.append(enemy)
+    return enemies
+
+
+def run(scheduler, ticks):
+    store = ShipStore()
+    player = SimpleNamespace(x=0, y=0)
+    enemies = make_enemies(store, [(100, 0), (1000, 0), (3000, 0)])  # Near, mid, far
+    decided = []
+    for _ in range(ticks):
+        scheduler.run(enemies, player, lambda enemy: decided.append(enemy.id) or (0, 0, 0, False))
+    return decided
+
+
+# Without a time budget tiering is off: every enemy decides every tick.
+def test_without_budget_every_enemy_decides_every_tick():
+    scheduler = AIScheduler()
+    decided = run(scheduler, 30)
+    assert sorted(decided) == [1] * 30 + [2] * 30 + [3] * 30
+    assert scheduler.reused == 0
+
+
+def test_with_budget_far_enemies_decide_less_often():
+    scheduler = AIScheduler(time_budget=1.0)
+    decided = run(scheduler, 30)
+    assert decided.count(1) == 30
+    assert decided.count(2) == 10  # Every 3rd tick
+    assert decided.count(3) == 4  # The first tick, then every 10th
+    assert scheduler.reused > 0
+
+
+def test_prepare_gets_the_enemies_due_this_tick():
+    scheduler = AIScheduler(time_budget=1.0)
+    store = ShipStore()
+    player = SimpleNamespace(x=0, y=0)
+    enemies = make_enemies(store, [(100, 0), (1000, 0), (3000, 0)])
+    for tick in range(10):
+        prepared, decided = [], []
+        scheduler.run(enemies, player, lambda enemy: decided.append(enemy.id) or (0, 0, 0, False),
+                      lambda due: prepared.append([enemy.id for enemy in due]))
+        assert [i for batch in prepared for i in batch] == decided
+        if tick:  # Once the decision time is known, a large budget fits all in one batch
+            assert len(prepared) == 1
+
+
+# Enemies deferred by the budget are not prepared (their raycasts would be wasted).
+def test_prepare_skips_the_deferred_enemies():
+    scheduler = AIScheduler(time_budget=0.003)
+    store = ShipStore()
+    player = SimpleNamespace(x=0, y=0)
+    enemies = make_enemies(store, [(1000 + 10 * i, 0) for i in range(12)])  # All mid range
+
+    def decide(enemy):
+        decided.append(enemy.id)
+        time.sleep(0.001)
+        return 0, 0, 0, False
+
+    for _ in range(6):
+        prepared, decided = [], []
+        scheduler.run(enemies, player, decide, lambda due: prepared.append([enemy.id for enemy in due]))
+        assert [i for batch in prepared for i in batch] == decided
+    assert scheduler.deferred > 0
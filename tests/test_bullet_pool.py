@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from bullet_pool import BulletPool
+
+# ------------------------
+# BulletPool
+# ------------------------
+
+
+def test_expired_slots_are_reused():
+    pool = BulletPool(capacity=4)
+    slots = [pool.spawn(100, 100, 0, owner=1) for _ in range(3)]
+    assert len(set(slots)) == 3
+    assert len(pool) == 3
+    pool.expire(np.array(slots), np.array([False, True, False]))
+    assert len(pool) == 2
+    assert pool.active().tolist() == sorted([slots[0], slots[2]])
+    assert pool.spawn(100, 100, 0, owner=2) == slots[1]
+    assert len(pool) == 3
+
+
+def test_full_pool_replaces_the_bullet_closest_to_expiring():
+    pool = BulletPool(capacity=3)
+    slots = [pool.spawn(100, 100, 0, owner=1, lifespan=lifespan) for lifespan in (30, 10, 20)]
+    slot = pool.spawn(500, 500, 90, owner=2)
+    assert slot == slots[1]
+    assert len(pool) == 3
+    assert (pool.x[slot], pool.y[slot], pool.owner[slot], pool.lifespan[slot]) == (500, 500, 2, 60)
+
+
+def test_advance_and_expiry():
+    pool = BulletPool(capacity=4, world_width=200, world_height=200)
+    inside = pool.spawn(100, 100, 0, owner=1, speed=10, lifespan=2)
+    leaving = pool.spawn(195, 100, 0, owner=1, speed=10)
+    idx = pool.advance()
+    assert (pool.prev_x[inside], pool.x[inside]) == (100, pytest.approx(110))
+    assert pool.expired(idx).tolist() == [False, True]
+    pool.advance(dt=1 / 60)
+    assert pool.lifespan[inside] == pytest.approx(0)
+    assert pool.expired(np.array([inside])).tolist() == [True]
+    assert leaving in pool.active()  # Only expire() removes bullets
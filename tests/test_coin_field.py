@@ -0,0 +1,45 @@
+import math
+import random
+
+import pytest
+
+from coin_field import CoinField
+from engine import Coin
+
+# ------------------------
+# CoinField
+# ------------------------
+
+
+def brute_force(coins, x, y, k):
+    return sorted(math.hypot(coin.x - x, coin.y - y) for coin in coins)[:k]
+
+
+def distances(coins, x, y):
+    return [math.hypot(coin.x - x, coin.y - y) for coin in coins]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_coins_match_brute_force(seed):
+    rng = random.Random(seed)
+    field = CoinField([Coin(rng.randint(20, 1980), rng.randint(20, 1980)) for _ in range(60)], [],
+                      respawn_delay=None)
+    for _ in range(50):
+        # Also points outside the world and far from every coin
+        x, y = rng.uniform(-500, 2500), rng.uniform(-500, 2500)
+        for k in (1, 3, 10, 60, 100):
+            assert distances(field.nearest_coins(x, y, k), x, y) == pytest.approx(brute_force(field.coins, x, y, k))
+
+
+def test_nearest_coins_after_collecting():
+    rng = random.Random(0)
+    field = CoinField([Coin(rng.randint(20, 1980), rng.randint(20, 1980)) for _ in range(40)], [],
+                      respawn_delay=None)
+    taken = field.coins[:10]
+    assert field.collect([(coin.x, coin.y) for coin in taken]) == [1] * 10
+    assert len(field) == 30
+    for coin in taken:
+        assert coin not in field.nearest_coins(coin.x, coin.y, 30)
+        assert distances(field.nearest_coins(coin.x, coin.y, 5), coin.x, coin.y) == pytest.approx(
+            brute_force(field.coins, coin.x, coin.y, 5))
+    assert field.nearest_coins(0, 0, 0) == []
@@ -0,0 +1,32 @@
+import pygame
+import pytest
+
+from dummy_agent import DummyAgent
+
+# ------------------------
+# DummyAgent
+# ------------------------
+
+
+def ship(ship_id, x, y, angle=0):
+    return {"id": ship_id, "x": x, "y": y, "angle": angle, "vx": 0, "vy": 0, "hp": 100}
+
+
+def test_aims_at_the_other_ship():
+    agent = DummyAgent(ship_id=7)
+    actions = agent.decide({"ships": [ship(3, 600, 600), ship(7, 500, 500)]}, [])
+    assert actions == {"rotate": 40, "thrust": 0.5, "shoot": True}
+
+
+def test_without_another_ship_the_agent_only_flies():
+    agent = DummyAgent(ship_id=7)
+    assert agent.decide({"ships": [ship(7, 500, 500)]}, []) == {"rotate": 1, "thrust": 1, "shoot": False}
+    actions = agent.decide({"ships": [ship(7, 500, 500)]}, [pygame.Rect(505, 400, 20, 200)])
+    assert actions["thrust"] == 0 and not actions["shoot"]  # Wall ahead: turns away
+    # Game states without IDs
+    assert DummyAgent().decide({"ships": [ship(None, 500, 500)]}, [])["shoot"] is False
+
+
+def test_missing_own_ship_is_an_error():
+    with pytest.raises(ValueError):
+        DummyAgent(ship_id=7).decide({"ships": [ship(3, 600, 600)]}, [])
@@ -0,0 +1,153 @@
+import math
+import random
+
+import pygame
+import pytest
+
+from engine import GameEngine, SpaceObject
+from ship_store import SingleShipStore
+
+# ------------------------
+# Bullets at long time steps (dt > FRAME_DT)
+# ------------------------
+
+DT = 1 / 15  # Four frames: a bullet moves 60 px per step
+
+
+# A duel along y = 1000: the player at x = 940 faces the enemy at x = 1005.
+def duel(walls):
+    engine = GameEngine(walls)
+    player, enemy = engine.ships[0], engine.ships[1]
+    player.x, player.y, player.angle = 940, 1000, 0
+    enemy.x, enemy.y, enemy.angle = 1005, 1000, 180
+    return engine, player, enemy
+
+
+def fire(engine, player, steps=3):
+    engine.shoot(player.id)
+    for _ in range(steps):
+        engine.update(engine.wall_grid, dt=DT)
+
+
+def test_bullet_hits_ship_in_one_long_step():
+    engine, player, enemy = duel([pygame.Rect(1500, 0, 20, 100)])
+    fire(engine, player)
+    assert enemy.hp == 90
+    assert len(engine.bullets) == 0
+
+
+@pytest.mark.parametrize("wall", [pygame.Rect(970, 900, 20, 200), pygame.Rect(985, 900, 5, 200)])
+def test_wall_between_shooter_and_ship_blocks_the_bullet(wall):
+    # The bullet jumps from x = 955 to 1015 in one step: its path crosses the
+    # wall first and then the enemy
+    engine, player, enemy = duel([wall])
+    fire(engine, player)
+    assert enemy.hp == 100
+    assert len(engine.bullets) == 0
+
+
+# A ship flying at a 20 px wall: it moves 32 px per long step, but must stop at
+# the wall as it does with one-frame steps.
+@pytest.mark.parametrize("dt", [1 / 60, DT])
+def test_ship_does_not_pass_through_a_thin_wall(dt):
+    engine = GameEngine([pygame.Rect(500, 0, 20, 1000)])
+    player = engine.ships[0]
+    player.x, player.y, player.vx, player.vy, player.angle = 400, 500, 8, 0, 0
+    for _ in range(round(1 / dt)):  # One second
+        engine.update(engine.wall_grid, dt=dt)
+    assert player.x == 490
+    assert player.vx == 0
+
+
+def test_long_step_keeps_the_thrust_of_the_whole_step():
+    frames, step = GameEngine([]), GameEngine([])
+    for engine, dt, count in ((frames, 1 / 60, 4), (step, DT, 1)):
+        player = engine.ships[0]
+        player.x, player.y, player.vx, player.vy, player.angle = 1000, 1000, 0, 0, 0
+        for _ in range(count):
+            player.thrust(0.3)
+            engine.update(engine.wall_grid, dt=dt)
+    assert step.ships[0].x == pytest.approx(frames.ships[0].x, abs=0.5)
+    assert step.ships[0].vx == pytest.approx(frames.ships[0].vx, abs=0.01)
+
+
+# ------------------------
+# Kill points
+# ------------------------
+
+# As in the original game, the player earns 10 points whenever the enemy
+# (engine.ships[1]) is destroyed by a hit, whoever fired the bullet.
+@pytest.mark.parametrize("shooter", ["player", "other enemy"])
+def test_killing_the_enemy_scores(shooter):
+    engine, player, enemy = duel([pygame.Rect(1500, 0, 20, 100)])
+    engine.pending_spawns = 1
+    engine._spawn_pending(engine.wall_grid)
+    other = engine.ships[2]
+    other.x, other.y, other.angle = 940, 1000, 0
+    if shooter != "player":
+        player.x, player.y = 500, 500  # Out of the way of the bullet
+    enemy.hp = 10
+    fire(engine, player if shooter == "player" else other, steps=1)
+    assert engine.score[0] == 10
+
+
+def test_killing_another_enemy_does_not_score():
+    engine, player, enemy = duel([pygame.Rect(1500, 0, 20, 100)])
+    engine.pending_spawns = 1
+    engine._spawn_pending(engine.wall_grid)
+    other = engine.ships[2]
+    other.x, other.y, other.hp = 1005, 1000, 10
+    enemy.x, enemy.y = 500, 500
+    fire(engine, player, steps=1)
+    assert other.hp <= 0
+    assert engine.score[0] == 0
+
+
+# The two ships shoot at each other with some spread, at times with more than
+# a few bullets in flight: the one-by-one path for a few bullets
+# (BulletPool.is_few) gives exactly the results of the arrays.
+@pytest.mark.parametrize("dt", [1 / 60, DT])
+def test_few_bullets_path_matches_the_arrays(dt, monkeypatch):
+    results = []
+    for few in (True, False):
+        random.seed(3)
+        engine = GameEngine([pygame.Rect(1000, 900, 20, 200)])
+        for ship in engine.ships:
+            ship.x, ship.y, ship.hp = random.uniform(700, 1300), random.uniform(800, 1200), 1000
+        if not few:
+            monkeypatch.setattr(engine.bullets, "is_few", lambda ship_count, wall_grid: False)
+        for _ in range(300):
+            for ship, other in zip(engine.ships, engine.ships[::-1]):
+                if random.random() < 0.06:
+                    ship.angle = math.degrees(math.atan2(other.y - ship.y, other.x - ship.x)) + random.uniform(-20, 20)
+                    engine.shoot(ship.id)
+            engine.update(engine.wall_grid, dt=dt)
+        bullets = engine.bullets
+        results.append(([ship.hp for ship in engine.ships],
+                        [getattr(bullets, name).tolist() for name in ("x", "y", "lifespan", "alive")], bullets.free))
+    assert results[0] == results[1]
+    assert all(hp < 1000 for hp in results[0][0])  # Both ships were hit
+
+
+# ------------------------
+# SpaceObject
+# ------------------------
+
+
+def test_standalone_ship_has_a_single_ship_store():
+    ship = SpaceObject(100, 200, angle=90)
+    assert isinstance(ship.store, SingleShipStore)
+    ship.thrust(1)
+    ship.update_position()
+    assert ship.y > 200
+
+
+def test_get_state_keeps_whole_numbers_as_ints():
+    engine = GameEngine([])
+    player = engine.ships[0]
+    player.x, player.y, player.vx, player.vy, player.angle = 500, 600, 0, 0, 0
+    state = player.get_state()
+    assert state == {"x": 500, "y": 600, "vx": 0, "vy": 0, "angle": 0}
+    assert all(type(value) is int for value in state.values())
+    player.x = 500.5
+    assert player.get_state()["x"] == 500.5
@@ -0,0 +1,56 @@
+import io
+import random
+
+from engine import GameEngine
+from events import DECISION, HIT, KILL, SHOT, EventBus, PrintSubscriber
+
+# ------------------------
+# EventBus
+# ------------------------
+
+
+def test_events_are_only_created_while_somebody_subscribes():
+    bus = EventBus()
+    bus.emit(HIT, ship_id=1, hp=90, owner=0)
+    assert bus.pending == []
+    batches = []
+    bus.subscribe(batches.append)
+    bus.emit(HIT, ship_id=1, hp=90, owner=0)
+    bus.unsubscribe(batches.append)
+    assert not bus.enabled
+    bus.emit(HIT, ship_id=1, hp=80, owner=0)
+    assert len(bus.pending) == 1
+
+
+def test_events_are_delivered_once_per_tick_as_a_batch():
+    bus = EventBus()
+    everything, kills = [], []
+    bus.subscribe(everything.append)
+    bus.subscribe(kills.append, kinds=[KILL])
+    bus.emit(HIT, ship_id=1, hp=0, owner=0)
+    bus.emit(KILL, ship_id=1, killer=0)
+    assert everything == []  # Nothing before the end of the tick
+    bus.flush()
+    bus.flush()  # Empty tick: no calls
+    bus.emit(SHOT, ship_id=0)
+    bus.flush()
+    assert [[(event.kind, event.tick) for event in batch] for batch in everything] == [
+        [(HIT, 0), (KILL, 0)], [(SHOT, 2)]]
+    assert [[event.data for event in batch] for batch in kills] == [[{"ship_id": 1, "killer": 0}]]
+
+
+def test_engine_emits_hits_only_to_subscribers():
+    random.seed(0)
+    engine = GameEngine([])
+    player, enemy = engine.ships[0], engine.ships[1]
+    player.x, player.y, player.angle = 500, 500, 0
+    enemy.x, enemy.y = 540, 500
+    engine.shoot(player.id)
+    engine.update(engine.wall_grid)
+    assert enemy.hp == 90 and engine.events.pending == []
+
+    out = io.StringIO()
+    engine.events.subscribe(PrintSubscriber(out), kinds=[HIT, DECISION])
+    engine.shoot(player.id)
+    engine.update(engine.wall_grid)
+    assert out.getvalue() == f"Ship {enemy.id} hit! HP: 80\n"
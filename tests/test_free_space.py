@@ -0,0 +1,36 @@
+import json
+import random
+
+import pytest
+
+from labyrinth_compiler import load_labyrinth
+from wall_grid import WallGrid
+
+# ------------------------
+# FreeSpaceSampler
+# ------------------------
+
+
+# Matches of the same layout share one WallGrid per process, so the free-space
+# samplers are built only once.
+def test_samplers_are_shared_per_layout(tmp_path):
+    layout = tmp_path / "layout.json"
+    layout.write_text(json.dumps({"world": {"width": 400, "height": 300},
+                                  "walls": [{"x": 100, "y": 100, "width": 20, "height": 100}]}))
+    first = load_labyrinth(str(layout), cache_dir=str(tmp_path)).wall_grid()
+    sampler = first.free_space(10, 400, 300)
+    second = load_labyrinth(str(layout), cache_dir=str(tmp_path)).wall_grid()
+    assert second is first
+    assert second.free_space(10, 400, 300) is sampler
+
+
+# A 300x300 world where almost every position is within 350 px of (280, 280),
+# so the random tries fail and sample() picks among the far cells in the top
+# left corner. The offset inside a cell points towards avoid there.
+@pytest.mark.parametrize("seed", range(5))
+def test_crowded_sample_keeps_min_distance(seed):
+    sampler = WallGrid([]).free_space(10, 300, 300)
+    rng = random.Random(seed)
+    for _ in range(200):
+        x, y = sampler.sample(rng, avoid=(280, 280), min_distance=350)
+        assert (x - 280) ** 2 + (y - 280) ** 2 >= 350 ** 2
@@ -0,0 +1,122 @@
+import json
+import os
+
+import numpy as np
+import pygame
+import pytest
+
+from labyrinth_compiler import (DEFAULT_LAYOUT, FORMAT_VERSION, MAGIC, compile_layout, layout_hash, load_labyrinth,
+                                load_layout, merge_walls, open_artifact, write_artifact)
+from wall_grid import WallGrid
+
+# ------------------------
+# merge_walls
+# ------------------------
+
+
+def test_overlapping_walls_of_a_row_or_column_merge():
+    assert merge_walls([(0, 0, 30, 10), (20, 0, 30, 10)]) == [(0, 0, 50, 10)]
+    assert merge_walls([(0, 0, 10, 30), (0, 20, 10, 30)]) == [(0, 0, 10, 50)]
+    # Chains merge in one call, the first occurrence keeps its place
+    walls = [(500, 5, 1, 1), (40, 0, 20, 10), (0, 0, 30, 10), (20, 0, 30, 10)]
+    assert merge_walls(walls) == [(500, 5, 1, 1), (0, 0, 60, 10)]
+
+
+def test_walls_inside_another_wall_are_dropped():
+    assert merge_walls([(0, 0, 100, 20), (10, 5, 20, 10), (0, 0, 100, 20)]) == [(0, 0, 100, 20)]
+
+
+def test_touching_and_corner_walls_are_kept():
+    touching = [(0, 0, 10, 10), (10, 0, 10, 10)]
+    corner = [(0, 0, 10, 10), (5, 5, 10, 10)]
+    assert merge_walls(touching) == touching
+    assert merge_walls(corner) == corner
+
+
+def test_default_labyrinth_merges_to_22_walls():
+    layout = load_layout(DEFAULT_LAYOUT)
+    assert len(merge_walls((w["x"], w["y"], w["width"], w["height"]) for w in layout["walls"])) == 22
+
+
+# ------------------------
+# Artifact File
+# ------------------------
+
+LAYOUT = {"world": {"width": 400, "height": 300},
+          "walls": [{"x": 0, "y": 0, "width": 400, "height": 20},
+                    {"x": 100, "y": 50, "width": 20, "height": 100},
+                    {"x": 100, "y": 120, "width": 20, "height": 100}]}
+
+
+def write_layout(tmp_path, layout, name="layout.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(layout))
+    return str(path)
+
+
+def test_artifact_round_trip(tmp_path):
+    meta, arrays = compile_layout(LAYOUT)
+    expected = {name: np.array(array) for name, array in arrays.items()}
+    path = str(tmp_path / "layout.lab")
+    write_artifact(path, layout_hash(LAYOUT), meta, arrays)
+    labyrinth = open_artifact(path)
+    assert labyrinth.layout_hash == layout_hash(LAYOUT)
+    assert labyrinth.meta == meta
+    assert labyrinth.walls.tolist() == [[0, 0, 400, 20], [100, 50, 20, 170]]
+    for name, array in expected.items():
+        assert labyrinth.arrays[name].dtype == array.dtype
+        assert np.array_equal(labyrinth.arrays[name], array)
+    assert isinstance(labyrinth.arrays["sat"], np.memmap)
+    # Every array starts on an aligned offset of the file
+    assert all(array.offset % 64 == 0 for array in labyrinth.arrays.values() if isinstance(array, np.memmap))
+
+
+def test_wall_grid_from_artifact_matches_a_new_one(tmp_path):
+    grid = load_labyrinth(write_layout(tmp_path, LAYOUT), cache_dir=str(tmp_path)).wall_grid()
+    fresh = WallGrid([pygame.Rect(0, 0, 400, 20), pygame.Rect(100, 50, 20, 170)])
+    assert grid.world_size == (400, 300)
+    assert grid.walls == fresh.walls
+    assert list(grid.cells) == list(fresh.cells)
+    assert np.array_equal(grid.occupancy.bitmap, fresh.occupancy.bitmap)
+    assert np.array_equal(grid.occupancy.sat, fresh.occupancy.sat)
+
+
+@pytest.mark.parametrize("header", [b"NOTALABY" + np.array([FORMAT_VERSION, 2], dtype="<u4").tobytes() + b"{}",
+                                    MAGIC + np.array([FORMAT_VERSION + 1, 2], dtype="<u4").tobytes() + b"{}"])
+def test_open_artifact_checks_magic_and_version(tmp_path, header):
+    path = tmp_path / "old.lab"
+    path.write_bytes(header)
+    with pytest.raises(ValueError):
+        open_artifact(str(path))
+
+
+def test_load_labyrinth_compiles_once_and_again_after_a_change(tmp_path):
+    layout_path = write_layout(tmp_path, LAYOUT)
+    cache_dir = str(tmp_path / "cache")
+    first = load_labyrinth(layout_path, cache_dir)
+    files = os.listdir(cache_dir)
+    assert files == [f"{layout_hash(LAYOUT)[:32]}.lab"]
+    modified = os.path.getmtime(os.path.join(cache_dir, files[0]))
+    # Same layout, other formatting: the file is reused
+    with open(layout_path, "w") as f:
+        json.dump(LAYOUT, f, indent=4)
+    assert load_labyrinth(layout_path, cache_dir).layout_hash == first.layout_hash
+    assert os.listdir(cache_dir) == files
+    assert os.path.getmtime(os.path.join(cache_dir, files[0])) == modified
+    # Changed layout: new hash, compiled again
+    changed = dict(LAYOUT, walls=LAYOUT["walls"][:1])
+    write_layout(tmp_path, changed)
+    second = load_labyrinth(layout_path, cache_dir)
+    assert second.layout_hash == layout_hash(changed) != first.layout_hash
+    assert second.walls.tolist() == [[0, 0, 400, 20]]
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_damaged_cache_file_is_compiled_again(tmp_path):
+    layout_path = write_layout(tmp_path, LAYOUT)
+    cache_dir = str(tmp_path / "cache")
+    path = os.path.join(cache_dir, f"{layout_hash(LAYOUT)[:32]}.lab")
+    os.makedirs(cache_dir)
+    with open(path, "wb") as f:
+        f.write(MAGIC + np.array([FORMAT_VERSION - 1, 2], dtype="<u4").tobytes() + b"{}")
+    assert load_labyrinth(layout_path, cache_dir).walls.tolist() == [[0, 0, 400, 20], [100, 50, 20, 170]]
@@ -0,0 +1,33 @@
+from match_farm import merge_results, stream_matches
+
+# ------------------------
+# Match Farm
+# ------------------------
+
+
+# The report without the timings, which differ from run to run.
+def game_results(report):
+    report = dict(report)
+    report["matches"] = [{key: value for key, value in stats.items() if key not in ("wall_time", "speedup")}
+                         for stats in report["matches"]]
+    return report
+
+
+# Half-minute matches: the players lose HP and collect coins differently per seed.
+def test_report_is_the_same_for_any_number_of_workers():
+    seeds = [3, 0, 2, 1]
+    single = merge_results(stream_matches(seeds, max_ticks=1800, workers=1))
+    pool = merge_results(stream_matches(seeds, max_ticks=1800, workers=3))
+    assert [stats["seed"] for stats in single["matches"]] == [0, 1, 2, 3]
+    assert single["count"] == 4
+    assert game_results(pool) == game_results(single)
+
+
+def test_merge_results_totals():
+    matches = [{"seed": 1, "ticks": 100, "survived": True, "score": 4, "kills": 0, "coins": 4},
+               {"seed": 0, "ticks": 50, "survived": False, "score": 11, "kills": 1, "coins": 1}]
+    report = merge_results(matches)
+    assert [stats["seed"] for stats in report["matches"]] == [0, 1]
+    assert (report["total_ticks"], report["survived"]) == (150, 1)
+    assert (report["mean_score"], report["mean_kills"], report["mean_coins"], report["mean_ticks"]) == (7.5, 0.5, 2.5, 75)
+    assert merge_results([])["mean_score"] == 0.0
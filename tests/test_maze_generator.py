@@ -0,0 +1,74 @@
+import pytest
+
+from maze_generator import BORDER, WALL_THICKNESS, generate_maze, maze_layout
+from wall_grid import WallGrid
+
+# ------------------------
+# Maze Generator
+# ------------------------
+
+SIZE = 2000
+CELL = 200
+CELLS = (SIZE - 2 * BORDER - WALL_THICKNESS) // CELL  # Maze cells per row and column
+
+
+# Center of a maze cell (the free space between its walls).
+def center(col, row):
+    return BORDER + col * CELL + (CELL + WALL_THICKNESS) // 2, BORDER + row * CELL + (CELL + WALL_THICKNESS) // 2
+
+
+# Pairs of neighboring maze cells a 20x20 ship can fly between.
+def passages(walls):
+    grid = WallGrid(walls)
+    found = []
+    for row in range(CELLS):
+        for col in range(CELLS):
+            x, y = center(col, row)
+            if col + 1 < CELLS and not grid.collides((x, y - 10, CELL, 20)):
+                found.append(((col, row), (col + 1, row)))
+            if row + 1 < CELLS and not grid.collides((x - 10, y, 20, CELL)):
+                found.append(((col, row), (col, row + 1)))
+    return found
+
+
+def reachable(pairs):
+    neighbors = {}
+    for a, b in pairs:
+        neighbors.setdefault(a, []).append(b)
+        neighbors.setdefault(b, []).append(a)
+    seen, stack = {(0, 0)}, [(0, 0)]
+    while stack:
+        for cell in neighbors.get(stack.pop(), ()):
+            if cell not in seen:
+                seen.add(cell)
+                stack.append(cell)
+    return seen
+
+
+def test_same_seed_gives_the_same_maze():
+    assert generate_maze(7, SIZE, SIZE, CELL) == generate_maze(7, SIZE, SIZE, CELL)
+    assert maze_layout(7, SIZE, SIZE, CELL) == maze_layout(7, SIZE, SIZE, CELL)
+    assert generate_maze(7, SIZE, SIZE, CELL) != generate_maze(8, SIZE, SIZE, CELL)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_perfect_maze_is_a_connected_tree(seed):
+    pairs = passages(generate_maze(seed, SIZE, SIZE, CELL, openness=0))
+    assert len(reachable(pairs)) == CELLS * CELLS
+    assert len(pairs) == CELLS * CELLS - 1  # No loops without openness
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_open_maze_is_connected_and_has_loops(seed):
+    pairs = passages(generate_maze(seed, SIZE, SIZE, CELL, openness=0.3))
+    assert len(reachable(pairs)) == CELLS * CELLS
+    assert len(pairs) > CELLS * CELLS - 1
+
+
+def test_outer_walls_close_the_maze():
+    grid = WallGrid(generate_maze(0, SIZE, SIZE, CELL))
+    for col in range(CELLS):
+        x, y = center(col, 0)
+        assert grid.collides((x, BORDER - 10, 1, 30))  # Top
+        x, y = center(col, CELLS - 1)
+        assert grid.collides((x, y, 1, CELL))  # Bottom
@@ -0,0 +1,163 @@
+import math
+
+import numpy as np
+import pytest
+
+from engine import load_walls
+from raycast import SMALL_COUNT, cast_ray, cast_rays, cast_segment, cast_segments, line_of_sight
+
+# ------------------------
+# Raycast vs the segment-crossing test of the original DummyAgent
+# ------------------------
+
+
+# The original DummyAgent._line_intersects_line / _line_intersects_rect: the
+# laser is blocked if it crosses one of the four edges of a wall.
+def ccw(a, b, c):
+    return (c[1] - a[1]) * (b[0] - a[0]) > (b[1] - a[1]) * (c[0] - a[0])
+
+
+def lines_intersect(x1, y1, x2, y2, x3, y3, x4, y4):
+    return (ccw((x1, y1), (x3, y3), (x4, y4)) != ccw((x2, y2), (x3, y3), (x4, y4))
+            and ccw((x1, y1), (x2, y2), (x3, y3)) != ccw((x1, y1), (x2, y2), (x4, y4)))
+
+
+def line_intersects_rect(x1, y1, x2, y2, rect):
+    corners = [(rect.x, rect.y), (rect.right, rect.y), (rect.right, rect.bottom), (rect.x, rect.bottom)]
+    return any(lines_intersect(x1, y1, x2, y2, *corners[i], *corners[(i + 1) % 4]) for i in range(4))
+
+
+@pytest.fixture(scope="module")
+def walls():
+    return load_walls()
+
+
+# Random rays starting outside of every wall (a laser starting inside a wall
+# crosses no edge, while cast_ray reports a hit at distance 0).
+def random_rays(walls, seed, count):
+    rng = np.random.default_rng(seed)
+    rays = []
+    while len(rays) < count:
+        x, y = rng.uniform(0, 2000, 2)
+        if not any(wall.inflate(2, 2).collidepoint(x, y) for wall in walls):
+            rays.append((x, y, rng.uniform(0, 360)))
+    return rays
+
+
+@pytest.mark.parametrize("length", [10, 200, 1000])
+def test_cast_ray_matches_edge_crossing(walls, length):
+    blocked = 0
+    for x, y, angle in random_rays(walls, length, 500):
+        rad = math.radians(angle)
+        end_x, end_y = x + math.cos(rad) * length, y + math.sin(rad) * length
+        expected = any(line_intersects_rect(x, y, end_x, end_y, wall) for wall in walls)
+        assert (cast_ray(walls, x, y, angle, length) is not None) == expected
+        blocked += expected
+    assert length == 10 or blocked > 20
+
+
+def test_cast_ray_finds_the_nearest_wall(walls):
+    for x, y, angle in random_rays(walls, 4, 300):
+        hit = cast_ray(walls, x, y, angle, 1000)
+        plain = cast_ray(list(walls), x, y, angle, 1000)  # Every wall, no grid
+        if hit is None:
+            assert plain is None
+            continue
+        assert hit.distance == pytest.approx(plain.distance)
+        assert hit.wall == plain.wall
+        # The hit point lies on the edge of the wall
+        wall = hit.wall
+        assert wall.x - 1e-6 <= hit.x <= wall.right + 1e-6 and wall.y - 1e-6 <= hit.y <= wall.bottom + 1e-6
+        assert min(abs(hit.x - wall.x), abs(hit.x - wall.right), abs(hit.y - wall.y), abs(hit.y - wall.bottom)) < 1e-6
+
+
+def test_cast_rays_match_cast_ray(walls):
+    rays = random_rays(walls, 5, 300)
+    x, y, angles = (np.array(column) for column in zip(*rays))
+    lengths = np.linspace(10, 1500, len(rays))
+    hits = cast_rays(walls, x, y, angles, lengths, radius=5)
+    for i in range(len(rays)):
+        hit = cast_ray(walls, x[i], y[i], angles[i], lengths[i], radius=5)
+        if hit is None:
+            assert hits.wall[i] == -1
+            assert hits.distance[i] == pytest.approx(lengths[i])
+        else:
+            assert walls[hits.wall[i]] == hit.wall
+            assert hits.distance[i] == pytest.approx(hit.distance)
+
+
+def test_cast_segment_with_radius_is_a_swept_box(walls):
+    # A 10x10 box swept along the segment hits exactly when a step of it overlaps a wall
+    for x, y, angle in random_rays(walls, 6, 200):
+        rad = math.radians(angle)
+        end_x, end_y = x + math.cos(rad) * 300, y + math.sin(rad) * 300
+        hit = cast_segment(walls, x, y, end_x, end_y, radius=5)
+        t = 0 if hit is None else hit.distance / 300
+        for step in np.linspace(0, 1, 301):
+            box = (x + (end_x - x) * step - 4, y + (end_y - y) * step - 4, 8, 8)
+            if any(wall.colliderect(box) for wall in walls):
+                assert hit is not None and t <= step + 1e-9
+                break
+
+
+# ------------------------
+# Sensing range (max_dist) and the small-batch path
+# ------------------------
+
+# The original DummyAgent only tested the walls whose center was closer than
+# check_radius to the ship (2000 px for the laser, 50 px for the wall check).
+def old_laser_blocked(walls, x, y, angle, length, check_radius):
+    rad = math.radians(angle)
+    end_x, end_y = x + math.cos(rad) * length, y + math.sin(rad) * length
+    close_walls = [wall for wall in walls
+                   if math.hypot(x - (wall.x + wall.width / 2), y - (wall.y + wall.height / 2)) < check_radius]
+    return any(line_intersects_rect(x, y, end_x, end_y, wall) for wall in close_walls)
+
+
+@pytest.mark.parametrize("length, check_radius", [(1000, 2000), (10, 50), (200, 300)])
+def test_max_dist_matches_the_old_sensing_range(walls, length, check_radius):
+    rays = random_rays(walls, check_radius, 500)
+    x, y, angles = (np.array(column) for column in zip(*rays))
+    hits = cast_rays(walls, x, y, angles, length, max_dist=check_radius)
+    for i, (ray_x, ray_y, angle) in enumerate(rays):
+        expected = old_laser_blocked(walls, ray_x, ray_y, angle, length, check_radius)
+        assert (cast_ray(walls, ray_x, ray_y, angle, length, max_dist=check_radius) is not None) == expected
+        assert (cast_ray(list(walls), ray_x, ray_y, angle, length, max_dist=check_radius) is not None) == expected
+        assert (hits.wall[i] >= 0) == expected
+
+
+def test_few_rays_match_the_batched_path(walls):
+    rays = random_rays(walls, 8, 400)
+    x, y, angles = (np.array(column) for column in zip(*rays))
+    lengths = np.linspace(10, 1500, len(rays))
+    limits = np.where(np.arange(len(rays)) % 2, 2000, 300)
+    batched = cast_rays(walls, x, y, angles, lengths, radius=5, max_dist=limits)
+    for start in range(0, len(rays), SMALL_COUNT):
+        part = slice(start, start + SMALL_COUNT)
+        few = cast_rays(walls, x[part], y[part], angles[part], lengths[part], radius=5, max_dist=limits[part])
+        for column, expected in zip(few, batched):
+            assert np.allclose(column, expected[part])
+
+
+def test_few_rays_keep_the_shape_of_the_arguments(walls):
+    x, y, angle = random_rays(walls, 10, 1)[0]
+    single = cast_rays(walls, x, y, angle, 1000.0)
+    assert single.wall.shape == ()
+    expected = cast_ray(walls, x, y, angle, 1000.0)
+    assert (single.wall.item() >= 0) == (expected is not None)
+    if expected is not None:
+        assert single.distance.item() == expected.distance
+    # Sequences of one are repeated like NumPy broadcasting does
+    hits = cast_rays(walls, [x], [y], (angle, angle + 90), [1000.0], max_dist=[2000.0])
+    assert hits.wall.shape == (2,)
+    assert np.array_equal(hits.wall, cast_rays(walls, np.full(2, x), np.full(2, y), np.array([angle, angle + 90]),
+                                               np.full(2, 1000.0), max_dist=np.full(2, 2000.0)).wall)
+
+
+def test_cast_segments_to_one_point(walls):
+    # Many start points, one end point (the lines of sight of the enemies)
+    rays = random_rays(walls, 9, 40)
+    x, y = np.array([ray[0] for ray in rays]), np.array([ray[1] for ray in rays])
+    hits = cast_segments(walls, x, y, 1000.0, 1000.0, radius=5)
+    for i in range(len(rays)):
+        assert (hits.wall[i] < 0) == line_of_sight(walls, x[i], y[i], 1000.0, 1000.0, radius=5)
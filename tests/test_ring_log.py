@@ -0,0 +1,66 @@
+import io
+
+from ring_log import RingLogger
+
+# ------------------------
+# RingLogger
+# ------------------------
+
+
+def texts(records):
+    return [record["text"] for record in records]
+
+
+def test_full_buffer_drops_the_oldest_records():
+    log = RingLogger(capacity=3)
+    for i in range(5):
+        log.info("engine", "tick %d", i)
+    assert texts(log.tail()) == ["tick 2", "tick 3", "tick 4"]
+    assert [record["seq"] for record in log.tail()] == [2, 3, 4]
+    assert log.dropped == 2
+
+
+def test_levels_per_subsystem():
+    log = RingLogger(level="info")
+    log.set_level("agent", "debug")
+    log.debug("engine", "hidden")
+    log.debug("agent", "decision %s", "left")
+    log.warning("engine", "slow frame")
+    assert texts(log.tail()) == ["decision left", "slow frame"]
+    assert log.enabled("agent", "debug") and not log.enabled("engine", "debug")
+
+
+def test_tail_filters_by_subsystem_and_level():
+    log = RingLogger(level="debug")
+    log.debug("agent", "a1")
+    log.info("engine", "e1")
+    log.error("engine", "e2")
+    log.info("agent", "a2")
+    assert texts(log.tail(subsystem="agent")) == ["a1", "a2"]
+    assert texts(log.tail(level="info")) == ["e1", "e2", "a2"]
+    assert texts(log.tail(subsystem="engine", level="error")) == ["e2"]
+    assert texts(log.tail(limit=2)) == ["e2", "a2"]
+    assert log.tail(limit=0) == []
+
+
+def test_flush_writes_each_record_once():
+    log = RingLogger(capacity=2)
+    sink = io.StringIO()
+    log.info("server", "started on %s", 8000)
+    log.flush(sink)
+    log.info("server", "bad %d", "format")  # Broken arguments do not break the log
+    log.flush(sink)
+    log.flush(sink)
+    lines = sink.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("INFO [server] started on 8000")
+    assert lines[1].endswith("INFO [server] bad %d ('format',)")
+
+
+def test_background_thread_flushes_on_stop():
+    log = RingLogger()
+    sink = io.StringIO()
+    log.start(sink, interval=60)
+    log.error("engine", "boom")
+    log.stop()
+    assert sink.getvalue().endswith("ERROR [engine] boom\n")
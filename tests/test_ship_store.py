@@ -0,0 +1,123 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from ship_store import ShipStore, SingleShipStore
+
+# ------------------------
+# ShipStore.integrate vs the per-ship physics of the original SpaceObject
+# ------------------------
+
+
+# One frame of the original SpaceObject: thrust() added to the velocity right
+# away, update_position() applied friction, the speed clamp and the world clamp.
+def update_position(ship, max_speed, world_width=2000, world_height=2000, friction=0.99):
+    vx, vy = ship["vx"] * friction, ship["vy"] * friction
+    vx = max(-max_speed, min(vx, max_speed))
+    vy = max(-max_speed, min(vy, max_speed))
+    ship["vx"], ship["vy"] = vx, vy
+    ship["x"] = max(0, min(ship["x"] + vx, world_width))
+    ship["y"] = max(0, min(ship["y"] + vy, world_height))
+
+
+def thrust(ship, amount):
+    rad = math.radians(ship["angle"])
+    ship["vx"] += math.cos(rad) * amount
+    ship["vy"] += math.sin(rad) * amount
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 40])
+def test_integrate_matches_update_position(count):
+    rng = random.Random(count)
+    store = ShipStore()
+    ships = []
+    for i in range(count):
+        ship = {"x": rng.uniform(0, 2000), "y": rng.uniform(0, 2000), "angle": rng.uniform(0, 360),
+                "vx": rng.uniform(-10, 10), "vy": rng.uniform(-10, 10), "max_speed": 3 if i == 1 else 8}
+        ship["slot"] = store.add(ship["x"], ship["y"], ship["angle"], ship["vx"], ship["vy"],
+                                 max_speed=ship["max_speed"])
+        ships.append(ship)
+    slots = [ship["slot"] for ship in ships]
+    for _ in range(200):
+        for ship in ships:
+            amount = rng.choice([0, 0.3, 0.5, 2])
+            thrust(ship, amount)
+            store.thrust(ship["slot"], amount)
+            if rng.random() < 0.1:
+                ship["angle"] = store.angle[ship["slot"]] = rng.uniform(0, 360)
+        for ship in ships:
+            update_position(ship, ship["max_speed"])
+        store.integrate(slots)
+        for ship in ships:
+            slot = ship["slot"]
+            assert store.x[slot] == pytest.approx(ship["x"], abs=1e-9)
+            assert store.y[slot] == pytest.approx(ship["y"], abs=1e-9)
+            assert store.vx[slot] == pytest.approx(ship["vx"], abs=1e-9)
+            assert store.vy[slot] == pytest.approx(ship["vy"], abs=1e-9)
+
+
+def test_integrate_all_living_ships():
+    store = ShipStore()
+    a = store.add(100, 100, vx=5)
+    b = store.add(200, 200, vy=-5)
+    store.remove(b)
+    store.integrate()
+    assert store.x[a] == pytest.approx(100 + 5 * 0.99)
+    assert store.y[b] == 200  # Removed ships are not moved
+
+
+def test_integrate_long_step_is_close_to_frames():
+    store = ShipStore()
+    one = store.add(1000, 1000, vx=4, vy=-2)
+    four = store.add(1000, 1000, vx=4, vy=-2)
+    for _ in range(4):
+        store.integrate([one])
+    store.integrate([four], dt=4 / 60)
+    assert np.hypot(store.x[one] - store.x[four], store.y[one] - store.y[four]) < 0.5
+
+
+@pytest.mark.parametrize("dt", [1 / 60, 1 / 15])
+def test_small_and_vectorized_integrate_agree(dt):
+    rng = random.Random(7)
+    stores = [ShipStore(), ShipStore()]
+    for _ in range(ShipStore.SMALL_COUNT):
+        ship = (rng.uniform(-50, 2050), rng.uniform(-50, 2050), rng.uniform(0, 360),
+                rng.uniform(-10, 10), rng.uniform(-10, 10))
+        max_speed = rng.choice([3, 8])
+        for store in stores:
+            store.add(*ship, max_speed=max_speed)
+    slots = list(range(ShipStore.SMALL_COUNT))
+    for _ in range(100):
+        amount = rng.choice([0, 0.3, 2])
+        for store in stores:
+            store.thrust(slots[0], amount)
+        stores[0].integrate(slots, dt=dt)  # Plain Python, one ship at a time
+        stores[1].integrate(None, dt=dt)  # NumPy, all living ships
+        for name in ("x", "y", "vx", "vy", "prev_x", "prev_y", "ax", "ay"):
+            assert np.array_equal(getattr(stores[0], name), getattr(stores[1], name))
+
+
+# ------------------------
+# SingleShipStore
+# ------------------------
+
+
+def test_single_ship_store_moves_like_a_ship_store():
+    single, store = SingleShipStore(), ShipStore()
+    for s in (single, store):
+        slot = s.add(1000, 1000, angle=30, vx=2, vy=-1)
+        for frame in range(50):
+            s.thrust(slot, 0.3 if frame % 3 else 0)
+            s.integrate([slot] if frame % 2 else None, dt=1 / 60 if frame < 25 else 1 / 15)
+    for name in ("x", "y", "vx", "vy", "prev_x", "prev_y"):
+        assert getattr(single, name).item(0) == getattr(store, name).item(0)
+
+
+def test_single_ship_store_grows():
+    store = SingleShipStore()
+    first, second = store.add(10, 20), store.add(30, 40)
+    store.integrate()
+    assert (first, second) == (0, 1) and store.capacity == 2
+    assert (store.x.item(1), store.y.item(1)) == (30, 40)
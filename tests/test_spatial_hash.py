@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+from spatial_hash import SMALL_COUNT, SpatialHash, segment_circle_entries, segment_pairs
+
+# ------------------------
+# SpatialHash vs testing every point against every ship
+# ------------------------
+
+RADIUS = 15
+
+
+# Distance from (px, py) to the segment from (x0, y0) to (x1, y1).
+def segment_distance(x0, y0, x1, y1, px, py):
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    t = 0 if length2 == 0 else min(max(((px - x0) * dx + (py - y0) * dy) / length2, 0), 1)
+    return math.hypot(x0 + t * dx - px, y0 + t * dy - py)
+
+
+def random_case(seed, segments, ships):
+    rng = np.random.default_rng(seed)
+    x0 = rng.uniform(0, 500, segments)
+    y0 = rng.uniform(0, 500, segments)
+    x1 = x0 + rng.uniform(-60, 60, segments)
+    y1 = y0 + rng.uniform(-60, 60, segments)
+    x1[:3], y1[:3] = x0[:3], y0[:3]  # Bullets that did not move
+    return x0, y0, x1, y1, rng.uniform(0, 500, ships), rng.uniform(0, 500, ships)
+
+
+def brute_force(x0, y0, x1, y1, xs, ys):
+    return [(p, i) for p in range(len(x0)) for i in range(len(xs))
+            if segment_distance(x0[p], y0[p], x1[p], y1[p], xs[i], ys[i]) < RADIUS]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_segment_pairs_within_matches_brute_force(seed):
+    x0, y0, x1, y1, xs, ys = random_case(seed, 300, 200)
+    ship_hash = SpatialHash()
+    ship_hash.build(xs, ys)
+    points, items, _ = ship_hash.segment_pairs_within(x0, y0, x1, y1, RADIUS)
+    assert list(zip(points.tolist(), items.tolist())) == brute_force(x0, y0, x1, y1, xs, ys)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_segment_pairs_matches_hash(seed):
+    x0, y0, x1, y1, xs, ys = random_case(seed, 40, 30)
+    ship_hash = SpatialHash()
+    ship_hash.build(xs, ys)
+    expected = ship_hash.segment_pairs_within(x0, y0, x1, y1, RADIUS)
+    found = segment_pairs(x0, y0, x1, y1, xs, ys, RADIUS)
+    assert np.array_equal(found[0], expected[0])
+    assert np.array_equal(found[1], expected[1])
+    assert np.allclose(found[2], expected[2])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_few_pairs_match_the_matrix(seed):
+    x0, y0, x1, y1, _, _ = random_case(seed, 4, 0)
+    # Ships near the start of each path, so that some pairs hit
+    rng = np.random.default_rng(seed)
+    xs, ys = x0 + rng.uniform(-20, 20, 4), y0 + rng.uniform(-20, 20, 4)
+    assert len(x0) * len(xs) <= SMALL_COUNT
+    points, items, t = segment_pairs(x0, y0, x1, y1, xs, ys, RADIUS)
+    close, entry = segment_circle_entries(x0[:, None], y0[:, None], (x1 - x0)[:, None], (y1 - y0)[:, None],
+                                          xs, ys, RADIUS)
+    expected_points, expected_items = np.nonzero(close)
+    assert np.array_equal(points, expected_points)
+    assert np.array_equal(items, expected_items)
+    assert np.allclose(t, entry[expected_points, expected_items], rtol=0, atol=1e-12)
+
+
+def test_entry_t_is_on_the_circle():
+    x0, y0, x1, y1, xs, ys = random_case(7, 400, 300)
+    points, items, t = segment_pairs(x0, y0, x1, y1, xs, ys, RADIUS)
+    assert len(points) > 20
+    ex = x0[points] + t * (x1 - x0)[points]
+    ey = y0[points] + t * (y1 - y0)[points]
+    distance = np.hypot(ex - xs[items], ey - ys[items])
+    # The path enters the circle at t, or starts inside of it
+    assert np.all(np.isclose(distance, RADIUS) | ((t == 0) & (distance < RADIUS)))
+
+
+def test_pairs_within_matches_brute_force():
+    rng = np.random.default_rng(3)
+    px, py = rng.uniform(0, 500, 300), rng.uniform(0, 500, 300)
+    xs, ys = rng.uniform(0, 500, 200), rng.uniform(0, 500, 200)
+    ship_hash = SpatialHash()
+    ship_hash.build(xs, ys)
+    points, items = ship_hash.pairs_within(px, py, RADIUS)
+    expected = [(p, i) for p in range(300) for i in range(200) if math.hypot(px[p] - xs[i], py[p] - ys[i]) < RADIUS]
+    assert list(zip(points.tolist(), items.tolist())) == expected
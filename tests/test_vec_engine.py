@@ -0,0 +1,83 @@
+import random
+
+import numpy as np
+import pytest
+
+from engine import GameEngine, apply_actions, collect_coins, run_enemy_logic
+from vec_engine import VecGameEngine
+
+# ------------------------
+# VecGameEngine (N = 1) against GameEngine
+# ------------------------
+
+# The same scripted fight in both engines (open world, fixed seed): the player
+# at (500, 500) faces east and shoots for the first `shots` frames. ships
+# lists (x, y, hp) of the enemies in GameEngine.ships order. Returns the kill
+# points (score without coins), kills and living enemies after `frames` frames.
+# The two engines draw different random numbers, so the scene is set up for the
+# outcome not to depend on them.
+
+
+def run_game_engine(ships, shots, frames, seed=0):
+    random.seed(seed)
+    engine = GameEngine([])
+    engine.pending_spawns = len(ships) - 1
+    engine._spawn_pending(engine.wall_grid)
+    player = engine.ships[0]
+    player.x, player.y, player.angle = 500, 500, 0
+    for ship, (x, y, hp) in zip(engine.ships[1:], ships):
+        ship.x, ship.y, ship.vx, ship.vy, ship.hp = x, y, 0, 0, hp
+    for frame in range(frames):
+        collect_coins(engine)
+        apply_actions(engine, player.id, {"rotate": 0, "thrust": 0, "shoot": frame < shots})
+        run_enemy_logic(engine, engine.wall_grid)
+        engine.update(engine.wall_grid)
+    return engine.score[0] - engine.coins_collected, engine.kills, len(engine.ships) - 1
+
+
+def run_vec_engine(ships, shots, frames, seed=0):
+    engine = VecGameEngine(1, walls=[], seed=seed)
+    engine.x[0, 0], engine.y[0, 0], engine.angle[0, 0] = 500, 500, 0
+    for slot, (x, y, hp) in enumerate(ships, start=1):
+        engine.x[0, slot], engine.y[0, slot], engine.hp[0, slot] = x, y, hp
+        engine.alive[0, slot] = True
+        engine.spawn_order[0, slot] = slot
+    engine.spawned[0] = len(ships) + 1
+    for frame in range(frames):
+        engine.step([[0, 0, frame < shots]])
+    return (int(engine.score[0] - engine.coins_collected[0]), int(engine.kills[0]),
+            int(engine.alive[0, 1:].sum()))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_killing_the_enemy_scores_and_doubles_it(seed):
+    # Three shots kill the enemy in front of the player: 10 points, one kill
+    # and two new enemies
+    ships = [(560, 500, 30)]
+    assert run_vec_engine(ships, 3, 30, seed) == run_game_engine(ships, 3, 30, seed) == (10, 1, 2)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_killing_another_enemy_does_not_score(seed):
+    # Only ships[1] counts: the second enemy in front of the player just disappears
+    ships = [(1500, 1500, 100), (560, 500, 10)]
+    assert run_vec_engine(ships, 1, 30, seed) == run_game_engine(ships, 1, 30, seed) == (0, 0, 1)
+
+
+def test_only_the_first_enemy_is_slow():
+    engine = VecGameEngine(1, walls=[], seed=0)
+    engine.alive[0, 2] = True
+    engine.spawn_order[0, 2] = 2
+    engine.step([[0, 0, 0]])
+    assert engine.max_speed[0, :3].tolist() == [8, 3, 8]
+
+
+def test_collected_coins_respawn():
+    engine = VecGameEngine(1, walls=[], seed=0, coin_respawn_delay=10)
+    engine.x[0, 0], engine.y[0, 0] = engine.coin_x[0, 0], engine.coin_y[0, 0]
+    engine.step([[0, 0, 0]])
+    assert engine.coin_alive.sum() == engine.num_coins - 1
+    for _ in range(10):
+        engine.step([[0, 0, 0]])
+    assert engine.coin_alive.sum() == engine.num_coins
+    assert np.isinf(engine.coin_due).all()
@@ -0,0 +1,98 @@
+import numpy as np
+import pygame
+import pytest
+
+from engine import load_walls
+from wall_grid import WallGrid, segment_entry
+
+# ------------------------
+# WallGrid.segments_hit vs clipping the path against every wall
+# ------------------------
+
+BULLET_HALF_SIZE = 3
+
+
+@pytest.fixture(scope="module")
+def walls():
+    return load_walls()
+
+
+def random_segments(rng, count, max_length):
+    x0 = rng.integers(0, 2000, count)
+    y0 = rng.integers(0, 2000, count)
+    angle = rng.uniform(0, 2 * np.pi, count)
+    length = rng.uniform(0, max_length, count)
+    x1 = np.round(x0 + np.cos(angle) * length).astype(int)
+    y1 = np.round(y0 + np.sin(angle) * length).astype(int)
+    return x0, y0, x1, y1
+
+
+# pygame.Rect.clipline counts the pixels of a rect inclusively, segments_hit uses
+# open rects, so the answers can only differ within a pixel of a wall edge. The
+# reference therefore clips against every wall grown by half_size and then
+# shrunk (must hit) or grown (may hit) by a margin.
+def clipline_hits(walls, x0, y0, x1, y1, half_size, margin):
+    return any(wall.inflate(2 * (half_size + margin), 2 * (half_size + margin)).clipline(x0, y0, x1, y1)
+               for wall in walls)
+
+
+@pytest.mark.parametrize("max_length", [15, 60, 200])
+def test_segments_hit_matches_clipline(walls, max_length):
+    rng = np.random.default_rng(max_length)
+    x0, y0, x1, y1 = random_segments(rng, 2000, max_length)
+    t = walls.segments_hit(x0, y0, x1, y1, BULLET_HALF_SIZE)
+    hits = misses = 0
+    for i in range(x0.size):
+        segment = (int(x0[i]), int(y0[i]), int(x1[i]), int(y1[i]))
+        if clipline_hits(walls, *segment, BULLET_HALF_SIZE, -2):
+            assert t[i] <= 1, segment
+            hits += 1
+        elif not clipline_hits(walls, *segment, BULLET_HALF_SIZE, 2):
+            assert np.isinf(t[i]), segment
+            misses += 1
+    assert hits > 50 and misses > 500
+
+
+def test_segments_hit_entry_point(walls):
+    rng = np.random.default_rng(1)
+    x0, y0, x1, y1 = random_segments(rng, 2000, 60)
+    t = walls.segments_hit(x0, y0, x1, y1, BULLET_HALF_SIZE)
+    for i in np.flatnonzero(t <= 1):
+        # The first wall entered is the one with the smallest entry of all walls
+        entries = [segment_entry(wall, x0[i], y0[i], x1[i] - x0[i], y1[i] - y0[i], BULLET_HALF_SIZE)
+                   for wall in walls]
+        assert t[i] == pytest.approx(min(e for e in entries if e is not None))
+
+
+def test_small_and_batched_paths_agree(walls):
+    rng = np.random.default_rng(2)
+    x0, y0, x1, y1 = random_segments(rng, 4000, 60)
+    batched = walls.segments_hit(x0, y0, x1, y1, BULLET_HALF_SIZE)
+    step = WallGrid.SMALL_COUNT
+    small = np.concatenate([walls.segments_hit(x0[i:i + step], y0[i:i + step], x1[i:i + step], y1[i:i + step],
+                                               BULLET_HALF_SIZE)
+                            for i in range(0, x0.size, step)])
+    assert np.array_equal(np.isinf(batched), np.isinf(small))
+    finite = np.isfinite(batched)
+    assert np.allclose(batched[finite], small[finite])
+
+
+def test_thin_wall_is_not_skipped():
+    walls = WallGrid([pygame.Rect(100, 0, 20, 200)])
+    # 60 px per step (--dt 1/15) jumps over the 20 px wall
+    t = walls.segments_hit([80], [100], [140], [100], BULLET_HALF_SIZE)
+    assert t[0] == pytest.approx((100 - BULLET_HALF_SIZE - 80) / 60)
+    assert np.isinf(walls.segments_hit([0], [100], [60], [100], BULLET_HALF_SIZE)[0])
+
+
+def test_query_returns_every_overlapping_wall(walls):
+    grid = WallGrid(walls)
+    rng = np.random.default_rng(5)
+    for _ in range(500):
+        # Also rectangles partly or fully outside of the grid
+        x, y = rng.integers(-300, 2300, 2)
+        width, height = rng.integers(1, 250, 2)
+        rect = pygame.Rect(int(x), int(y), int(width), int(height))
+        found = grid.query(rect)
+        assert found == sorted(found, key=grid.walls.index)
+        assert [wall for wall in found if rect.colliderect(wall)] == [wall for wall in walls if rect.colliderect(wall)]
@@ -1,3 +1,4 @@
+import bisect
 import time
 import pygame
 import math
@@ -65,28 +66,75 @@ class SpaceObject:
             "angle": self.angle,
         }
         
-    # Check for collision with walls.
+    # Check for collision with walls and with the other ships.
     # If a collision is detected, the ship's position and velocity are adjusted accordingly.
     # The ship is moved back to the edge of the wall, and its velocity is set to zero.
+    # neighbors are the ships close enough to touch this one (see sweep_ships);
+    # without them every ship in concurrents is tested.
 
-    def check_wall_collision(self, walls):
+    def check_wall_collision(self, walls, neighbors=None):
         ship_rect = pygame.Rect(self.x - 10, self.y - 10, 20, 20)  # Size of the ship
-        concurrent_react = [pygame.Rect(so.x - 10, so.y - 10, 20, 20) for so in self.concurrents if so is not self] if self.concurrents else []
-        for wall in walls+concurrent_react:
+        for wall in walls:
             if ship_rect.colliderect(wall):
-                # Bounce back based on direction
-                if self.x < wall.x:  # Left of the wall
-                    self.x = wall.x - 10
-                    self.vx = 0
-                elif self.x > wall.x + wall.width:  # Right of the wall
-                    self.x = wall.x + wall.width + 10
-                    self.vx = 0
-                if self.y < wall.y:  # Above the wall
-                    self.y = wall.y - 10
-                    self.vy = 0
-                elif self.y > wall.y + wall.height:  # Below the wall
-                    self.y = wall.y + wall.height + 10
-                    self.vy = 0
+                self._push_back(wall.x, wall.y, wall.width, wall.height)
+        if neighbors is None:
+            neighbors = [so for so in self.concurrents if so is not self] if self.concurrents else []
+        for so in neighbors:
+            # Same test as colliderect with the other ship's rect, without creating the rect
+            left, top = int(so.x - 10), int(so.y - 10)
+            if ship_rect.x < left + 20 and left < ship_rect.right and ship_rect.y < top + 20 and top < ship_rect.bottom:
+                self._push_back(left, top, 20, 20)
+
+    # Bounce back out of the box (x, y, width, height) based on direction
+    def _push_back(self, x, y, width, height):
+        if self.x < x:  # Left of the wall
+            self.x = x - 10
+            self.vx = 0
+        elif self.x > x + width:  # Right of the wall
+            self.x = x + width + 10
+            self.vx = 0
+        if self.y < y:  # Above the wall
+            self.y = y - 10
+            self.vy = 0
+        elif self.y > y + height:  # Below the wall
+            self.y = y + height + 10
+            self.vy = 0
+
+
+# ------------------------
+# Ship Broadphase (Sort and Sweep)
+# ------------------------
+
+# Two ships touch when their 20x20 boxes overlap, i.e. only when they are less
+# than 21 px apart on both axes (the boxes are rounded to whole pixels).
+SWEEP_REACH = 21
+
+# The ships sorted by x, kept sorted while they move one after the other
+# during GameEngine.update. near() only looks at the ships inside the sweep
+# window (close on x) around a ship instead of at every other ship; move()
+# re-sorts a ship after it moved or was pushed back, so every query sees the
+# current positions, exactly like the sequential loop without the broadphase.
+class ShipSweep:
+    def __init__(self, ships):
+        self.ships = ships
+        self.xs = [ship.x for ship in ships]  # x of every ship as stored in keys
+        self.keys = sorted((x, i) for i, x in enumerate(self.xs))
+
+    # Re-sort ship i after its x changed.
+    def move(self, i):
+        x = self.ships[i].x
+        if x != self.xs[i]:
+            del self.keys[bisect.bisect_left(self.keys, (self.xs[i], i))]
+            bisect.insort(self.keys, (x, i))
+            self.xs[i] = x
+
+    # Indices of the ships close enough to touch ship i, in ascending order
+    # (the order of the ships list).
+    def near(self, i):
+        x, y = self.ships[i].x, self.ships[i].y
+        lo = bisect.bisect_right(self.keys, (x - SWEEP_REACH, len(self.ships)))
+        hi = bisect.bisect_left(self.keys, (x + SWEEP_REACH, -1))
+        return sorted(j for _, j in self.keys[lo:hi] if j != i and abs(self.ships[j].y - y) < SWEEP_REACH)
 
 
 # ------------------------
@@ -154,10 +202,16 @@ class GameEngine:
     # This includes updating the positions of the ships and bullets, checking for collisions,
     def update(self, walls):
         new_ships = []
-        for i, ship in enumerate(self.ships[:]):
+        ships = self.ships[:]
+        sweep = ShipSweep(ships)  # Ship-vs-ship candidates
+        for i, ship in enumerate(ships):
             is_enemy = (i == 1)  # The enemy is the second ship
             ship.update_position(is_enemy=is_enemy)
-            ship.check_wall_collision(walls)  # Wall collision check
+            sweep.move(i)
+            # Ships earlier in the list with HP 0 have already been removed
+            nearby = [ships[j] for j in sweep.near(i) if j > i or ships[j].hp > 0]
+            ship.check_wall_collision(walls, nearby)  # Wall and ship collision check
+            sweep.move(i)
             if ship.hp <= 0:  # Remove the ship if HP is 0
                 self.ships.remove(ship)
                 if is_enemy:  # If an enemy dies, double the number of enemies
@@ -1,38 +1,20 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dummy_agent import DummyAgent
 
+import os
+import sys
 import traceback
 
-walls_data = [
-    {"x": 50, "y": 50, "width": 1900, "height": 20},     # Верхняя стена
-    {"x": 50, "y": 50, "width": 20, "height": 1900},     # Левая стена
-    {"x": 50, "y": 1930, "width": 1900, "height": 20},   # Нижняя стена
-    {"x": 1930, "y": 50, "width": 20, "height": 1900},   # Правая стена
-
-    {"x": 200, "y": 200, "width": 20, "height": 400},    # Вертикальная стена в левом верхнем углу
-    {"x": 200, "y": 600, "width": 400, "height": 20},    # Горизонтальная стена в левом верхнем углу
-    {"x": 600, "y": 200, "width": 20, "height": 400},    # Вертикальная стена в центре сверху
-    {"x": 600, "y": 600, "width": 400, "height": 20},    # Горизонтальная стена в центре сверху
-    {"x": 1000, "y": 200, "width": 20, "height": 800},   # Вертикальная стена справа сверху
-    {"x": 200, "y": 1000, "width": 800, "height": 20},   # Горизонтальная стена в центре
-    {"x": 1200, "y": 200, "width": 20, "height": 800},   # Вертикальная стена справа в центре
-    {"x": 1200, "y": 1000, "width": 400, "height": 20},  # Горизонтальная стена справа в центре
-    {"x": 1600, "y": 200, "width": 20, "height": 800},   # Вертикальная стена справа вверху
-    {"x": 200, "y": 1400, "width": 400, "height": 20},   # Горизонтальная стена внизу слева
-    {"x": 600, "y": 1400, "width": 20, "height": 400},   # Вертикальная стена внизу в центре
-    {"x": 600, "y": 1800, "width": 400, "height": 20},   # Горизонтальная стена внизу в центре
-    {"x": 1000, "y": 1400, "width": 20, "height": 400},  # Вертикальная стена внизу справа
-    {"x": 1200, "y": 1400, "width": 400, "height": 20},  # Горизонтальная стена внизу справа
-    {"x": 1600, "y": 1400, "width": 20, "height": 400},  # Вертикальная стена внизу справа далеко
-
-    # Тупики
-    {"x": 300, "y": 300, "width": 100, "height": 20},
-    {"x": 1500, "y": 1500, "width": 100, "height": 20},
-    {"x": 800, "y": 800, "width": 20, "height": 100},
-]
+# The walls come from the compiled labyrinth (labyrinth.json in the main folder,
+# see labyrinth_compiler.py) instead of a copy of create_labyrinth().
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from labyrinth_compiler import load_labyrinth
+from ring_log import logger, LEVELS
+
+walls_data = load_labyrinth().wall_dicts()
 
 # Initialize FastAPI app
 app = FastAPI()
@@ -86,8 +68,24 @@ async def walls():
 async def decide(game_state: GameState):
     # Get actions from DummyAgent
     actions = agent.decide(game_state.dict(), game_state.walls)
+    logger.debug("server", "decide: %d ships -> %s", len(game_state.ships), actions)  # Formatted only when read
     return actions
 
+# Debug endpoints: read the in-memory log and change the level of a subsystem
+# (e.g. POST /debug/log_level?subsystem=server&level=debug).
+@app.get("/debug/log")
+async def debug_log(limit: int = 100, subsystem: Optional[str] = None, level: str = "debug"):
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level}")
+    return {"records": logger.tail(limit, subsystem, level), "dropped": logger.dropped}
+
+@app.post("/debug/log_level")
+async def debug_log_level(subsystem: str, level: str):
+    if level not in LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level}")
+    logger.set_level(subsystem, level)
+    return {"subsystem": subsystem, "level": level}
+
 @app.post("/update_state")
 async def update_state(state: GameState):
     global game_state
@@ -109,4 +107,5 @@ async def minimap(request: Request):
 if __name__ == "__main__":
     import uvicorn
 
+    logger.start()  # Write the log to stderr in the background
     uvicorn.run(app, host="localhost", port=8000)
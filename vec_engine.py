@@ -0,0 +1,496 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from engine import GameEngine, load_walls, WORLD_WIDTH, WORLD_HEIGHT
+from wall_grid import WallGrid
+from raycast import cast_segments
+from spatial_hash import segment_circle_entries
+
+# ------------------------
+# VecGameEngine Class
+# ------------------------
+
+# Runs N independent matches ("arenas") in one set of NumPy arrays, for training
+# and evaluating agents. All arenas share the labyrinth; ships, bullets and coins
+# are stored as (N, slots) arrays and every step() advances all arenas at once.
+#
+# The rules follow GameEngine and the frame loop of engine.main(): coin pickup
+# and respawn, player action, enemy AI (chase_and_shoot, move_enemy_randomly,
+# avoid_walls), ship physics and wall collision, bullet hits, and the enemy
+# doubling: only the death of "the" enemy (GameEngine.ships[1], the oldest
+# living enemy) scores, counts as a kill and queues two new enemies, at most
+# max_enemies are alive and new ones appear SPAWN_DISTANCE away from the
+# player. enemy_ai is "first" (only that enemy thinks) or "all", like in
+# GameEngine. The remaining differences:
+#   * randomness comes from one NumPy generator, so a seed does not give the
+#     same match as GameEngine with random.seed();
+#   * at most max_bullets bullets per arena (GameEngine's pool grows);
+#   * every ship is simulated, also far away from the player in large worlds
+#     (no ActiveRegion), and every enemy in enemy_ai="all" thinks every frame
+#     (no AIScheduler time budget);
+#   * no agents and no events: the player is driven by the actions of step().
+#
+# Ship slot 0 of every arena is the player; slots 1.. are enemies.
+
+# Layout of one observation row (see _observe)
+OBS_FIELDS = (
+    "x", "y", "vx", "vy", "cos_angle", "sin_angle", "hp",  # Player (x, y scaled to 0..1, hp to 0..1)
+    "enemy_dx", "enemy_dy", "enemy_hp", "enemy_visible",  # Nearest enemy relative to the player
+    "coin_dx", "coin_dy",  # Nearest coin relative to the player
+    "enemies", "coins",  # Number of enemies and coins left
+)
+
+PLAYER_MAX_SPEED = 8  # Also every enemy except the first one, like in GameEngine.update
+ENEMY_MAX_SPEED = 3  # The first enemy (GameEngine.ships[1])
+FRICTION = 0.99
+SHIP_HALF_SIZE = 10
+BULLET_SPEED = 15
+BULLET_LIFESPAN = 60
+HIT_RADIUS = 15
+
+
+# Shortest signed difference (degrees) to turn from angle to target, like the
+# angle_difference computations in engine.py.
+def _angle_difference(target, angle):
+    diff = (target - angle + 360) % 360
+    return np.where(diff > 180, diff - 360, diff)
+
+
+class VecGameEngine:
+    def __init__(self, num_envs, walls=None, max_enemies=GameEngine.MAX_ENEMIES, max_bullets=256, num_coins=20,
+                 max_ticks=3600, seed=None, world_width=None, world_height=None, coin_respawn_delay=300,
+                 enemy_ai="first"):
+        if enemy_ai not in ("first", "all"):
+            raise ValueError(f"Unknown enemy AI mode: {enemy_ai}")
+        if walls is None:
+            walls = load_walls()
+        if not isinstance(walls, WallGrid):
+            walls = WallGrid(walls)
+        self.walls = walls
+        # World size: given, or the one of the labyrinth (like GameEngine)
+        default_width, default_height = walls.world_size or (WORLD_WIDTH, WORLD_HEIGHT)
+        world_width = world_width or default_width
+        world_height = world_height or default_height
+        self.num_envs = num_envs
+        self.max_ships = max_ships = max_enemies + 1
+        self.max_bullets = max_bullets
+        self.num_coins = num_coins
+        self.coin_respawn_delay = coin_respawn_delay  # In ticks; None: coins never come back
+        self.enemy_ai = enemy_ai
+        self.max_ticks = max_ticks
+        self.world_width = world_width
+        self.world_height = world_height
+        self.rng = np.random.default_rng(seed)
+
+        n, s, b, c = num_envs, max_ships, max_bullets, num_coins
+        # Ships
+        self.x = np.zeros((n, s))
+        self.y = np.zeros((n, s))
+        self.vx = np.zeros((n, s))
+        self.vy = np.zeros((n, s))
+        self.angle = np.zeros((n, s))
+        self.hp = np.zeros((n, s), dtype=np.int64)
+        self.alive = np.zeros((n, s), dtype=bool)
+        self.max_speed = np.full((n, s), float(PLAYER_MAX_SPEED))
+        self.spawn_order = np.zeros((n, s), dtype=np.int64)  # Order of GameEngine.ships
+        self.spawned = np.zeros(n, dtype=np.int64)  # Ships created in the arena so far
+        # Bullets
+        self.bullet_x = np.zeros((n, b))
+        self.bullet_y = np.zeros((n, b))
+        self.bullet_vx = np.zeros((n, b))
+        self.bullet_vy = np.zeros((n, b))
+        self.bullet_lifespan = np.zeros((n, b), dtype=np.int64)
+        self.bullet_owner = np.zeros((n, b), dtype=np.int64)
+        self.bullet_alive = np.zeros((n, b), dtype=bool)
+        # Coins
+        self.coin_x = np.zeros((n, c))
+        self.coin_y = np.zeros((n, c))
+        self.coin_alive = np.zeros((n, c), dtype=bool)
+        self.coin_due = np.full((n, c), np.inf)  # Tick at which a collected coin comes back
+        # Per-arena counters
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.kills = np.zeros(n, dtype=np.int64)
+        self.coins_collected = np.zeros(n, dtype=np.int64)
+        self.pending_spawns = np.zeros(n, dtype=np.int64)  # Enemies waiting for a free slot
+
+        self.reset()
+
+    # ------------------------
+    # Reset
+    # ------------------------
+
+    # Start new matches in the given arenas (all if None) and return the observations.
+    def reset(self, envs=None):
+        envs = np.arange(self.num_envs) if envs is None else np.asarray(envs, dtype=np.intp)
+        if envs.size:
+            self.alive[envs] = False
+            self.bullet_alive[envs] = False
+            self.vx[envs] = 0
+            self.vy[envs] = 0
+            for slot in (0, 1):  # Player and the first enemy
+                x, y = self._free_positions(envs.size, SHIP_HALF_SIZE)
+                self.x[envs, slot], self.y[envs, slot] = x, y
+                self.angle[envs, slot] = 0
+                self.hp[envs, slot] = 100
+                self.alive[envs, slot] = True
+                self.spawn_order[envs, slot] = slot
+            self.spawned[envs] = 2
+            x, y = self._free_positions(envs.size * self.num_coins, 5)
+            self.coin_x[envs] = x.reshape(envs.size, self.num_coins)
+            self.coin_y[envs] = y.reshape(envs.size, self.num_coins)
+            self.coin_alive[envs] = True
+            self.coin_due[envs] = np.inf
+            self.pending_spawns[envs] = 0
+            self.score[envs] = 0
+            self.ticks[envs] = 0
+            self.kills[envs] = 0
+            self.coins_collected[envs] = 0
+        return self._observe()
+
+    # count random integer positions whose (2 * half_size) box is free of walls,
+    # like generate_valid_position / generate_coins (see free_space.py).
+    # With avoid=(xs, ys) position i is at least min_distance away from
+    # (xs[i], ys[i]) if a few tries find such a position.
+    def _free_positions(self, count, half_size, avoid=None, min_distance=0):
+        sampler = self.walls.free_space(half_size, self.world_width, self.world_height)
+        xs, ys = sampler.sample_many(count, self.rng)
+        xs, ys = xs.astype(float), ys.astype(float)
+        if avoid is not None:
+            for _ in range(8):
+                close = np.flatnonzero(np.hypot(xs - avoid[0], ys - avoid[1]) < min_distance)
+                if not close.size:
+                    break
+                xs[close], ys[close] = sampler.sample_many(close.size, self.rng)
+        return xs, ys
+
+    # Mask (N, slots) of the first enemy of every arena: the living enemy that
+    # was created first, which is GameEngine.ships[1].
+    def _first_enemy(self):
+        enemy = self.alive.copy()
+        enemy[:, 0] = False
+        order = np.where(enemy, self.spawn_order, np.iinfo(np.int64).max)
+        first = np.zeros_like(enemy)
+        first[np.arange(self.num_envs), order.argmin(axis=1)] = enemy.any(axis=1)
+        return first
+
+    # ------------------------
+    # Step
+    # ------------------------
+
+    # Advance every arena by one frame.
+    # actions: array (N, 3) of rotate (degrees), thrust (amount) and shoot (> 0.5).
+    # Returns (observations, rewards, dones, info). Finished arenas are reset
+    # automatically; their final score and length are in info.
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=float).reshape(self.num_envs, 3)
+        score_before = self.score.copy()
+        ax = np.zeros_like(self.x)  # Thrust collected this frame
+        ay = np.zeros_like(self.y)
+        shots = []  # (mask, angle) of every shooting opportunity, in order
+
+        self._collect_coins()
+
+        # Player action
+        player = self.alive[:, 0]
+        self.angle[:, 0] = np.where(player, (self.angle[:, 0] + actions[:, 0]) % 360, self.angle[:, 0])
+        self._thrust(ax, ay, player[:, None] & (np.arange(self.max_ships) == 0), actions[:, 1:2])
+        self._add_shot(shots, player[:, None] & (np.arange(self.max_ships) == 0) & (actions[:, 2:3] > 0.5))
+
+        self._enemy_logic(ax, ay, shots)
+        self._spawn_bullets(shots)
+        self._respawn_coins()
+        self._move_ships(ax, ay)
+        self._remove_dead_ships()
+        self._spawn_pending()
+        self._move_bullets()
+
+        self.ticks += 1
+        rewards = (self.score - score_before).astype(float)
+        dones = ~self.alive[:, 0] | (self.hp[:, 0] <= 0) | (self.ticks >= self.max_ticks)
+        info = {
+            "final_score": np.where(dones, self.score, 0),
+            "final_ticks": np.where(dones, self.ticks, 0),
+            "kills": self.kills.copy(),
+            "coins_collected": self.coins_collected.copy(),
+        }
+        finished = np.flatnonzero(dones)
+        if finished.size:
+            self.reset(finished)
+        return self._observe(), rewards, dones, info
+
+    # Add thrust amount in the facing direction of the masked ships.
+    def _thrust(self, ax, ay, mask, amount):
+        rad = np.radians(self.angle)
+        ax += np.where(mask, np.cos(rad) * amount, 0)
+        ay += np.where(mask, np.sin(rad) * amount, 0)
+
+    # Remember a shooting opportunity: the ship's current angle is used for the bullet.
+    def _add_shot(self, shots, mask):
+        if mask.any():
+            shots.append((mask, self.angle.copy()))
+
+    # Player picks up the coins its 20x20 box touches (one point each).
+    def _collect_coins(self):
+        left = np.trunc(self.x[:, :1] - SHIP_HALF_SIZE)
+        top = np.trunc(self.y[:, :1] - SHIP_HALF_SIZE)
+        coin_left = self.coin_x - 5
+        coin_top = self.coin_y - 5
+        touched = ((left < coin_left + 10) & (coin_left < left + 20) & (top < coin_top + 10) & (coin_top < top + 20)
+                   & self.coin_alive & self.alive[:, :1])
+        collected = touched.sum(axis=1)
+        self.coin_alive &= ~touched
+        if self.coin_respawn_delay is not None:
+            self.coin_due[touched] = np.repeat(self.ticks + self.coin_respawn_delay, collected)
+        self.score += collected
+        self.coins_collected += collected
+
+    # Collected coins come back at a new free position after coin_respawn_delay
+    # ticks (CoinField.update, at the start of GameEngine.update).
+    def _respawn_coins(self):
+        due = ~self.coin_alive & (self.ticks[:, None] + 1 >= self.coin_due)
+        if not due.any():
+            return
+        x, y = self._free_positions(int(due.sum()), 5)
+        self.coin_x[due], self.coin_y[due] = x, y
+        self.coin_alive |= due
+        self.coin_due[due] = np.inf
+
+    # chase_and_shoot, move_enemy_randomly and avoid_walls for the thinking
+    # enemies (the first one, or all with enemy_ai="all") at once.
+    def _enemy_logic(self, ax, ay, shots):
+        if self.enemy_ai == "first":
+            enemy = self._first_enemy()
+        else:
+            enemy = self.alive.copy()
+            enemy[:, 0] = False
+        enemy &= self.alive[:, :1]  # No player, no target
+        if not enemy.any():
+            return
+        n, s = enemy.shape
+        player_x, player_y = self.x[:, :1], self.y[:, :1]
+        dx = player_x - self.x
+        dy = player_y - self.y
+        angle_to_target = np.degrees(np.arctan2(dy, dx))
+        distance = np.hypot(dx, dy)
+
+        # Chase and shoot when the player is in sight
+        sees = enemy & self._can_see_player(enemy)
+        diff = _angle_difference(angle_to_target, self.angle)
+        self.angle = np.where(sees, (self.angle + diff * 0.1) % 360, self.angle)
+        self._thrust(ax, ay, sees, 0.3)
+        self._add_shot(shots, sees & (self.rng.random((n, s)) < 0.02))
+
+        diff = _angle_difference(angle_to_target, self.angle)
+        turn = enemy & (np.abs(diff) > 5)
+        self.angle = np.where(turn, (self.angle + diff * 0.1) % 360, self.angle)
+        self._thrust(ax, ay, enemy & (distance > 100), 0.3)
+        self._add_shot(shots, enemy & (np.abs(diff) < 10) & (distance < 300) & (self.rng.random((n, s)) < 0.02))
+
+        # Random movement
+        turn = enemy & (self.rng.random((n, s)) < 0.02)
+        self.angle = np.where(turn, (self.angle + self.rng.integers(-10, 10, (n, s), endpoint=True)) % 360, self.angle)
+        self._thrust(ax, ay, enemy & (self.rng.random((n, s)) < 0.05), 0.5)
+
+        self._avoid_walls(enemy)
+
+    # Line of sight from every enemy to the player: one batch of raycasts with
+    # the 10x10 box of can_see_player.
+    def _can_see_player(self, enemy):
+        sees = np.zeros(enemy.shape, dtype=bool)
+        env, slot = np.nonzero(enemy)
+        hits = cast_segments(self.walls, self.x[env, slot], self.y[env, slot], self.x[env, 0], self.y[env, 0], radius=5)
+        sees[env, slot] = hits.wall < 0
+        return sees
+
+    # avoid_walls: turn away from the first wall within 15 px of the ship.
+    def _avoid_walls(self, enemy):
+        if not len(self.walls.walls):
+            return
+        env, slot = np.nonzero(enemy)
+        x, y, angle = self.x[env, slot], self.y[env, slot], self.angle[env, slot]
+        left = np.trunc(x - SHIP_HALF_SIZE) - 15
+        top = np.trunc(y - SHIP_HALF_SIZE) - 15
+        candidates = self.walls.candidates(x, y, SHIP_HALF_SIZE + 17)
+        boxes = self.walls.boxes[candidates]
+        near = ((left[:, None] < boxes[..., 0] + boxes[..., 2]) & (boxes[..., 0] < left[:, None] + 50)
+                & (top[:, None] < boxes[..., 1] + boxes[..., 3]) & (boxes[..., 1] < top[:, None] + 50)
+                & (candidates >= 0))
+        has_wall = near.any(axis=1)
+        first = boxes[np.arange(len(env)), near.argmax(axis=1)]
+        center_x = first[:, 0] + first[:, 2] // 2
+        center_y = first[:, 1] + first[:, 3] // 2
+        angle_to_wall = np.degrees(np.arctan2(center_y - y, center_x - x))
+        diff = (angle_to_wall - angle + 360) % 360
+        turn = np.where(diff > 180, 3, -3)
+        self.angle[env, slot] = np.where(has_wall, (angle + turn) % 360, angle)
+
+    # Create the bullets of all shooting opportunities in free bullet slots.
+    def _spawn_bullets(self, shots):
+        for mask, angle in shots:
+            env, slot = np.nonzero(mask)
+            rank = np.cumsum(mask, axis=1)[env, slot] - 1  # n-th shooter in its arena
+            free_order = np.argsort(self.bullet_alive, axis=1, kind="stable")
+            has_room = rank < (~self.bullet_alive).sum(axis=1)[env]
+            env, slot, rank = env[has_room], slot[has_room], rank[has_room]
+            bullet = free_order[env, rank]
+            rad = np.radians(angle[env, slot])
+            self.bullet_x[env, bullet] = self.x[env, slot] + np.cos(rad) * 15
+            self.bullet_y[env, bullet] = self.y[env, slot] + np.sin(rad) * 15
+            self.bullet_vx[env, bullet] = np.cos(rad) * BULLET_SPEED
+            self.bullet_vy[env, bullet] = np.sin(rad) * BULLET_SPEED
+            self.bullet_lifespan[env, bullet] = BULLET_LIFESPAN
+            self.bullet_owner[env, bullet] = slot
+            self.bullet_alive[env, bullet] = True
+
+    # Physics of SpaceObject/ShipStore plus check_wall_collision for all ships.
+    def _move_ships(self, ax, ay):
+        alive = self.alive
+        self.max_speed[:] = np.where(self._first_enemy(), ENEMY_MAX_SPEED, PLAYER_MAX_SPEED)
+        vx = np.clip((self.vx + ax) * FRICTION, -self.max_speed, self.max_speed)
+        vy = np.clip((self.vy + ay) * FRICTION, -self.max_speed, self.max_speed)
+        self.vx = np.where(alive, vx, self.vx)
+        self.vy = np.where(alive, vy, self.vy)
+        self.x = np.where(alive, np.clip(self.x + vx, 0, self.world_width), self.x)
+        self.y = np.where(alive, np.clip(self.y + vy, 0, self.world_height), self.y)
+
+        # Wall collision: test the ship box against the nearby walls in order and
+        # push the ship out, exactly like SpaceObject.check_wall_collision
+        if not len(self.walls.walls):
+            return
+        env, slot = np.nonzero(alive)
+        x, y = self.x[env, slot], self.y[env, slot]
+        vx, vy = self.vx[env, slot], self.vy[env, slot]
+        left = np.trunc(x - SHIP_HALF_SIZE)
+        top = np.trunc(y - SHIP_HALF_SIZE)
+        candidates = self.walls.candidates(x, y, SHIP_HALF_SIZE + 2)
+        for k in range(candidates.shape[1]):
+            wall = self.walls.boxes[candidates[:, k]]
+            wx, wy, ww, wh = wall[:, 0], wall[:, 1], wall[:, 2], wall[:, 3]
+            hit = ((candidates[:, k] >= 0) & (left < wx + ww) & (wx < left + 20)
+                   & (top < wy + wh) & (wy < top + 20))
+            if not hit.any():
+                continue
+            left_of, right_of = hit & (x < wx), hit & ~(x < wx) & (x > wx + ww)
+            x = np.where(left_of, wx - 10, np.where(right_of, wx + ww + 10, x))
+            vx = np.where(left_of | right_of, 0, vx)
+            above, below = hit & (y < wy), hit & ~(y < wy) & (y > wy + wh)
+            y = np.where(above, wy - 10, np.where(below, wy + wh + 10, y))
+            vy = np.where(above | below, 0, vy)
+        self.x[env, slot], self.y[env, slot] = x, y
+        self.vx[env, slot], self.vy[env, slot] = vx, vy
+
+    # Remove ships without HP. If the first enemy dies, two new enemies are
+    # queued (the other enemies just disappear).
+    def _remove_dead_ships(self):
+        dead = self.alive & (self.hp <= 0)
+        if not dead.any():
+            return
+        killed = (dead & self._first_enemy()).any(axis=1)
+        self.alive &= ~dead
+        self.kills += killed
+        self.pending_spawns += 2 * killed
+
+    # Spawn the waiting enemies as far as the free slots (max_enemies) allow;
+    # the rest waits, like GameEngine with overflow="queue".
+    def _spawn_pending(self):
+        free = ~self.alive
+        free[:, 0] = False
+        spawns = np.minimum(self.pending_spawns, free.sum(axis=1))
+        spawns[~self.alive[:, 0]] = 0  # Matches without a player are over anyway
+        env = np.repeat(np.arange(self.num_envs), spawns)
+        if env.size == 0:
+            return
+        self.pending_spawns -= spawns
+        # n-th new enemy of its arena goes to the n-th free enemy slot
+        rank = np.arange(env.size) - np.repeat(np.cumsum(spawns) - spawns, spawns)
+        free_order = np.argsort(~free, axis=1, kind="stable")
+        slot = free_order[env, rank]
+        x, y = self._free_positions(env.size, SHIP_HALF_SIZE, (self.x[env, 0], self.y[env, 0]),
+                                    GameEngine.SPAWN_DISTANCE)
+        self.x[env, slot], self.y[env, slot] = x, y
+        self.vx[env, slot] = 0
+        self.vy[env, slot] = 0
+        self.angle[env, slot] = self.rng.integers(0, 360, env.size, endpoint=True)
+        self.hp[env, slot] = 100
+        self.alive[env, slot] = True
+        self.spawn_order[env, slot] = self.spawned[env] + rank
+        self.spawned += spawns
+
+    # Move the bullets and resolve wall and ship hits (swept, like GameEngine).
+    def _move_bullets(self):
+        env, bullet = np.nonzero(self.bullet_alive)
+        if env.size == 0:
+            return
+        x0, y0 = self.bullet_x[env, bullet], self.bullet_y[env, bullet]
+        x1 = x0 + self.bullet_vx[env, bullet]
+        y1 = y0 + self.bullet_vy[env, bullet]
+        self.bullet_x[env, bullet], self.bullet_y[env, bullet] = x1, y1
+        self.bullet_lifespan[env, bullet] -= 1
+        wall_t = self.walls.segments_hit(x0, y0, x1, y1, 3)
+        hit = wall_t <= 1
+
+        # Every ship of the arena against the bullet path: (bullets, ships).
+        # Ships behind a wall are safe: the bullet must reach them before the wall
+        close, ship_t = segment_circle_entries(x0[:, None], y0[:, None], (x1 - x0)[:, None], (y1 - y0)[:, None],
+                                               self.x[env], self.y[env], HIT_RADIUS)
+        close &= ship_t < wall_t[:, None]
+        close &= self.alive[env]
+        close &= self.bullet_owner[env, bullet][:, None] != np.arange(self.max_ships)  # Avoid friendly fire
+        hit |= close.any(axis=1)
+
+        # Damage: 10 per hit; the player scores 10 for every hit that leaves the
+        # first enemy at 0 HP or less (whoever shot it)
+        hits = np.zeros_like(self.hp)
+        np.add.at(hits, env, close.astype(np.int64))
+        hp_before = self.hp
+        self.hp = hp_before - 10 * hits
+        first_lethal = np.maximum(-(-hp_before // 10), 1)  # Hit number that brings the HP to 0
+        lethal = np.where(self._first_enemy(), np.clip(hits - first_lethal + 1, 0, None), 0)
+        self.score += 10 * lethal.sum(axis=1)
+
+        inside = (x1 >= 0) & (x1 <= self.world_width) & (y1 >= 0) & (y1 <= self.world_height)
+        expired = hit | ~inside | (self.bullet_lifespan[env, bullet] <= 0)
+        self.bullet_alive[env[expired], bullet[expired]] = False
+
+    # ------------------------
+    # Observations
+    # ------------------------
+
+    # One row of OBS_FIELDS per arena (float32).
+    def _observe(self):
+        n = self.num_envs
+        obs = np.zeros((n, len(OBS_FIELDS)), dtype=np.float32)
+        px, py = self.x[:, 0], self.y[:, 0]
+        obs[:, 0] = px / self.world_width
+        obs[:, 1] = py / self.world_height
+        obs[:, 2] = self.vx[:, 0] / PLAYER_MAX_SPEED
+        obs[:, 3] = self.vy[:, 0] / PLAYER_MAX_SPEED
+        rad = np.radians(self.angle[:, 0])
+        obs[:, 4] = np.cos(rad)
+        obs[:, 5] = np.sin(rad)
+        obs[:, 6] = self.hp[:, 0] / 100
+
+        enemy = self.alive.copy()
+        enemy[:, 0] = False
+        dist = np.where(enemy, np.hypot(self.x - px[:, None], self.y - py[:, None]), np.inf)
+        nearest = dist.argmin(axis=1)
+        has_enemy = enemy.any(axis=1)
+        rows = np.arange(n)
+        obs[:, 7] = np.where(has_enemy, (self.x[rows, nearest] - px) / self.world_width, 0)
+        obs[:, 8] = np.where(has_enemy, (self.y[rows, nearest] - py) / self.world_height, 0)
+        obs[:, 9] = np.where(has_enemy, self.hp[rows, nearest] / 100, 0)
+        nearest_mask = np.zeros_like(enemy)
+        nearest_mask[rows, nearest] = has_enemy
+        obs[:, 10] = self._can_see_player(nearest_mask)[rows, nearest] & has_enemy
+
+        coin_dist = np.where(self.coin_alive, np.hypot(self.coin_x - px[:, None], self.coin_y - py[:, None]), np.inf)
+        nearest = coin_dist.argmin(axis=1)
+        has_coin = self.coin_alive.any(axis=1)
+        obs[:, 11] = np.where(has_coin, (self.coin_x[rows, nearest] - px) / self.world_width, 0)
+        obs[:, 12] = np.where(has_coin, (self.coin_y[rows, nearest] - py) / self.world_height, 0)
+        obs[:, 13] = enemy.sum(axis=1)
+        obs[:, 14] = self.coin_alive.sum(axis=1)
+        return obs
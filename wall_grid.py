@@ -0,0 +1,273 @@
+import math
+
+import numpy as np
+import pygame
+
+from occupancy import OccupancyMap
+from free_space import FreeSpaceSampler
+
+# ------------------------
+# WallGrid Class (Static Wall Index)
+# ------------------------
+
+# The labyrinth walls never move, so they are sorted once into a uniform grid:
+# every cell remembers the walls that overlap it. A collision query then only
+# tests the walls in the cells it touches instead of the whole wall list.
+#
+# A WallGrid behaves like the plain list of pygame.Rect walls (iteration,
+# len(), indexing), so it can be passed everywhere a wall list is expected.
+#
+# For yes/no questions ("is this box inside a wall?") when placing ships and
+# coins, the grid also provides an OccupancyMap (occupancy.py) of the walls,
+# built on first use, and free-space samplers (free_space.py) for spawn
+# positions. Nothing in the per-tick simulation uses the bitmap.
+class WallGrid:
+    # Up to this many segments segments_hit() tests them one by one in plain
+    # Python (a few bullets are cheaper that way than with the padded tables).
+    SMALL_COUNT = 8
+
+    # cells and occupancy can be given when they were computed before (see
+    # labyrinth_compiler.py); otherwise they are built from the walls.
+    # world_size=(width, height) is the world the walls belong to, if known
+    # (the engines take their world size from it).
+    def __init__(self, walls, cell_size=100, occupancy_resolution=10, cells=None, occupancy=None, world_size=None):
+        self.walls = list(walls)
+        self.world_size = world_size
+        self.cell_size = cell_size
+        self.occupancy_resolution = occupancy_resolution
+        self._occupancy = occupancy
+        self.boxes = np.array([(wall.x, wall.y, wall.width, wall.height) for wall in self.walls],
+                              dtype=float).reshape(-1, 4)
+        # The grid covers all walls; queries outside of it are clamped to the border cells
+        self.origin_x = min([0] + [wall.x for wall in self.walls])
+        self.origin_y = min([0] + [wall.y for wall in self.walls])
+        self.cols = max([1] + [math.ceil((wall.right - self.origin_x) / cell_size) for wall in self.walls])
+        self.rows = max([1] + [math.ceil((wall.bottom - self.origin_y) / cell_size) for wall in self.walls])
+        self.cells = self._build_cells(0) if cells is None else cells
+        self.cell_walls = [[self.walls[i] for i in cell] for cell in self.cells]  # The walls themselves
+        self._tables = {}  # margin -> padded wall index table, see _table()
+        self._grown_cells = {}  # margin -> cells of the grown walls, see cells_within()
+        self._samplers = {}  # (half_size, world size) -> FreeSpaceSampler
+
+    # For every cell the (sorted) indices of the walls overlapping the cell
+    # after growing each wall by margin on every side.
+    def _build_cells(self, margin):
+        cells = [[] for _ in range(self.cols * self.rows)]
+        for i, wall in enumerate(self.walls):
+            c0, r0 = self._cell(wall.x - margin, wall.y - margin)
+            c1, r1 = self._cell(wall.right - 1 + margin, wall.bottom - 1 + margin)
+            for row in range(r0, r1 + 1):
+                for col in range(c0, c1 + 1):
+                    cells[row * self.cols + col].append(i)
+        return [tuple(cell) for cell in cells]
+
+    # Like cells, but with every wall grown by margin (built once per margin).
+    def cells_within(self, margin):
+        if margin <= 0:
+            return self.cells
+        cells = self._grown_cells.get(margin)
+        if cells is None:
+            cells = self._grown_cells[margin] = self._build_cells(margin)
+        return cells
+
+    # Cell (column, row) containing the point, clamped to the grid.
+    def _cell(self, x, y):
+        col = int((x - self.origin_x) // self.cell_size)
+        row = int((y - self.origin_y) // self.cell_size)
+        return min(max(col, 0), self.cols - 1), min(max(row, 0), self.rows - 1)
+
+    # Bitmap of the walls for O(1) point and box tests.
+    @property
+    def occupancy(self):
+        if self._occupancy is None:
+            width = max([1] + [wall.right for wall in self.walls])
+            height = max([1] + [wall.bottom for wall in self.walls])
+            self._occupancy = OccupancyMap(self.walls, width, height, self.occupancy_resolution)
+        return self._occupancy
+
+    # Sampler of random positions where a box of half-size half_size fits
+    # (built once per size and cached).
+    def free_space(self, half_size, world_width, world_height):
+        key = (half_size, world_width, world_height)
+        sampler = self._samplers.get(key)
+        if sampler is None:
+            sampler = FreeSpaceSampler(self.occupancy, world_width, world_height, half_size)
+            self._samplers[key] = sampler
+        return sampler
+
+    def __iter__(self):
+        return iter(self.walls)
+
+    def __len__(self):
+        return len(self.walls)
+
+    def __getitem__(self, index):
+        return self.walls[index]
+
+    # Walls that may overlap the rectangle (x, y, width, height or a pygame.Rect),
+    # in their original order. Called several times per ship and tick: inside the
+    # grid the cells need no clamping, and a rectangle within one cell gets a copy
+    # of the cached wall list of that cell.
+    def query(self, rect):
+        if not isinstance(rect, pygame.Rect):
+            rect = pygame.Rect(rect)
+        size = self.cell_size
+        c0, c1 = int((rect.x - self.origin_x) // size), int((rect.right - 1 - self.origin_x) // size)
+        r0, r1 = int((rect.y - self.origin_y) // size), int((rect.bottom - 1 - self.origin_y) // size)
+        if c0 < 0 or r0 < 0 or c1 >= self.cols or r1 >= self.rows:
+            c0, r0 = self._cell(rect.x, rect.y)
+            c1, r1 = self._cell(rect.right - 1, rect.bottom - 1)
+        if c0 == c1 and r0 == r1:
+            return list(self.cell_walls[r0 * self.cols + c0])
+        found = set()
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                found.update(self.cells[row * self.cols + col])
+        return [self.walls[i] for i in sorted(found)]
+
+    # True if the rectangle overlaps any wall (same rule as pygame.Rect.colliderect).
+    def collides(self, rect):
+        rect = pygame.Rect(rect)
+        for wall in self.query(rect):
+            if rect.colliderect(wall):
+                return True
+        return False
+
+    # Table with one row per cell listing the walls near the cell (padded with -1).
+    # Walls are grown by margin, so for any box whose center lies in a cell and
+    # which reaches at most margin beyond its center, the row holds all walls the
+    # box can overlap.
+    def _table(self, margin):
+        table = self._tables.get(margin)
+        if table is None:
+            cells = self._build_cells(margin)
+            width = max([1] + [len(cell) for cell in cells])
+            table = np.full((len(cells), width), -1, dtype=np.intp)
+            for i, cell in enumerate(cells):
+                table[i, :len(cell)] = cell
+            self._tables[margin] = table
+        return table
+
+    # Candidate walls for many points at once: an array of wall indices per point
+    # (padded with -1, ascending) holding every wall within margin of the point.
+    def candidates(self, xs, ys, margin):
+        col = np.minimum(np.maximum((np.asarray(xs, dtype=float) - self.origin_x) // self.cell_size, 0), self.cols - 1)
+        row = np.minimum(np.maximum((np.asarray(ys, dtype=float) - self.origin_y) // self.cell_size, 0), self.rows - 1)
+        return self._table(int(math.ceil(margin)))[row.astype(np.intp) * self.cols + col.astype(np.intp)]
+
+    # Vectorized box test: for boxes with the given left/top coordinates (arrays)
+    # and size, return a mask of the boxes that overlap a wall.
+    def overlaps(self, left, top, width, height):
+        left = np.asarray(left, dtype=float)
+        top = np.asarray(top, dtype=float)
+        if left.size == 0 or len(self.walls) == 0:
+            return np.zeros(left.shape, dtype=bool)
+        margin = math.ceil(max(width, height) / 2) + 1
+        col = np.clip(((left + width / 2 - self.origin_x) // self.cell_size).astype(np.intp), 0, self.cols - 1)
+        row = np.clip(((top + height / 2 - self.origin_y) // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        candidates = self._table(margin)[row * self.cols + col]
+        boxes = self.boxes[candidates]
+        wx, wy, ww, wh = boxes[..., 0], boxes[..., 1], boxes[..., 2], boxes[..., 3]
+        left, top = left[:, None], top[:, None]
+        overlap = (left < wx + ww) & (wx < left + width) & (top < wy + wh) & (wy < top + height)
+        return (overlap & (candidates >= 0)).any(axis=1)
+
+    # Swept box test for boxes of half-size half_size (bullets) moving from (x0, y0)
+    # to (x1, y1) (arrays), so fast bullets cannot tunnel through thin walls.
+    # Returns for every box the parameter t (0 = start, 1 = end) at which it first
+    # touches a wall, inf if it touches none; callers compare it with the t of
+    # other hits (e.g. ships) to find out what was hit first. Each wall is grown
+    # by half_size and the segment is clipped against it (slab test); touching
+    # edges do not count, like pygame.Rect.colliderect.
+    def segments_hit(self, x0, y0, x1, y1, half_size):
+        x0, y0 = np.asarray(x0, dtype=float), np.asarray(y0, dtype=float)
+        x1, y1 = np.asarray(x1, dtype=float), np.asarray(y1, dtype=float)
+        if x0.size == 0 or len(self.walls) == 0:
+            return np.full(x0.shape, np.inf)
+        if x0.size <= self.SMALL_COUNT:
+            return np.array([self.segment_hit(*segment, half_size)
+                             for segment in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())])
+        dx, dy = x1 - x0, y1 - y0
+        # Candidate walls from the cell of the midpoint, grown enough to cover the
+        # whole segment (rounded up to limit the number of cached tables)
+        reach = max(np.abs(dx).max(), np.abs(dy).max()) / 2 + half_size + 1
+        margin = int(math.ceil(reach / 8)) * 8
+        col = np.minimum(np.maximum(((x0 + x1) / 2 - self.origin_x) // self.cell_size, 0), self.cols - 1).astype(np.intp)
+        row = np.minimum(np.maximum(((y0 + y1) / 2 - self.origin_y) // self.cell_size, 0), self.rows - 1).astype(np.intp)
+        candidates = self._table(margin)[row * self.cols + col]
+        boxes = self.boxes[candidates]
+        left = boxes[..., 0] - half_size
+        top = boxes[..., 1] - half_size
+        right = boxes[..., 0] + boxes[..., 2] + half_size
+        bottom = boxes[..., 1] + boxes[..., 3] + half_size
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # With 1/0 = inf a resting coordinate gives (-inf, inf) inside the
+            # slab and an empty interval outside of it
+            inv_dx = (1 / dx)[:, None]
+            inv_dy = (1 / dy)[:, None]
+            tx0 = (left - x0[:, None]) * inv_dx
+            tx1 = (right - x0[:, None]) * inv_dx
+            ty0 = (top - y0[:, None]) * inv_dy
+            ty1 = (bottom - y0[:, None]) * inv_dy
+        t_enter = np.maximum(np.minimum(tx0, tx1), np.minimum(ty0, ty1))
+        t_exit = np.minimum(np.maximum(tx0, tx1), np.maximum(ty0, ty1))
+        touched = (t_enter < t_exit) & (t_exit > 0) & (t_enter <= 1) & (candidates >= 0)
+        return np.where(touched, np.maximum(t_enter, 0), np.inf).min(axis=1)
+
+    # segments_hit() for one segment: the walls in the cells around it, one by one.
+    def segment_hit(self, x0, y0, x1, y1, half_size):
+        reach = half_size + 1
+        box = (int(min(x0, x1) - reach), int(min(y0, y1) - reach),
+               int(abs(x1 - x0) + 2 * reach) + 1, int(abs(y1 - y0) + 2 * reach) + 1)
+        first = math.inf
+        for wall in self.query(box):
+            t = segment_entry(wall, x0, y0, x1 - x0, y1 - y0, half_size)
+            if t is not None and t < first:
+                first = t
+        return first
+
+
+# Parameter t (0 = start, 1 = end) where the segment from (x0, y0) along
+# (dx, dy) enters the wall grown by radius, or None if it misses it
+# (slab test; touching an edge does not count, starting inside gives 0).
+def segment_entry(wall, x0, y0, dx, dy, radius):
+    left, top = wall.x - radius, wall.y - radius
+    right, bottom = wall.x + wall.width + radius, wall.y + wall.height + radius
+    if dx:
+        t_enter, t_exit = (left - x0) / dx, (right - x0) / dx
+        if t_enter > t_exit:
+            t_enter, t_exit = t_exit, t_enter
+    elif left < x0 < right:
+        t_enter, t_exit = -math.inf, math.inf
+    else:
+        return None
+    if dy:
+        ty0, ty1 = (top - y0) / dy, (bottom - y0) / dy
+        if ty0 > ty1:
+            ty0, ty1 = ty1, ty0
+        t_enter, t_exit = max(t_enter, ty0), min(t_exit, ty1)
+    elif not top < y0 < bottom:
+        return None
+    if t_enter < t_exit and t_exit > 0 and t_enter <= 1:
+        return max(t_enter, 0.0)
+    return None
+
+
+# Walls that may touch rect: uses the grid when walls is a WallGrid,
+# otherwise (plain list of walls) all walls.
+def walls_near(walls, rect):
+    if isinstance(walls, WallGrid):
+        return walls.query(rect)
+    return walls
+
+
+# True if rect (a pygame.Rect) overlaps a wall: a single bitmap lookup when
+# walls is a WallGrid, otherwise a scan of the wall list. Used when placing
+# ships and coins, not per tick.
+def rect_blocked(walls, rect):
+    if isinstance(walls, WallGrid):
+        return walls.occupancy.box_blocked(rect.x, rect.y, rect.width, rect.height)
+    for wall in walls:
+        if rect.colliderect(wall):
+            return True
+    return False